@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Scaling of the multi-process bulk converter from 1 to N worker processes.
+
+Every run converts the same synthetic workload from a cold start of the workers, so the conversion caches of a
+run do not help the following ones.
+
+Usage:
+    python benchmarks/bulk_scaling.py [--items 20000] [--distinct 5000] [--max-workers 8] [--chunk-size 256]
+"""
+import argparse
+import os
+import time
+
+import workload
+
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from bulk_converter import convert_many  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=20000, help='Number of (cron, timezone) items')
+    parser.add_argument('--distinct', type=int, default=5000, help='Distinct pairs among the items, 0 for all')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='Largest pool to measure')
+    parser.add_argument('--chunk-size', type=int, default=256, help='Items of each chunk sent to a worker')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic workload')
+    args = parser.parse_args()
+
+    items = workload.generate_bodies(args.items, args.distinct or None, args.seed)
+    print(f'{len(items)} items, {len({(i["cron"], i["timezone"]) for i in items})} distinct, '
+          f'chunk size {args.chunk_size}, {os.cpu_count()} CPUs')
+    worker_counts = sorted({1, *(2 ** n for n in range(1, args.max_workers.bit_length())), args.max_workers})
+    baseline = None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        converted = sum(1 for _ in convert_many(items, workers, args.chunk_size))
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f'  {workers:3d} workers: {elapsed:7.2f} s  {converted / elapsed:9.0f} items/s  '
+              f'speedup x{baseline / elapsed:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""In-process load test of lambda_handler.
+
+It replays API Gateway events against the handler and reports:
+ - latency percentiles (p50/p95/p99) and requests/sec of warm invocations
+ - memory allocated by each request and retained by the container, through tracemalloc
+ - cold start cost: module import plus first invocation, measured in fresh interpreters
+ - mean time of each handler phase, conversion cache hit rate and timezone/cron shape distribution
+
+Events are built from apigateway-event-example.json with a synthetic workload of many timezones and cron shapes,
+or read from an NDJSON file of events or request bodies.
+
+Usage:
+    python benchmarks/handler_load.py [--requests 5000] [--distinct 300] [--batch-size 0] [--events FILE] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+import workload
+
+COLD_START_CODE = '''
+import json, sys, time
+started = time.perf_counter()
+import local_crontab_service
+imported = time.perf_counter()
+events = json.loads(sys.stdin.read())
+local_crontab_service.lambda_handler(events[0], None)
+first = time.perf_counter()
+local_crontab_service.lambda_handler(events[1], None)
+second = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "first_invocation_ms": (first - imported) * 1000,
+                  "second_invocation_ms": (second - first) * 1000}))
+'''
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Return p50, p95 and p99 of the samples."""
+    if len(samples) < 2:
+        return {'p50': samples[0], 'p95': samples[0], 'p99': samples[0]}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def cold_start(events: List[Dict], runs: int) -> Dict[str, float]:
+    """Return the median cold start cost, measured in `runs` fresh interpreters."""
+    samples = []
+    payload = json.dumps([events[0], events[-1]])
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, '-c', COLD_START_CODE], cwd=workload.LAMBDA_DIR, input=payload,
+                                   capture_output=True, text=True, check=True, env=os.environ.copy())
+        samples.append(json.loads(completed.stdout.splitlines()[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def warm_run(handler, events: List[Dict]) -> Dict:
+    """Invoke the handler with every event and return latency and status statistics."""
+    # The handler replaces the event body, so each invocation gets its own shallow copy
+    invocations = [dict(event) for event in events]
+    latencies = []
+    statuses: Dict[int, int] = dict()
+    started = time.perf_counter()
+    for event in invocations:
+        request_started = time.perf_counter()
+        response = handler(event, None)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        statuses[response['statusCode']] = statuses.get(response['statusCode'], 0) + 1
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(events),
+        'requests_per_sec': len(events) / elapsed,
+        'latency_ms': {**percentiles(latencies), 'mean': statistics.fmean(latencies), 'max': max(latencies)},
+        'status_codes': statuses,
+    }
+
+
+def allocations_run(handler, events: List[Dict]) -> Dict[str, float]:
+    """Invoke the handler with every event under tracemalloc and return the allocated memory."""
+    invocations = [dict(event) for event in events]
+    peaks = []
+    tracemalloc.start()
+    retained_start, _ = tracemalloc.get_traced_memory()
+    for event in invocations:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        handler(event, None)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append((peak - before) / 1024)
+    retained_end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'peak_per_request_kib': {**percentiles(peaks), 'max': max(peaks)},
+        'retained_kib': (retained_end - retained_start) / 1024,
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Print the report in a human readable form."""
+    cold = report['cold_start_ms']
+    print(f"cold start: import {cold['import_ms']:.1f} ms, first invocation {cold['first_invocation_ms']:.2f} ms, "
+          f"second invocation {cold['second_invocation_ms']:.2f} ms")
+    warm = report['warm']
+    latency = warm['latency_ms']
+    print(f"warm: {warm['requests']} requests, {warm['requests_per_sec']:.0f} req/s, status codes "
+          f"{warm['status_codes']}")
+    print(f"  latency ms: p50 {latency['p50']:.3f}  p95 {latency['p95']:.3f}  p99 {latency['p99']:.3f}  "
+          f"mean {latency['mean']:.3f}  max {latency['max']:.3f}")
+    allocations = report['allocations']
+    peak = allocations['peak_per_request_kib']
+    print(f"  allocations KiB/request: p50 {peak['p50']:.1f}  p99 {peak['p99']:.1f}  max {peak['max']:.1f}, "
+          f"retained {allocations['retained_kib']:.1f} KiB")
+    print(f"  conversion cache: {report['conversion_cache']}")
+    metrics = report['metrics']
+    print('  mean phase ms: ' + '  '.join(f'{phase} {ms:.3f}' for phase, ms in metrics['mean_phase_ms'].items()))
+    print(f"  hit rate {metrics['cache_hit_rate']}, conversions {metrics['conversions']}")
+    print(f"  top timezones {dict(list(metrics['timezones'].items())[:5])}")
+    print(f"  top cron shapes {dict(list(metrics['cron_shapes'].items())[:5])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000, help='Number of synthetic conversions')
+    parser.add_argument('--distinct', type=int, default=300, help='Distinct (cron, timezone) pairs, 0 for all')
+    parser.add_argument('--batch-size', type=int, default=0, help='Group conversions into batch requests')
+    parser.add_argument('--events', help='NDJSON file of events or request bodies, instead of the synthetic ones')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic workload')
+    parser.add_argument('--cold-runs', type=int, default=3, help='Fresh interpreters used for the cold start')
+    parser.add_argument('--log-level', default='WARNING', help='LOG_LEVEL of the handler')
+    parser.add_argument('--json', action='store_true', help='Print the report as a single JSON line')
+    args = parser.parse_args()
+
+    os.environ['LOG_LEVEL'] = args.log_level
+    if args.events:
+        events = list(workload.read_events(args.events))
+    else:
+        bodies = workload.generate_bodies(args.requests, args.distinct or None, args.seed)
+        events = workload.make_events(bodies, args.batch_size)
+
+    import local_crontab_service
+    from request_metrics import InMemorySink
+
+    report = {'cold_start_ms': cold_start(events, args.cold_runs)}
+    metrics_sink = local_crontab_service.metrics_sink = InMemorySink(max_records=0)
+    report['warm'] = warm_run(local_crontab_service.lambda_handler, events)
+    report['metrics'] = metrics_sink.summary
+    report['allocations'] = allocations_run(local_crontab_service.lambda_handler, events)
+    report['conversion_cache'] = local_crontab_service.conversion_cache.stats
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
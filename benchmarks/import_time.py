@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Measure the import cost of the Lambda handler module, the main part of a cold start.
+
+It runs `python -X importtime` in a fresh interpreter several times and reports the median cumulative
+import time of the handler and of its most expensive dependencies.
+
+Usage:
+    python benchmarks/import_time.py [--module local_crontab_service] [--runs 5] [--top 15] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambda')
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Import a module in a new interpreter and return the cumulative import time, in µs, of each module."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=LAMBDA_DIR, capture_output=True, text=True, check=True)
+    times = dict()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # The same module is reported once, keep the first (and only) measure
+        times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def report(module: str, runs: int, top: int) -> Dict:
+    """Return the median import time of the module and of its `top` slowest dependencies."""
+    samples: List[Dict[str, int]] = [import_times(module) for _ in range(runs)]
+    medians = {name: statistics.median(sample.get(name, 0) for sample in samples) for name in samples[0]}
+    slowest = sorted((name for name in medians if name != module), key=medians.get, reverse=True)[:top]
+    return {
+        'module': module,
+        'runs': runs,
+        'python': sys.version.split()[0],
+        'total_us': medians[module],
+        'dependencies_us': {name: medians[name] for name in slowest},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='local_crontab_service', help='Module to import from the lambda dir')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to sample')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest dependencies to show')
+    parser.add_argument('--json', action='store_true', help='Print the report as a single JSON line')
+    args = parser.parse_args()
+
+    result = report(args.module, args.runs, args.top)
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['module']}: {result['total_us'] / 1000:.1f} ms "
+          f"(median of {result['runs']} runs, Python {result['python']})")
+    for name, elapsed in result['dependencies_us'].items():
+        print(f"  {elapsed / 1000:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
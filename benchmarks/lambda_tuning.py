@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Recommend the Lambda memory size and architecture for a target p99 latency, from a local run of the workload.
+
+The handler is run in process with the workload of handler_load.py, and the warm latency of every request is
+replayed at each memory size and architecture:
+ - Lambda gives CPU in proportion to memory, 1769 MB is one vCPU. The handler is single threaded, so more
+   memory than that only costs more. By default latencies scale as 1769 / memory below one vCPU.
+ - With --cfs-period-ms the CPU share is modelled as a quota per scheduler period instead: requests shorter
+   than the quota run at full speed, longer ones wait for the next periods.
+ - --host-speed is how much faster this machine is than a Lambda x86 vCPU, --arm64-speed how much faster an
+   arm64 vCPU is than an x86 one. Both are 1 by default: measure them once with a deployed function.
+
+The cost of a million requests is the billed duration, rounded up to the millisecond, times the memory and the
+GB-second price of the architecture, plus the request price. The cheapest configuration meeting the target p99,
+with enough memory for the peak RSS of the process, is recommended. Only the handler time is simulated: cold
+starts are reported apart, set lambdaProvisionedConcurrency to avoid them.
+
+Usage:
+    python benchmarks/lambda_tuning.py --target-p99 50 [--memory 128,256,512,1024,1769] [--requests 5000]
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import workload
+from handler_load import cold_start, percentiles
+
+# Memory of one full vCPU
+FULL_VCPU_MEMORY = 1769
+DEFAULT_MEMORY_SIZES = '128,256,512,1024,1536,1769,2048,3008'
+ARCHITECTURES = ('x86_64', 'arm64')
+# On-demand prices of us-east-1, per GB-second and per request
+GB_SECOND_PRICES = {'x86_64': 0.0000166667, 'arm64': 0.0000133334}
+REQUEST_PRICE = 0.20 / 1_000_000
+
+
+def measure_latencies(handler, events: List[Dict]) -> List[float]:
+    """Invoke the handler with every event and return the milliseconds of each invocation."""
+    # The handler replaces the event body, so each invocation gets its own shallow copy
+    invocations = [dict(event) for event in events]
+    latencies = []
+    for event in invocations:
+        started = time.perf_counter()
+        handler(event, None)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def simulated_duration(cpu_ms: float, memory: int, cfs_period_ms: float = 0.0) -> float:
+    """Return the duration of a request needing `cpu_ms` of a full vCPU, with the CPU share of `memory`.
+
+    :param cpu_ms: Milliseconds of the request on a full vCPU
+    :param memory: Memory size in MB
+    :param cfs_period_ms: Scheduler period of the CPU quota, 0 to scale the duration in proportion
+    """
+    share = min(memory / FULL_VCPU_MEMORY, 1.0)
+    if share >= 1.0:
+        return cpu_ms
+    if not cfs_period_ms:
+        return cpu_ms / share
+    quota = share * cfs_period_ms
+    periods, remainder = divmod(cpu_ms, quota)
+    return periods * cfs_period_ms + remainder
+
+
+def evaluate(latencies: List[float], memory: int, architecture: str, host_speed: float = 1.0,
+             arm64_speed: float = 1.0, cfs_period_ms: float = 0.0) -> Dict:
+    """Return the simulated latency percentiles and the cost of a million requests of a configuration."""
+    # Milliseconds on a Lambda vCPU: this host is host_speed times faster than x86, arm64 is arm64_speed times faster
+    slowdown = host_speed / arm64_speed if architecture == 'arm64' else host_speed
+    durations = [simulated_duration(latency * slowdown, memory, cfs_period_ms) for latency in latencies]
+    billed_ms = statistics.fmean(math.ceil(duration) for duration in durations)
+    cost = (billed_ms / 1000 * memory / 1024 * GB_SECOND_PRICES[architecture] + REQUEST_PRICE) * 1_000_000
+    return {
+        'memory': memory,
+        'architecture': architecture,
+        'latency_ms': {**percentiles(durations), 'mean': statistics.fmean(durations)},
+        'billed_ms': billed_ms,
+        'cost_per_million': cost,
+    }
+
+
+def recommend(configurations: List[Dict], target_p99: float, min_memory: int) -> Optional[Dict]:
+    """Return the cheapest configuration meeting the target p99 with at least `min_memory`, None if none does."""
+    candidates = [configuration for configuration in configurations
+                  if configuration['latency_ms']['p99'] <= target_p99 and configuration['memory'] >= min_memory]
+    return min(candidates, key=lambda configuration: (configuration['cost_per_million'], configuration['memory']),
+               default=None)
+
+
+def print_report(report: Dict) -> None:
+    """Print the report in a human readable form."""
+    print(f"{report['requests']} requests, local p99 {report['local_latency_ms']['p99']:.3f} ms, "
+          f"peak RSS {report['peak_rss_mb']:.0f} MB, cold start import {report['cold_start_ms']['import_ms']:.1f} ms")
+    print(f"{'arch':8} {'memory':>6} {'p50 ms':>9} {'p99 ms':>9} {'billed ms':>9} {'$/1M req':>9}")
+    for configuration in report['configurations']:
+        latency = configuration['latency_ms']
+        print(f"{configuration['architecture']:8} {configuration['memory']:6d} {latency['p50']:9.3f} "
+              f"{latency['p99']:9.3f} {configuration['billed_ms']:9.2f} {configuration['cost_per_million']:9.4f}")
+    best = report['recommendation']
+    if best is None:
+        print(f"no configuration meets p99 <= {report['target_p99_ms']} ms")
+    else:
+        print(f"recommended: lambdaArchitecture {best['architecture']}, lambdaMemorySize {best['memory']} "
+              f"(p99 {best['latency_ms']['p99']:.3f} ms, ${best['cost_per_million']:.4f} per million requests)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target-p99', type=float, required=True, help='Target p99 latency in milliseconds')
+    parser.add_argument('--memory', default=DEFAULT_MEMORY_SIZES, help='Comma separated memory sizes in MB')
+    parser.add_argument('--architectures', default=','.join(ARCHITECTURES), help='Comma separated architectures')
+    parser.add_argument('--host-speed', type=float, default=1.0, help='Speed of this host over a Lambda x86 vCPU')
+    parser.add_argument('--arm64-speed', type=float, default=1.0, help='Speed of an arm64 vCPU over an x86 one')
+    parser.add_argument('--cfs-period-ms', type=float, default=0.0, help='Scheduler period of the CPU quota')
+    parser.add_argument('--requests', type=int, default=5000, help='Number of synthetic conversions')
+    parser.add_argument('--distinct', type=int, default=300, help='Distinct (cron, timezone) pairs, 0 for all')
+    parser.add_argument('--batch-size', type=int, default=0, help='Group conversions into batch requests')
+    parser.add_argument('--events', help='NDJSON file of events or request bodies, instead of the synthetic ones')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic workload')
+    parser.add_argument('--cold-runs', type=int, default=3, help='Fresh interpreters used for the cold start')
+    parser.add_argument('--json', action='store_true', help='Print the report as a single JSON line')
+    args = parser.parse_args()
+
+    os.environ['LOG_LEVEL'] = 'WARNING'
+    if args.events:
+        events = list(workload.read_events(args.events))
+    else:
+        bodies = workload.generate_bodies(args.requests, args.distinct or None, args.seed)
+        events = workload.make_events(bodies, args.batch_size)
+
+    import local_crontab_service
+
+    latencies = measure_latencies(local_crontab_service.lambda_handler, events)
+    # ru_maxrss is in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    configurations = [evaluate(latencies, int(memory), architecture, args.host_speed, args.arm64_speed,
+                               args.cfs_period_ms)
+                      for architecture in args.architectures.split(',') for memory in args.memory.split(',')]
+    report = {
+        'requests': len(events),
+        'local_latency_ms': percentiles(latencies),
+        'peak_rss_mb': peak_rss_mb,
+        'cold_start_ms': cold_start(events, args.cold_runs),
+        'target_p99_ms': args.target_p99,
+        'configurations': configurations,
+        'recommendation': recommend(configurations, args.target_p99, math.ceil(peak_rss_mb)),
+    }
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
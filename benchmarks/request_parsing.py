@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of APIGatewayRequest parsing against the bundled apigateway-event-example.json.
+
+It compares the lazy `APIGatewayRequest` with `EagerRequest`, a copy of the previous implementation that
+parses every field in `__init__` and creates a new namedtuple class on every access.
+
+Usage:
+    python benchmarks/request_parsing.py [--number 20000] [--repeat 5]
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import timeit
+from collections import namedtuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'lambda'))
+
+import inflection  # noqa: E402
+from api_gateway_parser.api_gateway_request import APIGatewayRequest  # noqa: E402
+
+EVENT_FILE = os.path.join(ROOT_DIR, 'apigateway-event-example.json')
+
+
+class EagerRequest:
+    """Previous APIGatewayRequest implementation, kept only as reference for the benchmark."""
+
+    def __init__(self, event, context):
+        self._event = event
+        self._context = context
+        self._body = event.get('body', None)
+        self._http_method = event.get('httpMethod', 'GET')
+        self._resource = event.get('resource')
+        self._path_parameters = event.get('pathParameters', {})
+        self._query_parameters = event.get('queryStringParameters', {})
+        self._request_context = event.get('requestContext', {})
+        self._headers = event.get('headers', {})
+
+    @functools.cached_property
+    def body(self):
+        return self._body
+
+    @functools.cached_property
+    def headers(self):
+        payload = {inflection.underscore(k): v for k, v, in self._headers.items()}
+        return namedtuple('HeadersTuple', sorted(payload))(**payload)
+
+    @functools.cached_property
+    def http(self):
+        return str(self._http_method)
+
+    @functools.cached_property
+    def resource(self):
+        return str(self._resource)
+
+
+def handler_access(request_class, event):
+    """Accesses done by lambda_handler on every request."""
+    request = request_class(event, None)
+    return request.http, request.resource, request.body
+
+
+def full_access(request_class, event):
+    """Accesses done by a handler that also reads the headers."""
+    request = request_class(event, None)
+    return request.http, request.resource, request.body, request.headers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000, help='Requests parsed for each sample')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of samples, the best one is reported')
+    args = parser.parse_args()
+
+    with open(EVENT_FILE) as file:
+        event = json.load(file)
+
+    for scenario in (handler_access, full_access):
+        print(f'{scenario.__name__}: {scenario.__doc__}')
+        for request_class in (EagerRequest, APIGatewayRequest):
+            best = min(timeit.repeat(lambda: scenario(request_class, event), number=args.number, repeat=args.repeat))
+            print(f'  {request_class.__name__:<18} {best / args.number * 1e6:8.2f} µs/request')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of the API Gateway response building.
+
+It compares `APIGatewayResponse(...).serialized` followed by a `json.dumps` of its body with `build_response`,
+which assembles the proxy dict directly, for a single conversion and for a batch of conversions.
+
+Usage:
+    python benchmarks/response_building.py [--number 20000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'lambda'))
+
+from api_gateway_parser.api_gateway_response import APIGatewayResponse, build_response  # noqa: E402
+
+SINGLE_BODY = ["10 9 * 1-2 *", "10 9 1-28 3 *", "10 8 29-31 3 *", "10 8 * 4-9 *",
+               "10 8 1-24 10 *", "10 9 25-31 10 *", "10 9 * 11-12 *"]
+BATCH_BODY = [{'cron': '10 10 * * *', 'timezone': 'Europe/Rome', 'crons': SINGLE_BODY}] * 100
+
+
+def class_response(body):
+    """APIGatewayResponse class, then the body encoding."""
+    response = APIGatewayResponse(body=body).serialized
+    response['body'] = json.dumps(response['body'])
+    return response
+
+
+def builder_response(body):
+    """build_response function."""
+    return build_response(body=body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000, help='Responses built for each sample')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of samples, the best one is reported')
+    args = parser.parse_args()
+
+    assert class_response(SINGLE_BODY) == builder_response(SINGLE_BODY)
+    for name, body in (('single', SINGLE_BODY), ('batch of 100', BATCH_BODY)):
+        print(f'{name} body:')
+        for build in (class_response, builder_response):
+            best = min(timeit.repeat(lambda: build(body), number=args.number, repeat=args.repeat))
+            print(f'  {build.__name__:<18} {best / args.number * 1e6:8.2f} µs/response')
+
+
+if __name__ == '__main__':
+    main()
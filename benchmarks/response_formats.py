@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark of the JSON and compact bitmask response formats, for single and batch conversions.
+
+Bodies are built from real conversions of the synthetic workload. For each format it reports the body size, raw
+and gzip compressed, the server-side encoding cost and the client-side decoding cost. Decoding JSON is reported
+alone and followed by the parsing of every cron into its field values, which the bitmask format already gives.
+Bitmask batches do not repeat the cron and timezone of every item, clients match results by position.
+
+Usage:
+    python benchmarks/response_formats.py [--batch-size 100] [--number 2000] [--repeat 5]
+"""
+import argparse
+import gzip
+import json
+import os
+import timeit
+
+import workload
+
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import compact_format  # noqa: E402
+import local_crontab_service  # noqa: E402
+from cron_normalizer import expand_cron  # noqa: E402
+
+
+def json_with_crons(data: str):
+    """json.loads, then every cron parsed into the values of its fields."""
+    crons = json.loads(data)
+    return [expand_cron(cron) for cron in crons]
+
+
+def json_batch_with_crons(data: str):
+    """json.loads of a batch, then every cron parsed into the values of its fields."""
+    return [[expand_cron(cron) for cron in item['crons']] if 'crons' in item else item['message']
+            for item in json.loads(data)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=100, help='Items of the batch body')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic workload')
+    parser.add_argument('--number', type=int, default=2000, help='Encodings and decodings for each sample')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of samples, the best one is reported')
+    args = parser.parse_args()
+
+    bodies = workload.generate_bodies(args.batch_size, None, args.seed)
+    batch = local_crontab_service.convert_batch(bodies)
+    # Conversions in timezones with DST have several crons
+    single = max((item['crons'] for item in batch if 'crons' in item), key=len)
+
+    cases = (
+        ('single', single, json.dumps, compact_format.encode, json.loads, json_with_crons, compact_format.decode),
+        (f'batch of {len(batch)}', batch, json.dumps, compact_format.encode_batch, json.loads, json_batch_with_crons,
+         compact_format.decode_batch),
+    )
+    for name, body, json_encode, compact_encode, json_decode, json_parse, compact_decode in cases:
+        json_body, compact_body = json_encode(body).encode('utf-8'), compact_encode(body)
+        print(f'{name} body:')
+        print(f'  size bytes      json {len(json_body):7d} (gzip {len(gzip.compress(json_body)):6d})   '
+              f'bitmask {len(compact_body):7d} (gzip {len(gzip.compress(compact_body)):6d})')
+        timings = (
+            ('encode json', lambda: json_encode(body)),
+            ('encode bitmask', lambda: compact_encode(body)),
+            ('decode json', lambda: json_decode(json_body)),
+            ('decode json + crons', lambda: json_parse(json_body)),
+            ('decode bitmask', lambda: compact_decode(compact_body)),
+        )
+        for label, run in timings:
+            best = min(timeit.repeat(run, number=args.number, repeat=args.repeat))
+            print(f'  {label:<20} {best / args.number * 1e6:9.2f} µs')
+
+
+if __name__ == '__main__':
+    main()
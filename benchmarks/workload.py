@@ -0,0 +1,103 @@
+"""Synthetic workload for the benchmarks: API Gateway events with many timezones and cron shapes.
+
+Events are built on top of the bundled apigateway-event-example.json, so they go through the same
+parsing path of a real API Gateway request.
+"""
+import copy
+import json
+import os
+import random
+import sys
+from typing import Dict, Iterator, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(ROOT_DIR, 'lambda')
+EVENT_FILE = os.path.join(ROOT_DIR, 'apigateway-event-example.json')
+
+if LAMBDA_DIR not in sys.path:
+    sys.path.insert(0, LAMBDA_DIR)
+
+TIMEZONES = [
+    'UTC', 'Europe/Rome', 'Europe/London', 'Europe/Berlin', 'Europe/Paris', 'Europe/Madrid', 'Europe/Moscow',
+    'America/New_York', 'America/Chicago', 'America/Denver', 'America/Los_Angeles', 'America/Sao_Paulo',
+    'America/Mexico_City', 'America/Toronto', 'America/St_Johns', 'Asia/Tokyo', 'Asia/Shanghai', 'Asia/Kolkata',
+    'Asia/Singapore', 'Asia/Dubai', 'Asia/Kathmandu', 'Australia/Sydney', 'Australia/Adelaide',
+    'Australia/Lord_Howe', 'Pacific/Auckland', 'Pacific/Chatham', 'Africa/Cairo', 'Africa/Johannesburg',
+    'Africa/Casablanca', 'America/Santiago',
+]
+
+# Cron shapes, filled with random values by `random_cron`
+CRON_SHAPES = [
+    '{minute} {hour} * * *',
+    '{minute} {hour} * * 1-5',
+    '{minute} {hour},{hour2} * * *',
+    '{minute} {hour} {day} * *',
+    '{minute} {hour} 1,15 * *',
+    '{minute} {hour} * {month} *',
+    '*/{step} {hour}-{hour2} * * *',
+    '{minute} */{hour_step} * * *',
+    '{minute} * * * *',
+    '*/5 * * * *',
+    '{minute} {hour} * * MON-FRI',
+    '0 {hour} {day} {month} *',
+]
+
+
+def load_example_event() -> Dict:
+    """Return the bundled API Gateway event."""
+    with open(EVENT_FILE) as file:
+        return json.load(file)
+
+
+def random_cron(rng: random.Random) -> str:
+    """Return a random cron, from one of the `CRON_SHAPES`."""
+    hour, hour2 = sorted(rng.sample(range(24), 2))
+    return rng.choice(CRON_SHAPES).format(
+        minute=rng.randrange(60), hour=hour, hour2=hour2, day=rng.randint(1, 28), month=rng.randint(1, 12),
+        step=rng.choice([5, 10, 15, 20, 30]), hour_step=rng.choice([2, 3, 4, 6]))
+
+
+def generate_bodies(count: int, distinct: Optional[int] = None, seed: int = 0) -> List[Dict[str, str]]:
+    """Return `count` request bodies, drawn from `distinct` different (cron, timezone) pairs.
+
+    :param count: Number of bodies
+    :param distinct: Number of different pairs, like the few popular schedules of the real traffic. Default all
+    :param seed: Random seed, the same seed gives the same workload
+    """
+    rng = random.Random(seed)
+    pool_size = count if distinct is None else distinct
+    pool = [{'cron': random_cron(rng), 'timezone': rng.choice(TIMEZONES)} for _ in range(pool_size)]
+    if distinct is None:
+        return pool
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def make_event(base_event: Dict, body, resource: str = '/utc-crontab') -> Dict:
+    """Return a copy of the base event with a new JSON body and resource."""
+    event = copy.deepcopy(base_event)
+    event['resource'] = resource
+    event['body'] = json.dumps(body)
+    return event
+
+
+def make_events(bodies: List[Dict], batch_size: int = 0, base_event: Optional[Dict] = None) -> List[Dict]:
+    """Return the events for the bodies, grouped into batch requests of `batch_size` items if it is > 0."""
+    base_event = base_event if base_event is not None else load_example_event()
+    if batch_size <= 0:
+        return [make_event(base_event, body) for body in bodies]
+    return [make_event(base_event, {'items': bodies[start:start + batch_size]}, '/utc-crontab/batch')
+            for start in range(0, len(bodies), batch_size)]
+
+
+def read_events(path: str, base_event: Optional[Dict] = None) -> Iterator[Dict]:
+    """Read an NDJSON file, one full API Gateway event or one request body for each line."""
+    base_event = base_event if base_event is not None else load_example_event()
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'httpMethod' in record:
+                yield record
+            else:
+                yield make_event(base_event, record, '/utc-crontab/batch' if 'items' in record else '/utc-crontab')
@@ -1,71 +1,80 @@
-from typing import Dict, TypedDict, Optional, Union
-from collections import namedtuple
-import functools
-import inflection
-import base64
 import json
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 
 from .base_objects import Request
 
+_UNPARSED = object()
+_EMPTY: Mapping[str, str] = MappingProxyType(dict())
+
+
+def _to_mapping(params: Optional[Dict], lowercase: bool = False) -> Mapping[str, str]:
+    """Return a read-only view of params, empty if API Gateway sent None.
+
+    :param params: Headers, path or query parameters of the event
+    :param lowercase: Lowercase the keys, header names are case insensitive. eg -> 'accept-encoding'
+    """
+    if not params:
+        return _EMPTY
+    if lowercase:
+        params = {key.lower(): value for key, value in params.items()}
+    return MappingProxyType(params)
+
 
 class APIGatewayRequest(Request):
-    """API Gateway Request object. Input event already deserialized"""
+    """API Gateway Request object. Input event already deserialized.
+    Fields are read from the event only when accessed, and parsed at most once."""
+
+    __slots__ = ('_body', '_headers', '_path', '_query')
 
     def __init__(self, event, context):
         super().__init__(event, context)
-        if event.get('isBase64Encoded', False):
-            self._body_binary = base64.b64decode(event.get('body', None))
-            self._body = json.loads(self._body_binary.decode(encoding="utf-8", errors="strict"))
-        else:
-            self._body = event.get('body', None)
-        self._http_method = event.get('httpMethod', 'GET')
-        self._resource = event.get('resource')
-        self._path_parameters = event.get('pathParameters', {})
-        self._query_parameters = event.get('queryStringParameters', {})
-        self._request_context = event.get('requestContext', {})
-        self._headers = event.get('headers', {})
+        self._body = _UNPARSED
+        self._headers = None
+        self._path = None
+        self._query = None
 
-    @functools.cached_property
+    @property
     def body(self):
-        """Return body. The output is the same as the input type"""
-        return self._body  # None if nothing from ApiGateway
+        """Return body. The output is the same as the input type, a binary body is decoded from JSON"""
+        if self._body is _UNPARSED:
+            event = self.event
+            if event.get('isBase64Encoded', False):
+                import base64
+                body_binary = base64.b64decode(event.get('body', None))
+                self._body = json.loads(body_binary.decode(encoding="utf-8", errors="strict"))
+            else:
+                self._body = event.get('body', None)  # None if nothing from ApiGateway
+        return self._body
 
-    @functools.cached_property
+    @property
     def headers(self):
-        """Return request headers as namedtuple."""
-        payload = {inflection.underscore(k): v for k, v, in self._headers.items()}
-        HeadersTuple = namedtuple('HeadersTuple', sorted(payload))
-        the_tuple = HeadersTuple(**payload)
-        return the_tuple
+        """Return request headers as a read-only mapping with lowercase names. eg -> headers.get('if-none-match')"""
+        if self._headers is None:
+            self._headers = _to_mapping(self.event.get('headers'), lowercase=True)
+        return self._headers
 
-    @functools.cached_property
+    @property
     def http(self):
-        """Return request http method as namedtuple."""
-        return str(self._http_method)
+        """Return request http method."""
+        return str(self.event.get('httpMethod', 'GET'))
 
-    @functools.cached_property
+    @property
     def resource(self):
-        """Return request http method as namedtuple."""
-        return str(self._resource)
+        """Return request resource."""
+        return str(self.event.get('resource'))
 
-    @functools.cached_property
+    @property
     def path(self):
-        """Return request path parameters as namedtuple."""
-        if bool(self._path_parameters):
-            payload = {inflection.underscore(k): v for k, v, in self._path_parameters.items()}
-        else:
-            payload = dict()
-        PathTuple = namedtuple('PathTuple', sorted(payload))
-        the_tuple = PathTuple(**payload)
-        return the_tuple
+        """Return request path parameters as a read-only mapping."""
+        if self._path is None:
+            self._path = _to_mapping(self.event.get('pathParameters'))
+        return self._path
 
-    @functools.cached_property
+    @property
     def query(self):
-        """Return request query string as namedtuple."""
-        if bool(self._query_parameters):  # ApiGateway set key value None in case of absence params, not an empty dict
-            payload = {inflection.underscore(k): v for k, v, in self._query_parameters.items()}
-        else:
-            payload = dict()
-        QueryTuple = namedtuple('QueryTuple', sorted(payload))
-        the_tuple = QueryTuple(**payload)
-        return the_tuple
+        """Return request query string as a read-only mapping."""
+        if self._query is None:
+            # ApiGateway set key value None in case of absence params, not an empty dict
+            self._query = _to_mapping(self.event.get('queryStringParameters'))
+        return self._query
@@ -1,8 +1,35 @@
-from typing import Dict, List, TypedDict, ClassVar, Any, Optional
+import json
+from typing import Any, Dict, Optional
 
 from .http_status_constants import HttpStatusCode
 from .base_objects import Response
 
+BASE_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'X-Server': 'AWS λ'
+}
+
+
+def build_response(status_code: HttpStatusCode = HttpStatusCode.HTTP_STATUS_OK, body: Any = None,
+                   headers: Optional[Dict] = None, is_base64_encoded: bool = False,
+                   serialized: bool = False) -> Dict[str, Any]:
+    """Assemble the final API Gateway proxy response dict, with the body encoded to JSON only once.
+    It is the fast path of `APIGatewayResponse(...).serialized` followed by a `json.dumps` of its body.
+
+    :param status_code: Response status code
+    :param body: Response body. It is encoded to JSON, unless `serialized` is set
+    :param headers: Extra headers, merged on top of the base ones
+    :param is_base64_encoded: The body is a base64 string
+    :param serialized: The body is already a string (JSON or base64) and it is used as is
+    :return: API Gateway proxy response
+    """
+    return {
+        'body': body if serialized else json.dumps(body),
+        'headers': {**BASE_HEADERS, **headers} if headers else BASE_HEADERS.copy(),
+        'statusCode': int(status_code),
+        'isBase64Encoded': is_base64_encoded
+    }
+
 
 class APIGatewayResponse(Response):
     def __init__(self, status_code: HttpStatusCode = HttpStatusCode.HTTP_STATUS_OK, body: Any = None,
@@ -17,10 +44,7 @@ class APIGatewayResponse(Response):
                         'headers': 'headers',
                         'body': 'body'}
 
-        self._base_headers = {
-            'Access-Control-Allow-Origin': '*',
-            'X-Server': 'AWS λ'
-        }
+        self._base_headers = BASE_HEADERS
 
         if headers and not isinstance(headers, dict):
             raise ValueError('Headers value must be dict.')
@@ -6,6 +6,8 @@ from collections.abc import MutableMapping
 class Request:
     """Base Request."""
 
+    __slots__ = ('__event', '__context')
+
     def __init__(self, event, context):
         """Initialize the request."""
         self.__event = event
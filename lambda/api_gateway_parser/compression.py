@@ -0,0 +1,83 @@
+"""Response compression negotiated with the request `Accept-Encoding` header.
+
+API Gateway decodes a base64 response body into binary before sending it to the client,
+as long as the request Accept header matches one of the API binary media types.
+Brotli is used only when the optional `brotli` package is installed.
+"""
+import functools
+from typing import Any, Dict, Optional
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+@functools.lru_cache(maxsize=None)
+def _brotli():
+    """Return the brotli module, None if it is not installed. Imported on first use only."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Return the best supported encoding accepted by the client.
+
+    :param accept_encoding: Accept-Encoding header value. eg -> 'gzip, deflate, br;q=0.9'
+    :return: 'br', 'gzip' or None if the client does not accept any of them
+    """
+    if not accept_encoding:
+        return None
+    supported = ('br', 'gzip') if _brotli() else ('gzip',)
+    qualities = dict()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        qualities[coding] = max(quality, qualities.get(coding, 0.0))
+    best, best_quality = None, 0.0
+    # Server preference (br before gzip) breaks ties, '*' covers only the codings not listed explicitly
+    for coding in supported:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress_response(response: Dict[str, Any], accept_encoding: Optional[str]) -> Dict[str, Any]:
+    """Compress the body of an API Gateway proxy response, if the client accepts a supported encoding.
+    The body is base64 encoded and `Content-Encoding` is set. Nothing changes when compression does not help.
+
+    :param response: API Gateway proxy response, with a text body
+    :param accept_encoding: Accept-Encoding header value of the request
+    :return: The same response, compressed in place
+    """
+    if response.get('isBase64Encoded') or not isinstance(response.get('body'), str):
+        return response
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    body = response['body'].encode('utf-8')
+    if encoding == 'br':
+        compressed = _brotli().compress(body, quality=BROTLI_QUALITY)
+    else:
+        import gzip
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    if len(compressed) >= len(body):
+        return response
+
+    import base64
+    response['body'] = base64.b64encode(compressed).decode('ascii')
+    response['isBase64Encoded'] = True
+    headers = response.get('headers', {})
+    vary = f"{headers['Vary']}, Accept-Encoding" if headers.get('Vary') else 'Accept-Encoding'
+    response['headers'] = {**headers, 'Content-Encoding': encoding, 'Vary': vary}
+    return response
@@ -0,0 +1,35 @@
+"""Conditional requests: entity tags and the `If-None-Match` request header (RFC 7232).
+
+Tags are weak: compressed and uncompressed bodies of the same result are equivalent, so they share the tag.
+"""
+from typing import Optional
+
+
+def make_etag(*parts: str) -> str:
+    """Return a weak entity tag derived from the parts that determine the content of a response.
+
+    :param parts: eg -> ('2024a', '0 10 * * *', 'Europe/Rome', '2026')
+    :return: Quoted weak tag. eg -> 'W/"8c1d5a3e9f0b2c4d6e7f"'
+    """
+    import hashlib
+
+    digest = hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=10).hexdigest()
+    return f'W/"{digest}"'
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """Return True if the `If-None-Match` header matches the tag, with the weak comparison.
+
+    :param header: If-None-Match header value. eg -> 'W/"8c1d5a3e9f0b2c4d6e7f", "a1b2"' or '*'
+    :param etag: Entity tag of the current content
+    """
+    if not header:
+        return False
+    opaque_tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == opaque_tag:
+            return True
+    return False
@@ -4,6 +4,7 @@ from enum import IntEnum
 class HttpStatusCode(IntEnum):
     """ Http Status Codes """
     HTTP_STATUS_OK = 200  # The request has succeeded
+    HTTP_STATUS_NOT_MODIFIED = 304  # The client already has the current representation, the body is empty.
     HTTP_STATUS_BAD_REQUEST = 400  # This response means that server could not understand the request due to invalid syntax.
     HTTP_STATUS_UNAUTHORIZED = 401  # The client must authenticate itself to get the requested response.
     HTTP_STATUS_FORBIDDEN = 403  # The client does not have access rights to the content, i.e. they are unauthorized.
@@ -0,0 +1,33 @@
+"""Decorator to deserialize JSON bodies of API Gateway proxy events.
+
+Same behaviour of `load_json_body` from the lambda_decorators package,
+which imports boto3 at module load and slows down every cold start.
+"""
+import json
+from functools import wraps
+
+
+def load_json_body(**json_loads_kwargs):
+    """
+    Automatically deserialize the event body with json.loads.
+    A base64 encoded body, sent by API Gateway when the content type is a binary media type, is decoded first.
+    Returns a 400 BAD REQUEST if the body can not be parsed.
+
+    :param json_loads_kwargs: keyword arguments for json.loads
+    """
+    def wrapper_wrapper(handler):
+        @wraps(handler)
+        def wrapper(event, context, *args, **kwargs):
+            if isinstance(event.get('body'), str):
+                try:
+                    if event.get('isBase64Encoded', False):
+                        import base64
+                        event['body'] = base64.b64decode(event['body']).decode('utf-8')
+                        event['isBase64Encoded'] = False
+                    event['body'] = json.loads(event['body'], **json_loads_kwargs)
+                except Exception:
+                    return {'statusCode': 400, 'body': 'BAD REQUEST'}
+            return handler(event, context, *args, **kwargs)
+        return wrapper
+    return wrapper_wrapper
+
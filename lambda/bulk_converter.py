@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Multi-process conversion of very large sets of (cron, timezone) pairs, for offline bulk migrations.
+
+Input is sharded in chunks over a pool of processes, each one running the service `convert` with its own caches.
+Identical pairs (after cron normalization) are converted only once, results are streamed back in input order
+and the number of chunks in flight is bounded, so memory grows only with the number of distinct pairs.
+
+Usage:
+    python lambda/bulk_converter.py [--workers 8] [--chunk-size 256] < pairs.ndjson > results.ndjson
+
+Each input line is a JSON object like {"cron": "0 10 * * *", "timezone": "Europe/Rome"}, each output line is the
+same object with the "crons" list or an error "message", like the items of the batch endpoint. An "id" of the
+input object is copied to the output, see schedule_plan.py.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cron_normalizer import normalize_cron
+
+DEFAULT_CHUNK_SIZE = 256
+# Result of a single conversion: (crons, None) on success, (None, error message) on failure
+Conversion = Tuple[Optional[List[str]], Optional[str]]
+
+
+def _convert_chunk(pairs: List[Tuple[str, str]]) -> List[Conversion]:
+    """Convert a chunk of pairs. It runs in the worker processes."""
+    from local_crontab_service import convert
+
+    results = []
+    for cron, timezone in pairs:
+        try:
+            results.append((convert(cron, timezone), None))
+        except Exception as ex:
+            results.append((None, str(ex)))
+    return results
+
+
+def _pair_key(item: Dict) -> Optional[Tuple[str, str]]:
+    """Return the deduplication key of an input item, None if the item is malformed."""
+    cron = item.get('cron') if isinstance(item, dict) else None
+    timezone = item.get('timezone') if isinstance(item, dict) else None
+    if not isinstance(cron, str) or not isinstance(timezone, str):
+        return None
+    return normalize_cron(cron), timezone
+
+
+def _result(item: Dict, conversion: Optional[Conversion]) -> Dict:
+    """Return the output record of an input item, in the same format of the batch endpoint items."""
+    result = {'cron': item.get('cron') if isinstance(item, dict) else None,
+              'timezone': item.get('timezone') if isinstance(item, dict) else None}
+    if isinstance(item, dict) and 'id' in item:
+        result['id'] = item['id']
+    if conversion is None:
+        result['message'] = 'item must contain the strings "cron" and "timezone"'
+    elif conversion[1] is not None:
+        result['message'] = conversion[1]
+    else:
+        result['crons'] = conversion[0]
+    return result
+
+
+def convert_many(items: Iterable[Dict], workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """Convert many (cron, timezone) items over a process pool, yielding results in input order.
+
+    :param items: Iterable of dicts with 'cron' and 'timezone', it is read lazily
+    :param workers: Number of worker processes. Default is the number of CPUs, 0 converts in this process
+    :param chunk_size: Number of input items read for each chunk sent to a worker
+    :return: Iterator of results, like the items of the batch endpoint
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    max_pending = 2 * max(workers, 1)
+    items = iter(items)
+    # Conversions of the keys already dispatched, shared by all the following duplicates
+    conversions: Dict[Tuple[str, str], Conversion] = dict()
+    pending: deque = deque()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        while True:
+            window = list(islice(items, chunk_size))
+            if window:
+                keys = [_pair_key(item) for item in window]
+                new_keys = list(dict.fromkeys(key for key in keys if key is not None and key not in conversions))
+                for key in new_keys:
+                    conversions[key] = None  # dispatched, result not ready yet
+                if executor is None:
+                    future = Future()
+                    future.set_result(_convert_chunk(new_keys))
+                else:
+                    future = executor.submit(_convert_chunk, new_keys)
+                pending.append((window, keys, new_keys, future))
+            # Keep a bounded number of chunks in flight, wait the oldest one when the limit is reached
+            if window and len(pending) < max_pending:
+                continue
+            if not pending:
+                break
+            window_items, window_keys, dispatched_keys, future = pending.popleft()
+            conversions.update(zip(dispatched_keys, future.result()))
+            for item, key in zip(window_items, window_keys):
+                yield _result(item, conversions[key] if key is not None else None)
+    finally:
+        if executor is not None:
+            for _, _, _, future in pending:
+                future.cancel()
+            executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes, 0 to convert in process')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Items of each chunk')
+    args = parser.parse_args()
+
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    items = (json.loads(line) for line in sys.stdin if line.strip())
+    for result in convert_many(items, args.workers, args.chunk_size):
+        sys.stdout.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""Compact binary format of conversion results, for machine clients, selected with the `Accept` header.
+
+Every UTC cron is stored as per-field bitmasks instead of text, so clients get the sets of minutes, hours, days,
+months and weekdays they evaluate, without parsing crons. Integers are unsigned LEB128 varints.
+
+Layout:
+ - cron: one byte of flags, then one varint for every field that is not '*': value * 2 + 1 for a single value,
+   else bitmask * 2, bit 0 of the bitmask being the minimum of the field. Bit i of the flags is set if field i of
+   CRON_FIELDS is '*', bits 5 and 6 if the day of month and weekday fields start with '*' without being '*',
+   like '*/2'. Cron ORs the two day fields only when neither starts with '*', so '*/2' and '1-31/2' differ.
+ - single conversion: varint number of crons, then the crons
+ - batch: varint number of items, then for every item, in input order, a tag byte: ITEM_CRONS followed by a single
+   conversion, or ITEM_ERROR followed by the varint length and the UTF-8 message. Inputs are not repeated.
+
+Crons take less than half the bytes of JSON, see benchmarks/response_formats.py, and need no parsing.
+"""
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from cron_normalizer import CRON_FIELDS, CronNormalizationError, expand_field, render_field
+
+MEDIA_TYPE = 'application/x-crontab-bitmask'
+ITEM_CRONS = 0
+ITEM_ERROR = 1
+# Flag bit of the day fields starting with '*' without being '*', by field position
+_STARRED_FLAGS = {2: 5, 4: 6}
+_WILDCARD_FLAGS = (1 << len(CRON_FIELDS)) - 1
+
+
+class CronMasks(NamedTuple):
+    """Bitmasks of the fields of a cron, bit 0 being the minimum of the field.
+
+    Attributes:
+        masks (tuple): One bitmask for each of CRON_FIELDS, the full range for '*'
+        wildcards (int): Bit i set if field i is '*', or for the day of month and weekday fields starts with '*'
+    """
+    masks: Tuple[int, ...]
+    wildcards: int
+
+    def to_cron(self) -> str:
+        """Return the crontab string. eg -> '0 9 1-28 3 *'"""
+        parts = []
+        for position, (mask, field) in enumerate(zip(self.masks, CRON_FIELDS)):
+            span = field.max - field.min + 1
+            values = sorted(field.min + bit for bit in range(span) if mask >> bit & 1)
+            if self.wildcards >> position & 1:
+                parts.append(_render_starred(values, field))
+                continue
+            part = render_field(set(values), field)
+            # A full range is not '*', nor a step of it in the day fields. eg -> '1-31', '1-31/2'
+            if part == '*' or (part.startswith('*') and position in _STARRED_FLAGS):
+                part = f'{field.min}-{field.max}{part[1:]}'
+            parts.append(part)
+        return ' '.join(parts)
+
+
+def _render_starred(values: List[int], field) -> str:
+    """Render the values of a field starting with '*', they always include the minimum. eg -> '*', '*/2'"""
+    span = field.max - field.min + 1
+    step = values[1] - values[0] if len(values) > 1 else span
+    if values == list(range(field.min, field.max + 1, step)):
+        return '*' if step == 1 else f'*/{step}'
+    # eg: '*/2,6', '*/span' only matches the minimum
+    return f'*/{span},{render_field(set(values[1:]), field)}'
+
+
+_FULL_MASKS = tuple((1 << (field.max - field.min + 1)) - 1 for field in CRON_FIELDS)
+
+
+def _encode_varint(value: int, output: bytearray) -> None:
+    while value > 0x7F:
+        output.append(value & 0x7F | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def _decode_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+@lru_cache(maxsize=4096)
+def encode_cron(cron: str) -> bytes:
+    """Return the bitmask encoding of a single cron. The same UTC crons come back often, so results are cached.
+
+    :param cron: UTC crontab string. eg -> '0 9 1-28 3 *'
+    :raises CronNormalizationError: the crontab string can not be parsed
+    """
+    parts = cron.split()
+    if len(parts) != len(CRON_FIELDS):
+        raise CronNormalizationError(f"Expected {len(CRON_FIELDS)} fields, got {len(parts)}")
+    flags = 0
+    output = bytearray(1)
+    for position, (part, field) in enumerate(zip(parts, CRON_FIELDS)):
+        if part == '*':
+            flags |= 1 << position
+            continue
+        values = expand_field(part, field)
+        if part.startswith('*') and position in _STARRED_FLAGS:
+            if len(values) == field.max - field.min + 1:
+                flags |= 1 << position  # eg: '*/1'
+                continue
+            flags |= 1 << _STARRED_FLAGS[position]
+        if len(values) == 1:
+            _encode_varint(values[0] << 1 | 1, output)
+            continue
+        mask = 0
+        for value in values:
+            mask |= 1 << (value - field.min)
+        _encode_varint(mask << 1, output)
+    output[0] = flags
+    return bytes(output)
+
+
+def _encode_crons(crons: List[str], output: bytearray) -> None:
+    _encode_varint(len(crons), output)
+    for cron in crons:
+        output += encode_cron(cron)
+
+
+def encode(crons: List[str]) -> bytes:
+    """Return the encoding of a single conversion.
+
+    :param crons: UTC crontab strings
+    """
+    output = bytearray()
+    _encode_crons(crons, output)
+    return bytes(output)
+
+
+def encode_batch(results: List[Dict]) -> bytes:
+    """Return the encoding of a batch conversion.
+
+    :param results: Batch results, with 'crons' or 'message'. eg -> [{"cron": ..., "crons": ["0 9 * * *"]}]
+    """
+    output = bytearray()
+    _encode_varint(len(results), output)
+    for result in results:
+        if 'crons' in result:
+            output.append(ITEM_CRONS)
+            _encode_crons(result['crons'], output)
+        else:
+            message = str(result.get('message')).encode('utf-8')
+            output.append(ITEM_ERROR)
+            _encode_varint(len(message), output)
+            output += message
+    return bytes(output)
+
+
+def _decode_crons(data: bytes, position: int) -> Tuple[List[CronMasks], int]:
+    count, position = _decode_varint(data, position)
+    crons = []
+    for _ in range(count):
+        flags = data[position]
+        position += 1
+        masks = []
+        for field_position, (full_mask, field) in enumerate(zip(_FULL_MASKS, CRON_FIELDS)):
+            if flags >> field_position & 1:
+                masks.append(full_mask)
+                continue
+            encoded, position = _decode_varint(data, position)
+            masks.append(1 << ((encoded >> 1) - field.min) if encoded & 1 else encoded >> 1)
+        wildcards = flags & _WILDCARD_FLAGS
+        for field_position, flag in _STARRED_FLAGS.items():
+            if flags >> flag & 1:
+                wildcards |= 1 << field_position
+        crons.append(CronMasks(tuple(masks), wildcards))
+    return crons, position
+
+
+def decode(data: bytes) -> List[CronMasks]:
+    """Return the crons of a single conversion, as bitmasks. `CronMasks.to_cron` renders them as strings."""
+    crons, _ = _decode_crons(data, 0)
+    return crons
+
+
+def decode_batch(data: bytes) -> List[Union[List[CronMasks], str]]:
+    """Return the results of a batch conversion, in input order: crons as bitmasks, or the error message."""
+    count, position = _decode_varint(data, 0)
+    results: List[Union[List[CronMasks], str]] = []
+    for _ in range(count):
+        tag = data[position]
+        position += 1
+        if tag == ITEM_CRONS:
+            crons, position = _decode_crons(data, position)
+            results.append(crons)
+        else:
+            length, position = _decode_varint(data, position)
+            results.append(data[position:position + length].decode('utf-8'))
+            position += length
+    return results
+
+
+def accepts_compact(accept: Optional[str]) -> bool:
+    """Return True if the `Accept` header prefers MEDIA_TYPE to JSON.
+
+    :param accept: Accept header value. eg -> 'application/x-crontab-bitmask, application/json;q=0.5'
+    """
+    if not accept or MEDIA_TYPE not in accept:
+        return False
+    compact_quality = json_quality = 0.0
+    for item in accept.split(','):
+        media_type, _, params = item.strip().partition(';')
+        media_type = media_type.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        if media_type == MEDIA_TYPE:
+            compact_quality = max(compact_quality, quality)
+        elif media_type in ('application/json', 'application/*', '*/*'):
+            json_quality = max(json_quality, quality)
+    return compact_quality > 0 and compact_quality >= json_quality
@@ -0,0 +1,66 @@
+"""In-process cache for crontab conversion results."""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry when it is full.
+
+    It lives as long as the Lambda container, so warm invocations can skip repeated conversions.
+    It is thread safe, so the self-hosted server can share it among its workers.
+
+    Attributes:
+        max_size (int): Maximum number of entries kept. 0 disables the cache.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups not found in the cache.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size < 0:
+            raise ValueError('Cache max size must be >= 0.')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._store: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss. A hit marks the entry as the most recently used."""
+        with self._lock:
+            try:
+                value = self._store[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if the cache is full."""
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._store[key] = value
+            self._store.move_to_end(key)
+            if len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters, useful for logging."""
+        return {'size': len(self._store), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses}
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._store
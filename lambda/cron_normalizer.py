@@ -0,0 +1,166 @@
+"""Normalization of crontab strings into a canonical form.
+
+Equivalent schedules written in different ways, eg: "0 10 * * *", "0  10 * * *" and "00 10 * * MON-SUN",
+produce the same canonical string, so caching and deduplication layers can key on it.
+"""
+from typing import List, NamedTuple, Optional, Set
+
+
+class CronField(NamedTuple):
+    """Bounds and textual aliases of a single crontab field."""
+    name: str
+    min: int
+    max: int
+    alt: Optional[List[str]] = None
+
+
+CRON_FIELDS = (
+    CronField('minute', 0, 59),
+    CronField('hour', 0, 23),
+    CronField('day', 1, 31),
+    CronField('month', 1, 12, ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+                               'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']),
+    CronField('weekday', 0, 6, ['SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT']),
+)
+
+
+class CronNormalizationError(ValueError):
+    """Raised when a crontab part can not be parsed"""
+    pass
+
+
+def _parse_value(token: str, field: CronField) -> int:
+    """Return the numeric value of a single field token, mapping month and weekday names to numbers.
+
+    :param token: The value as string. eg -> '05', 'jan', 'SUN'
+    :param field: The crontab field the token belongs to
+    :return: The numeric value
+    """
+    if field.alt and token.upper() in field.alt:
+        return field.alt.index(token.upper()) + field.min
+    if not token.isdigit():
+        raise CronNormalizationError(f"Invalid value '{token}' for '{field.name}'")
+    return int(token)
+
+
+def _expand_field(part: str, field: CronField) -> Set[int]:
+    """Expand a crontab field into the set of values it matches.
+
+    :param part: The crontab field. eg -> '*/15', '1-5', 'MON,WED-FRI'
+    :param field: The crontab field definition
+    :return: Set of matched values
+    """
+    # 7 is an alias of Sunday
+    field_max = 7 if field.name == 'weekday' else field.max
+    values = set()
+    for item in part.split(','):
+        range_part, _, step_part = item.partition('/')
+        step = 1
+        if step_part:
+            if not step_part.isdigit() or int(step_part) == 0:
+                raise CronNormalizationError(f"Invalid step '{step_part}' for '{field.name}'")
+            step = int(step_part)
+        if range_part == '*':
+            start, end = field.min, field.max
+        elif '-' in range_part:
+            start_part, _, end_part = range_part.partition('-')
+            start = _parse_value(start_part, field)
+            end = _parse_value(end_part, field)
+            # Sunday closing a range is 7, eg -> 'MON-SUN' = 1-7
+            if field.name == 'weekday' and end == 0 and start > end:
+                end = 7
+        elif step_part:
+            # 'a/n' is read differently by every cron implementation, leave it untouched
+            raise CronNormalizationError(f"Ambiguous step '{item}' for '{field.name}'")
+        else:
+            start = end = _parse_value(range_part, field)
+        if start < field.min or end > field_max or start > end:
+            raise CronNormalizationError(f"Invalid range '{range_part}' for '{field.name}'")
+        values.update(range(start, end + 1, step))
+    if field.name == 'weekday' and 7 in values:
+        values.discard(7)
+        values.add(0)
+    return values
+
+
+def _render_field(values: Set[int], field: CronField) -> str:
+    """Render a set of values as the shortest canonical crontab field.
+
+    :param values: Values matched by the field
+    :param field: The crontab field definition
+    :return: The canonical field. eg -> '*', '*/15', '1-5', '1,3-4'
+    """
+    ordered = sorted(values)
+    if len(ordered) == field.max - field.min + 1:
+        return '*'
+    # Regular steps, eg: 0,15,30,45 -> */15
+    if len(ordered) > 2:
+        step = ordered[1] - ordered[0]
+        if step > 1 and all(b - a == step for a, b in zip(ordered, ordered[1:])):
+            if ordered[0] == field.min and ordered[-1] + step > field.max:
+                return f'*/{step}'
+            return f'{ordered[0]}-{ordered[-1]}/{step}'
+    # Consecutive runs, eg: 1,2,3,5 -> 1-3,5
+    chunks = []
+    run_start = previous = ordered[0]
+    for value in ordered[1:] + [None]:
+        if value is not None and value == previous + 1:
+            previous = value
+            continue
+        chunks.append(str(run_start) if run_start == previous else f'{run_start}-{previous}')
+        run_start = previous = value
+    return ','.join(chunks)
+
+
+def expand_field(part: str, field: CronField) -> List[int]:
+    """Return the sorted values matched by a single crontab field, Sunday is always 0.
+
+    :param part: The crontab field. eg -> '*/15', '1-5', 'MON,WED-FRI'
+    :param field: The crontab field definition
+    :return: Sorted matched values
+    :raises CronNormalizationError: the field can not be parsed
+    """
+    return sorted(_expand_field(part, field))
+
+
+def render_field(values: Set[int], field: CronField) -> str:
+    """Return the shortest canonical crontab field of a non empty set of values.
+
+    :param values: Values matched by the field
+    :param field: The crontab field definition
+    :return: The canonical field. eg -> '*', '*/15', '1-5', '1,3-4'
+    """
+    return _render_field(values, field)
+
+
+def expand_cron(cron: str) -> List[List[int]]:
+    """Return the sorted values matched by each field of a crontab string, Sunday is always 0.
+
+    :param cron: The crontab string. eg -> '*/15 9-17 * * MON-FRI'
+    :return: One list of values for each of CRON_FIELDS
+    :raises CronNormalizationError: the crontab string can not be parsed
+    """
+    parts = cron.split()
+    if len(parts) != len(CRON_FIELDS):
+        raise CronNormalizationError(f"Expected {len(CRON_FIELDS)} fields, got {len(parts)}")
+    return [expand_field(part, field) for part, field in zip(parts, CRON_FIELDS)]
+
+
+def normalize_cron(cron: str) -> str:
+    """Return the canonical form of a crontab string.
+
+    Whitespaces are collapsed, month and weekday names are mapped to numbers, ranges and steps are canonicalized
+    and list items are deduplicated. A string that can not be parsed is returned with only whitespaces collapsed,
+    so the converter can report its own error.
+
+    :param cron: The crontab string. eg -> '00 10 * * MON-SUN'
+    :return: The canonical crontab string. eg -> '0 10 * * *'
+    """
+    parts = cron.split()
+    collapsed = ' '.join(parts)
+    if len(parts) != len(CRON_FIELDS):
+        return collapsed
+    try:
+        return ' '.join(_render_field(_expand_field(part, field), field) for part, field in zip(parts, CRON_FIELDS))
+    except CronNormalizationError:
+        return collapsed
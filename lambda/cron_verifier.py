@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""Reverse conversion of UTC crons to the local schedule they implement, and verification of stored conversions.
+
+Crons are compiled into field bitsets, then into day bitsets over a year: days are split into regions, the days
+matched by the same crons, and every region has a single day pattern, a 1440 bit int with bit `hour * 60 + minute`
+set if the crons fire at that minute. Between two DST transitions a UTC day is a fixed window of two local days,
+so a local schedule and its UTC crons are compared with a few big int operations for each pair of regions, not
+minute by minute. Only the UTC days that straddle a transition or the edges of the year are compared one by one.
+
+Offsets are the ones of the timezone index, the same `IndexedConverter` uses, so a fresh conversion verifies.
+The converter shifts only the hour field, so conversions of timezones whose offset is not made of whole hours,
+like Asia/Kathmandu, do not verify: their mismatches are real.
+
+Usage, to audit stored conversions:
+    python lambda/cron_verifier.py [--year 2026] [--max-mismatches 10] < results.ndjson > mismatched.ndjson
+
+Input lines are batch items with the local "cron", its "timezone" and the stored UTC "crons", like the output of
+bulk_converter.py. Output lines are the items that do not verify, with their "mismatches".
+"""
+import argparse
+import json
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from cron_converter import Cron
+
+from cron_normalizer import CRON_FIELDS, expand_cron, expand_field
+from timezone_index import HOURS_IN_DAY, YearOffsets, get_timezone_index
+
+MINUTES_IN_HOUR = 60
+MINUTES_IN_DAY = HOURS_IN_DAY * MINUTES_IN_HOUR
+DAY_MASK = (1 << MINUTES_IN_DAY) - 1
+HOUR_MASK = (1 << MINUTES_IN_HOUR) - 1
+# Day bitsets cover the year plus the day before and the day after it, day d is bit d + _BASE
+_BASE = 1
+
+# (days bitset, day pattern)
+Region = Tuple[int, int]
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    def _popcount(value: int) -> int:
+        return bin(value).count('1')
+
+
+class Mismatch(NamedTuple):
+    """UTC hours where the crons do not fire like the local schedule.
+
+    Attributes:
+        start (datetime): First UTC hour of the window, naive
+        end (datetime): End of the window, excluded
+        missing (int): Fires of the local schedule without a UTC fire
+        extra (int): UTC fires without a fire of the local schedule
+    """
+    start: datetime
+    end: datetime
+    missing: int
+    extra: int
+
+    def as_dict(self) -> Dict:
+        return {'start': self.start.isoformat() + 'Z', 'end': self.end.isoformat() + 'Z',
+                'missing': self.missing, 'extra': self.extra}
+
+
+class Verification(NamedTuple):
+    """Outcome of a verification.
+
+    Attributes:
+        cron (str): The local cron, None if the UTC crons never fire during the year
+        matches (bool): The UTC crons fire exactly like the local cron during the year
+        mismatches (list of Mismatch): Windows where they differ, in order
+        truncated (bool): Only the first windows are in `mismatches`
+    """
+    cron: Optional[str]
+    matches: bool
+    mismatches: List[Mismatch]
+    truncated: bool = False
+
+
+def _shift(bits: int, days: int) -> int:
+    """Move day d of a bitset to day d - days."""
+    return bits >> days if days >= 0 else bits << -days
+
+
+def _window(first: int, second: int, start: int) -> int:
+    """Return the day pattern starting `start` minutes after the start of `first`, `second` is the next day."""
+    if not start:
+        return first
+    return ((first | second << MINUTES_IN_DAY) >> start) & DAY_MASK
+
+
+def _iter_days(bits: int):
+    """Yield the days of a day bitset."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1 - _BASE
+        bits ^= low
+
+
+def _year_hours(year: int) -> int:
+    return (datetime(year + 1, 1, 1) - datetime(year, 1, 1)).days * HOURS_IN_DAY
+
+
+@lru_cache(maxsize=16)
+def _calendar(year: int) -> Tuple[int, Dict[int, List[int]]]:
+    """Return the bitset of every day of a year, and the day bitsets of every value of the day fields.
+
+    :return: (all the days, {field index: day bitset of every value}), for days of the month, months and weekdays
+    """
+    first_day = datetime(year, 1, 1) - timedelta(days=_BASE)
+    days = (datetime(year + 1, 1, 1) - first_day).days + 1
+    month_days, months, weekdays = [0] * 32, [0] * 13, [0] * 7
+    for position in range(days):
+        day = first_day + timedelta(days=position)
+        bit = 1 << position
+        month_days[day.day] |= bit
+        months[day.month] |= bit
+        weekdays[(day.weekday() + 1) % 7] |= bit  # cron weekdays start from Sunday = 0
+    return (1 << days) - 1, {2: month_days, 3: months, 4: weekdays}
+
+
+@lru_cache(maxsize=8192)
+def _part_days(year: int, field_index: int, part: str) -> int:
+    """Return the days of `year` matched by a day, month or weekday field."""
+    table = _calendar(year)[1][field_index]
+    bits = 0
+    for value in expand_field(part, CRON_FIELDS[field_index]):
+        bits |= table[value]
+    return bits
+
+
+@lru_cache(maxsize=8192)
+def _part_pattern(minute_part: str, hour_part: str) -> int:
+    """Return the day pattern of the minute and hour fields."""
+    minutes = 0
+    for minute in expand_field(minute_part, CRON_FIELDS[0]):
+        minutes |= 1 << minute
+    pattern = 0
+    for hour in expand_field(hour_part, CRON_FIELDS[1]):
+        pattern |= minutes << hour * MINUTES_IN_HOUR
+    return pattern
+
+
+class CronSet:
+    """Crons compiled into day regions of a year.
+
+    Attributes:
+        year (int): The compiled year, plus the day before and the day after it
+        regions (list of tuple): (days bitset, day pattern) of the days matched by the same crons
+    """
+
+    def __init__(self, crons: Sequence[str], year: int) -> None:
+        """
+        :param crons: Crontab strings
+        :param year: The year
+        :raises CronNormalizationError: a crontab string can not be parsed
+        """
+        self.year = year
+        all_days = _calendar(year)[0]
+        regions = {0: all_days}
+        for cron in crons:
+            parts = cron.split()
+            if len(parts) != len(CRON_FIELDS):
+                expand_cron(cron)  # raises the parsing error
+            month_days, weekdays = _part_days(year, 2, parts[2]), _part_days(year, 4, parts[4])
+            # Same rule of Vixie cron: a field starting with '*' does not restrict the other one
+            if not parts[2].startswith('*') and not parts[4].startswith('*'):
+                days = month_days | weekdays
+            else:
+                days = month_days & weekdays
+            days &= _part_days(year, 3, parts[3])
+            pattern = _part_pattern(parts[0], parts[1])
+            if not days or not pattern:
+                continue
+            # Split every region in the days matched by the cron and the other ones
+            split: Dict[int, int] = dict()
+            for region_pattern, region_days in regions.items():
+                matched = region_days & days
+                if matched:
+                    split[region_pattern | pattern] = split.get(region_pattern | pattern, 0) | matched
+                if region_days & ~days:
+                    split[region_pattern] = split.get(region_pattern, 0) | (region_days & ~days)
+            regions = split
+        self.regions: List[Region] = [(days, pattern) for pattern, days in regions.items()]
+
+    def pattern_at(self, day: int) -> int:
+        """Return the day pattern of a day, 0 is January 1st."""
+        bit = 1 << (day + _BASE)
+        for days, pattern in self.regions:
+            if days & bit:
+                return pattern
+        return 0
+
+
+class _Segment(NamedTuple):
+    """Local hours [start, end) of the year with the same offset, in minutes."""
+    start: int
+    end: int
+    offset: int
+
+
+def _segments(year_offsets: YearOffsets, hours: int) -> List[_Segment]:
+    ends = year_offsets.transitions[1:] + [hours]
+    return [_Segment(start, end, int(offset.total_seconds()) // 60)
+            for start, end, offset in zip(year_offsets.transitions, ends, year_offsets.offsets)]
+
+
+def _images(segments: List[_Segment]) -> List[Tuple[int, int]]:
+    """Return the UTC minutes [start, end) of the local hours of every segment, from the start of the year."""
+    return [(segment.start * MINUTES_IN_HOUR - segment.offset, segment.end * MINUTES_IN_HOUR - segment.offset)
+            for segment in segments]
+
+
+def _day_range(first: int, last: int) -> int:
+    """Return the bitset of the days [first, last]."""
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << (first + _BASE)
+
+
+def _local_minutes(local: CronSet, first: int, count: int) -> int:
+    """Return the fires of `count` local minutes from minute `first` of the year, as bits."""
+    first_day, last_day = first // MINUTES_IN_DAY, (first + count - 1) // MINUTES_IN_DAY
+    bits = 0
+    for day in range(first_day, last_day + 1):
+        bits |= local.pattern_at(day) << (day - first_day) * MINUTES_IN_DAY
+    return bits >> first - first_day * MINUTES_IN_DAY & (1 << count) - 1
+
+
+def _utc_day(local: CronSet, segments: List[_Segment], images: List[Tuple[int, int]], day: int) -> Tuple[int, int]:
+    """Return the pattern of the local fires of a UTC day, and the minutes of the day the local year reaches."""
+    expected = covered = 0
+    day_start = day * MINUTES_IN_DAY
+    for segment, (start, end) in zip(segments, images):
+        start, end = max(start, day_start), min(end, day_start + MINUTES_IN_DAY)
+        if start >= end:
+            continue
+        expected |= _local_minutes(local, start + segment.offset, end - start) << start - day_start
+        covered |= (1 << end - start) - 1 << start - day_start
+    return expected, covered
+
+
+def compare(local: CronSet, utc: CronSet, year_offsets: YearOffsets) -> List[Tuple[int, int, int]]:
+    """Compare the local fires of a year, turned into UTC, with the UTC fires.
+
+    :param local: Local crons of the year
+    :param utc: UTC crons of the same year
+    :param year_offsets: Offsets of the timezone in the year
+    :return: (UTC day, missing pattern, extra pattern) of every UTC day that differs, in order
+    """
+    year = local.year
+    hours = _year_hours(year)
+    segments = _segments(year_offsets, hours)
+    first_day = -segments[0].offset // MINUTES_IN_DAY
+    last_day = (hours * MINUTES_IN_HOUR - segments[-1].offset - 1) // MINUTES_IN_DAY
+    differences = dict()
+
+    def add(days: int, expected: int, actual: int) -> None:
+        for day in _iter_days(days):
+            differences[day] = (expected & ~actual, actual & ~expected)
+
+    # UTC days reached by a single segment: local days d + q and d + q + 1 shifted by s minutes, for every pair
+    # of regions. When the offset grows, two segments reach the same UTC day
+    images = _images(segments)
+    touched = [_day_range(start // MINUTES_IN_DAY, (end - 1) // MINUTES_IN_DAY) for start, end in images]
+    fast_days = 0
+    for position, (segment, (start, end)) in enumerate(zip(segments, images)):
+        fast = _day_range(-(-start // MINUTES_IN_DAY), (end - MINUTES_IN_DAY) // MINUTES_IN_DAY)
+        for other, other_touched in enumerate(touched):
+            if other != position:
+                fast &= ~other_touched
+        if not fast:
+            continue
+        fast_days |= fast
+        days_shift, minutes_shift = divmod(segment.offset, MINUTES_IN_DAY)
+        for first_days, first_pattern in local.regions:
+            first_days = _shift(first_days, days_shift) & fast
+            if not first_days:
+                continue
+            pairs = [(first_days, first_pattern)] if not minutes_shift else [
+                (first_days & _shift(second_days, days_shift + 1),
+                 _window(first_pattern, second_pattern, minutes_shift))
+                for second_days, second_pattern in local.regions]
+            for expected_days, expected in pairs:
+                if not expected_days:
+                    continue
+                for actual_days, actual in utc.regions:
+                    if expected != actual and expected_days & actual_days:
+                        add(expected_days & actual_days, expected, actual)
+
+    # UTC days with a transition or at the edges of the year, segment by segment
+    for day in _iter_days(_day_range(first_day, last_day) & ~fast_days):
+        expected, covered = _utc_day(local, segments, images, day)
+        actual = utc.pattern_at(day) & covered
+        if expected != actual:
+            differences[day] = (expected & ~actual, actual & ~expected)
+    return [(day,) + differences[day] for day in sorted(differences)]
+
+
+def _mismatches(year: int, differences: List[Tuple[int, int, int]], limit: Optional[int]) -> List[Mismatch]:
+    """Group the differing minutes into windows of consecutive UTC hours, up to `limit` windows plus one."""
+    first_day = datetime(year, 1, 1)
+    windows: List[List[int]] = []
+    for day, missing, extra in differences:
+        differing = missing | extra
+        while differing:
+            hour = ((differing & -differing).bit_length() - 1) // MINUTES_IN_HOUR
+            shift = hour * MINUTES_IN_HOUR
+            differing &= ~(HOUR_MASK << shift)
+            hour_missing = _popcount(missing >> shift & HOUR_MASK)
+            hour_extra = _popcount(extra >> shift & HOUR_MASK)
+            hour_index = day * HOURS_IN_DAY + hour
+            if windows and windows[-1][1] == hour_index:
+                windows[-1][1] += 1
+                windows[-1][2] += hour_missing
+                windows[-1][3] += hour_extra
+            elif limit is not None and len(windows) > limit:
+                break
+            else:
+                windows.append([hour_index, hour_index + 1, hour_missing, hour_extra])
+        if limit is not None and len(windows) > limit:
+            break
+    return [Mismatch(first_day + timedelta(hours=start), first_day + timedelta(hours=end), missing, extra)
+            for start, end, missing, extra in windows]
+
+
+def verify(utc_crons: Sequence[str], timezone: str, cron: Optional[str], year: Optional[int] = None,
+           limit: Optional[int] = None) -> Verification:
+    """Check that UTC crons fire exactly like a local cron during a year.
+
+    :param utc_crons: UTC crontab strings, eg: a stored result of `to_utc_crons()`
+    :param timezone: IANA timezone string of the local cron
+    :param cron: The local crontab string, None for a schedule that never fires
+    :param year: The year, default is the current year of the timezone
+    :param limit: Maximum number of mismatches returned, default is all of them
+    :return: The verification, mismatches are UTC windows
+    :raises CronNormalizationError: a crontab string can not be parsed
+    :raises WrongTimezoneError: the timezone string is not a valid one
+    """
+    timezone_index = get_timezone_index(timezone)
+    year = year or timezone_index.current_year()
+    local = CronSet([cron] if cron else [], year)
+    return _verification(cron, local, CronSet(utc_crons, year), timezone_index.year_offsets(year), limit)
+
+
+def _verification(cron: Optional[str], local: CronSet, utc: CronSet, year_offsets: YearOffsets,
+                  limit: Optional[int]) -> Verification:
+    mismatches = _mismatches(local.year, compare(local, utc, year_offsets), limit)
+    truncated = limit is not None and len(mismatches) > limit
+    return Verification(cron, not mismatches, mismatches[:limit] if truncated else mismatches, truncated)
+
+
+def _local_regions(utc: CronSet, year_offsets: YearOffsets) -> Tuple[List[Region], int]:
+    """Return the local day regions of the fires of UTC crons.
+
+    UTC minutes reached by two local hours, when the offset grows, can not tell which one of them the crons
+    implement: days with fires in those minutes are left out of the regions and returned apart.
+
+    :return: The regions, the bitset of the days left out
+    """
+    year = utc.year
+    hours = _year_hours(year)
+    segments = _segments(year_offsets, hours)
+    images = _images(segments)
+    regions = []
+    fast_days = uncertain_days = 0
+    for position, segment in enumerate(segments):
+        fast = _day_range(-(-segment.start // HOURS_IN_DAY), segment.end // HOURS_IN_DAY - 1)
+        for other, (start, end) in enumerate(images):
+            if other != position:
+                fast &= ~_day_range((start + segment.offset) // MINUTES_IN_DAY,
+                                    (end + segment.offset - 1) // MINUTES_IN_DAY)
+        if not fast:
+            continue
+        fast_days |= fast
+        # Local day d starts at minute -offset of UTC day d
+        days_shift, minutes_shift = divmod(-segment.offset, MINUTES_IN_DAY)
+        for first_days, first_pattern in utc.regions:
+            first_days = _shift(first_days, days_shift) & fast
+            if not first_days:
+                continue
+            if not minutes_shift:
+                regions.append((first_days, first_pattern))
+                continue
+            for second_days, second_pattern in utc.regions:
+                days = first_days & _shift(second_days, days_shift + 1)
+                if days:
+                    regions.append((days, _window(first_pattern, second_pattern, minutes_shift)))
+
+    # Local days with a transition, hour by hour
+    for day in _iter_days(_day_range(0, hours // HOURS_IN_DAY - 1) & ~fast_days):
+        pattern = 0
+        for hour in range(day * HOURS_IN_DAY, (day + 1) * HOURS_IN_DAY):
+            position = bisect_right(year_offsets.transitions, hour) - 1
+            start = hour * MINUTES_IN_HOUR - segments[position].offset
+            utc_day, minute = divmod(start, MINUTES_IN_DAY)
+            fires = _window(utc.pattern_at(utc_day), utc.pattern_at(utc_day + 1), minute) & HOUR_MASK
+            if fires and any(other != position and other_start < start + MINUTES_IN_HOUR and start < other_end
+                             for other, (other_start, other_end) in enumerate(images)):
+                uncertain_days |= 1 << day + _BASE
+                break
+            pattern |= fires << (hour - day * HOURS_IN_DAY) * MINUTES_IN_HOUR
+        else:
+            regions.append((1 << day + _BASE, pattern))
+    return regions, uncertain_days
+
+
+def _local_cron(regions: List[Region], year: int, firing_days: int = 0) -> Optional[str]:
+    """Return the single local cron that fires like the regions, or the closest one, None if they never fire.
+
+    Minutes and hours are the ones of any fire. Days are all the days of the firing months, or only some days of
+    the month, or only some weekdays, or some days of the month or some weekdays, like cron does when both fields
+    are restricted, whichever matches the firing days exactly, else some days of the month.
+
+    :param regions: Local day regions
+    :param year: The year
+    :param firing_days: Other days that fire, at unknown times
+    """
+    minutes = hours = 0
+    known_days = firing_days
+    for days, pattern in regions:
+        known_days |= days
+        if not pattern:
+            continue
+        firing_days |= days
+        for hour in range(HOURS_IN_DAY):
+            hour_minutes = pattern >> hour * MINUTES_IN_HOUR & HOUR_MASK
+            if hour_minutes:
+                hours |= 1 << hour
+                minutes |= hour_minutes
+    if not hours:
+        return None
+    tables = _calendar(year)[1]
+    month_day_table, month_table, weekday_table = tables[2], tables[3], tables[4]
+    months = [month for month in range(1, 13) if month_table[month] & firing_days]
+    month_days = [day for day in range(1, 32) if month_day_table[day] & firing_days]
+    weekdays = [weekday for weekday in range(7) if weekday_table[weekday] & firing_days]
+    in_months = 0
+    for month in months:
+        in_months |= month_table[month]
+    in_months &= known_days
+    all_month_days, all_weekdays = list(range(1, 32)), list(range(7))
+    if in_months != firing_days:
+        in_month_days = 0
+        for day in month_days:
+            in_month_days |= month_day_table[day]
+        in_weekdays = 0
+        for weekday in weekdays:
+            in_weekdays |= weekday_table[weekday]
+        if in_months & in_weekdays == firing_days and in_months & in_month_days != firing_days:
+            all_weekdays = weekdays
+        elif in_months & in_month_days == firing_days:
+            all_month_days = month_days
+        else:
+            # Days of the month and weekdays whose days all fire, ORed
+            or_month_days = [day for day in month_days
+                             if in_months & month_day_table[day] & ~firing_days == 0]
+            or_weekdays = [weekday for weekday in weekdays
+                           if in_months & weekday_table[weekday] & ~firing_days == 0]
+            in_either = 0
+            for day in or_month_days:
+                in_either |= month_day_table[day]
+            for weekday in or_weekdays:
+                in_either |= weekday_table[weekday]
+            if or_month_days and or_weekdays and in_months & in_either == firing_days:
+                all_month_days, all_weekdays = or_month_days, or_weekdays
+            else:
+                all_month_days = month_days
+    local_cron = Cron()
+    local_cron.from_list([[minute for minute in range(MINUTES_IN_HOUR) if minutes >> minute & 1],
+                          [hour for hour in range(HOURS_IN_DAY) if hours >> hour & 1],
+                          all_month_days, months, all_weekdays])
+    return local_cron.to_string()
+
+
+def reverse(utc_crons: Sequence[str], timezone: str, year: Optional[int] = None,
+            limit: Optional[int] = None) -> Verification:
+    """Return the local cron of a timezone that fires like UTC crons during a year.
+
+    The local cron is inferred from the days without a DST transition, then verified on every day of the year.
+    When no single local cron fires exactly like the UTC crons, the closest one is returned, with the windows
+    where they differ.
+
+    :param utc_crons: UTC crontab strings, eg: a stored result of `to_utc_crons()`
+    :param timezone: IANA timezone string of the local schedule
+    :param year: The year, default is the current year of the timezone
+    :param limit: Maximum number of mismatches returned, default is all of them
+    :return: The verification of the inferred local cron, the cron is None if the UTC crons never fire
+    :raises CronNormalizationError: a crontab string can not be parsed
+    :raises WrongTimezoneError: the timezone string is not a valid one
+    """
+    timezone_index = get_timezone_index(timezone)
+    year = year or timezone_index.current_year()
+    year_offsets = timezone_index.year_offsets(year)
+    utc = CronSet(utc_crons, year)
+    regions, uncertain_days = _local_regions(utc, year_offsets)
+    cron = _local_cron(regions, year)
+    verification = _verification(cron, CronSet([cron] if cron else [], year), utc, year_offsets, limit)
+    if not verification.matches and uncertain_days:
+        # The days left out may fire too
+        cron = _local_cron(regions, year, uncertain_days)
+        with_uncertain = _verification(cron, CronSet([cron] if cron else [], year), utc, year_offsets, limit)
+        if with_uncertain.matches:
+            return with_uncertain
+    return verification
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--year', type=int, help='Year to verify, default is the current one of each timezone')
+    parser.add_argument('--max-mismatches', type=int, default=10, help='Mismatches written for each item')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    checked = mismatched = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if not item.get('crons'):
+            continue
+        checked += 1
+        verification = verify(item['crons'], item['timezone'], item['cron'], args.year, args.max_mismatches)
+        if not verification.matches:
+            mismatched += 1
+            item['mismatches'] = [mismatch.as_dict() for mismatch in verification.mismatches]
+            sys.stdout.write(json.dumps(item) + '\n')
+    print(f'{checked} items verified, {mismatched} mismatched, in {time.perf_counter() - started:.1f} s',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
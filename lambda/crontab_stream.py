@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Streaming conversion of whole crontab files or NDJSON streams, line by line.
+
+Crontab lines keep their command intact and get one line for each UTC schedule; comments, environment lines and
+`@reboot` are copied as they are. `CRON_TZ=` lines switch the timezone of the following schedules, `TZ=` only sets
+the timezone of the commands and is copied too.
+NDJSON lines are objects like {"cron": "0 10 * * *", "timezone": "Europe/Rome"} and produce the batch item format.
+Input is read and output is written incrementally, so memory does not depend on the input size.
+
+Usage:
+    python lambda/crontab_stream.py --timezone Europe/Rome [crontab_file] > utc_crontab
+    python lambda/crontab_stream.py --format ndjson [--workers 8] [pairs.ndjson] > results.ndjson
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Conversion function, same signature of local_crontab_service.convert
+ConvertFunction = Callable[[str, str], List[str]]
+
+CRON_MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+TIMEZONE_VARIABLE = 'CRON_TZ'
+
+
+def _split_schedule(line: str):
+    """Return (schedule, command) of a crontab line, None if the line does not contain a schedule."""
+    if line.startswith('@'):
+        macro, _, command = line.partition(' ')
+        schedule = CRON_MACROS.get(macro.lower())
+        return (schedule, command.strip()) if schedule else None
+    fields = line.split(None, 5)
+    if len(fields) < 6:
+        return None
+    return ' '.join(fields[:5]), fields[5]
+
+
+def convert_crontab(lines: Iterable[str], timezone: Optional[str], convert: ConvertFunction) -> Iterator[str]:
+    """Convert the schedules of a crontab to UTC, yielding the output lines.
+
+    :param lines: Crontab lines, read lazily
+    :param timezone: Timezone of the schedules, until a CRON_TZ line changes it
+    :param convert: Function converting a (cron, timezone) pair into UTC crons
+    :return: Iterator of output lines, each one ending with a new line
+    """
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line or line.startswith('#'):
+            yield raw_line.rstrip('\n') + '\n'
+            continue
+        name, sep, value = line.partition('=')
+        if sep and ' ' not in name.strip():
+            # Environment line. The output is in UTC, so the timezone variable is kept only as comment
+            if name.strip() == TIMEZONE_VARIABLE:
+                timezone = value.strip().strip('"\'')
+                yield f'# {line}\n'
+            else:
+                yield line + '\n'
+            continue
+        split = _split_schedule(line)
+        if split is None:
+            yield line + '\n'  # eg: @reboot, nothing to convert
+            continue
+        schedule, command = split
+        try:
+            utc_crons = convert(schedule, timezone)
+        except Exception as ex:
+            yield f'# ERROR {ex}\n# {line}\n'
+            continue
+        for utc_cron in utc_crons:
+            yield f'{utc_cron} {command}\n'
+
+
+def convert_ndjson(lines: Iterable[str], timezone: Optional[str], convert: ConvertFunction) -> Iterator[str]:
+    """Convert an NDJSON stream of (cron, timezone) objects, yielding one JSON line for each input line.
+
+    :param lines: NDJSON lines, read lazily
+    :param timezone: Default timezone of the objects without one
+    :param convert: Function converting a (cron, timezone) pair into UTC crons
+    :return: Iterator of output lines, each one ending with a new line
+    """
+    for item, error in read_ndjson(lines, timezone):
+        yield json.dumps(error or convert_item(item, timezone, convert)) + '\n'
+
+
+def read_ndjson(lines: Iterable[str], timezone: Optional[str]) -> Iterator[Tuple[Any, Optional[Dict]]]:
+    """Parse NDJSON lines, skipping the blank ones.
+
+    :param lines: NDJSON lines, read lazily
+    :param timezone: Default timezone, set on the objects without one
+    :return: Iterator of (item, None), or (None, error result) for the lines that are not JSON
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as ex:
+            yield None, {'cron': None, 'timezone': None, 'message': f'invalid JSON: {ex}'}
+            continue
+        if isinstance(item, dict) and timezone is not None:
+            item = {'timezone': timezone, **item}
+        yield item, None
+
+
+def convert_item(item: Dict, timezone: Optional[str], convert: ConvertFunction) -> Dict:
+    """Convert a single (cron, timezone) object into a batch item result."""
+    cron = item.get('cron') if isinstance(item, dict) else None
+    item_timezone = item.get('timezone', timezone) if isinstance(item, dict) else None
+    result = {'cron': cron, 'timezone': item_timezone}
+    if not isinstance(cron, str) or not isinstance(item_timezone, str):
+        result['message'] = 'item must contain the strings "cron" and "timezone"'
+        return result
+    try:
+        result['crons'] = convert(cron, item_timezone)
+    except Exception as ex:
+        result['message'] = str(ex)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', nargs='?', help='Input file, default stdin')
+    parser.add_argument('--format', choices=('crontab', 'ndjson'), default='crontab', help='Input format')
+    parser.add_argument('--timezone', '-t', default=None,
+                        help='Timezone of the crontab, default for NDJSON objects without one')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='NDJSON only: worker processes of the bulk converter, 0 converts in this process')
+    args = parser.parse_args()
+
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    from local_crontab_service import convert
+
+    source = open(args.input) if args.input else sys.stdin
+    with source:
+        if args.format == 'crontab':
+            output = convert_crontab(source, args.timezone, convert)
+        elif args.workers:
+            from itertools import tee
+
+            from bulk_converter import convert_many
+            # Results come in input order, so the errors of the lines that are not JSON are put back in place
+            parsed, dispatched = tee(read_ndjson(source, args.timezone))
+            results = convert_many((item for item, _ in dispatched), args.workers)
+            output = (json.dumps(error or result) + '\n' for (_, error), result in zip(parsed, results))
+        else:
+            output = convert_ndjson(source, args.timezone, convert)
+        for line in output:
+            sys.stdout.write(line)
+
+
+if __name__ == '__main__':
+    main()
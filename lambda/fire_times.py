@@ -0,0 +1,140 @@
+"""Fire times of a localized crontab string, as UTC instants.
+
+Matching local times are generated field by field: months, then the matching days of each month, then hours and
+minutes, so the iterator jumps straight from one fire time to the next without stepping minute by minute.
+Local times are turned into UTC with the offsets of the timezone index; only days with a DST transition are
+resolved exactly against tzdata:
+ - a local time skipped by the transition (spring forward) is shifted forward by the length of the gap,
+   eg: 02:30 -> 03:30 for a one hour gap, 02:20 -> 02:50 for the half hour gap of Australia/Lord_Howe
+ - a local time repeated by the transition (fall back) fires only once, at its first occurrence
+The instants of a transition day are sorted, so shifted times fire in order, and a shifted time landing on
+another fire time of the same day fires only once.
+"""
+from calendar import monthrange
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from typing import Iterator, List, Optional
+
+from dateutil import tz
+
+from cron_normalizer import expand_cron
+from timezone_index import TimezoneIndex, get_timezone_index, HOURS_IN_DAY
+
+# A schedule that does not fire in this many years never fires, eg: '0 0 30 2 *'. 28 years repeat the calendar
+MAX_SEARCH_YEARS = 28
+
+
+class CronSchedule:
+    """Values matched by each field of a crontab string.
+
+    Attributes:
+        minutes, hours, days, months (list of int): Matched values of each field
+        weekdays (set of int): Matched weekdays, Sunday is 0
+        day_times (list of tuple): Matched (hour, minute, time since midnight) of a day, in order
+        days_or_weekdays (bool): Both day and weekday are restricted, a day matches if either of them matches
+    """
+
+    def __init__(self, cron: str) -> None:
+        self.minutes, self.hours, self.days, self.months, weekdays = expand_cron(cron)
+        self.weekdays = set(weekdays)
+        self.day_times = [(hour, minute, timedelta(hours=hour, minutes=minute))
+                          for hour in self.hours for minute in self.minutes]
+        parts = cron.split()
+        day_part, weekday_part = parts[2], parts[4]
+        # Same rule of Vixie cron: a field starting with '*' does not restrict the other one
+        self.days_or_weekdays = not day_part.startswith('*') and not weekday_part.startswith('*')
+
+    def month_days(self, year: int, month: int) -> List[int]:
+        """Return the matching days of a month."""
+        first_weekday, last_day = monthrange(year, month)
+        # calendar weekdays start from Monday = 0, cron ones from Sunday = 0
+        first_weekday = (first_weekday + 1) % 7
+        days = set(day for day in self.days if day <= last_day)
+        if self.days_or_weekdays:
+            return [day for day in range(1, last_day + 1)
+                    if day in days or (first_weekday + day - 1) % 7 in self.weekdays]
+        return [day for day in sorted(days) if (first_weekday + day - 1) % 7 in self.weekdays]
+
+
+def _transition_days(timezone_index: TimezoneIndex, year: int) -> set:
+    """Return the days of the year, 0 based, where the UTC offset changes."""
+    transitions = timezone_index.year_offsets(year).transitions[1:]
+    return set(hour_index // HOURS_IN_DAY for hour_index in transitions) | \
+        set((hour_index - 1) // HOURS_IN_DAY for hour_index in transitions)
+
+
+def _to_utc(local: datetime, timezone) -> datetime:
+    """Return the UTC instant of a local time on a transition day, resolving skipped and repeated times."""
+    aware = local.replace(tzinfo=timezone)
+    if not tz.datetime_exists(aware):
+        aware = tz.resolve_imaginary(aware)
+    return aware.astimezone(dt_timezone.utc)
+
+
+def _transition_day_fire_times(local_day: datetime, schedule: CronSchedule, timezone) -> List[datetime]:
+    """Return the UTC fire times of a transition day, sorted and without duplicates."""
+    return sorted(set(_to_utc(local_day.replace(hour=hour, minute=minute), timezone)
+                      for hour, minute, _ in schedule.day_times))
+
+
+def iter_fire_times(cron: str, timezone: str, start: Optional[datetime] = None) -> Iterator[datetime]:
+    """Iterate the fire times of a localized cron, from `start` on.
+
+    :param cron: Localized crontab string. eg -> '0 10 * * *'
+    :param timezone: IANA timezone string. eg -> 'Europe/Rome'
+    :param start: First instant to consider, included. Naive datetimes are UTC, default is now
+    :return: Iterator of aware UTC datetimes, in increasing order
+    :raises WrongTimezoneError: the timezone string is not a valid one
+    :raises CronNormalizationError: the crontab string can not be parsed
+    """
+    timezone_index = get_timezone_index(timezone)
+    schedule = CronSchedule(cron)
+    if start is None:
+        start = datetime.now(tz=dt_timezone.utc)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=dt_timezone.utc)
+    start = start.astimezone(dt_timezone.utc)
+    # Days before the local start are skipped, a few hours earlier to include times repeated by a fall back
+    local_start = start.astimezone(timezone_index.timezone).replace(tzinfo=None) - timedelta(hours=3)
+    start_day = local_start.date()
+    last = None
+    for year in range(local_start.year, local_start.year + MAX_SEARCH_YEARS):
+        year_offsets = timezone_index.year_offsets(year)
+        transition_days = _transition_days(timezone_index, year)
+        for month in schedule.months:
+            if (year, month) < (local_start.year, local_start.month):
+                continue
+            for day in schedule.month_days(year, month):
+                local_day = datetime(year, month, day)
+                if local_day.date() < start_day:
+                    continue
+                day_of_year = local_day.timetuple().tm_yday - 1
+                if day_of_year in transition_days:
+                    day_fire_times = _transition_day_fire_times(local_day, schedule, timezone_index.timezone)
+                else:
+                    utc_day = (local_day - year_offsets.offset_at(day_of_year * HOURS_IN_DAY)).replace(
+                        tzinfo=dt_timezone.utc)
+                    day_fire_times = (utc_day + time_of_day for _, _, time_of_day in schedule.day_times)
+                for fire_time in day_fire_times:
+                    if fire_time < start or (last is not None and fire_time <= last):
+                        continue
+                    last = fire_time
+                    yield fire_time
+
+
+def next_fire_times(cron: str, timezone: str, count: int, start: Optional[datetime] = None) -> List[datetime]:
+    """Return the next `count` fire times of a localized cron, see `iter_fire_times`."""
+    return list(islice(iter_fire_times(cron, timezone, start), count))
+
+
+def fire_times_between(cron: str, timezone: str, start: datetime, end: datetime,
+                       limit: Optional[int] = None) -> List[datetime]:
+    """Return the fire times of a localized cron in [start, end), at most `limit` of them."""
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=dt_timezone.utc)
+    fire_times = []
+    for fire_time in iter_fire_times(cron, timezone, start):
+        if fire_time >= end or (limit is not None and len(fire_times) >= limit):
+            break
+        fire_times.append(fire_time)
+    return fire_times
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Standalone HTTP server for self-hosting the local-crontab service, without API Gateway and Lambda.
+
+Plain HTTP/1.1 requests are turned into the same API Gateway proxy events the Lambda receives and served by
+`lambda_handler`, so request parsing and response building are the ones of `APIGatewayRequest` and
+`build_response`. Connections are handled by asyncio with keep-alive, conversions run on a bounded pool of
+workers and the number of in-flight requests is limited.
+
+Conversions are CPU bound and worker threads share the GIL, so threads keep the event loop responsive but do
+not convert in parallel. With --processes the workers are processes, each with its own conversion caches: use it
+when most requests miss the caches, or run several servers with --reuse-port.
+
+Usage:
+    python lambda/local_crontab_server.py [--host 0.0.0.0] [--port 8080] [--workers 4] [--processes]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+log = logging.getLogger(__name__)
+
+RESOURCES = ('/utc-crontab', '/utc-crontab/batch', '/utc-crontab/fire-times', '/utc-crontab/verify',
+             '/utc-crontab/stream')
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 6 * 1024 * 1024  # Same payload limit of a Lambda invocation
+
+# Same headers returned by the OPTIONS mock integration of the OpenAPI specification
+CORS_HEADERS = {
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,If-None-Match',
+    'Access-Control-Allow-Methods': 'GET,POST,OPTIONS',
+    'Access-Control-Allow-Origin': '*',
+}
+
+
+class HttpError(Exception):
+    """Error raised while reading a malformed HTTP request"""
+
+    def __init__(self, status: HTTPStatus, msg: str) -> None:
+        super().__init__(msg)
+        self.status = status
+
+
+def build_event(method: str, target: str, headers: Dict[str, str], body: bytes, peer: Optional[Tuple]) -> Dict:
+    """Return the API Gateway proxy event of an HTTP request.
+
+    :param method: HTTP method
+    :param target: Request target, path and query string. eg -> '/utc-crontab?x=1'
+    :param headers: Request headers
+    :param body: Raw request body
+    :param peer: Client address
+    :return: API Gateway proxy event
+    """
+    url = urlsplit(target)
+    query = dict(parse_qsl(url.query, keep_blank_values=True))
+    try:
+        text_body, is_base64 = (body.decode('utf-8') if body else None), False
+    except UnicodeDecodeError:
+        text_body, is_base64 = base64.b64encode(body).decode('ascii'), True
+    return {
+        'resource': url.path,
+        'path': url.path,
+        'httpMethod': method,
+        'headers': headers,
+        'multiValueHeaders': {name: [value] for name, value in headers.items()},
+        'queryStringParameters': query or None,
+        'multiValueQueryStringParameters': {name: [value] for name, value in query.items()} or None,
+        'pathParameters': None,
+        'stageVariables': None,
+        'requestContext': {
+            'resourcePath': url.path,
+            'httpMethod': method,
+            'path': url.path,
+            'protocol': 'HTTP/1.1',
+            'requestTimeEpoch': int(time.time() * 1000),
+            'identity': {'sourceIp': peer[0] if peer else None, 'userAgent': headers.get('User-Agent')},
+        },
+        'body': text_body,
+        'isBase64Encoded': is_base64,
+    }
+
+
+def _import_handler_module(module: str) -> None:
+    """Initializer of worker processes: import the handler before the first request, not during it."""
+    import importlib
+
+    importlib.import_module(module)
+
+
+class LocalCrontabServer:
+    """asyncio HTTP/1.1 server that forwards requests to a Lambda proxy handler.
+
+    Attributes:
+        handler (callable): Lambda handler, called with (event, context)
+        workers (int): Threads running the handler. 0 runs it in the event loop, the fastest choice when most
+            requests are served by the conversion cache
+        processes (bool): Run the handler on `workers` processes instead of threads. The handler must be a
+            module level function, events and responses are pickled
+        max_concurrency (int): Maximum number of requests handled at the same time, the others wait
+        keep_alive_timeout (float): Seconds an idle connection waits for the headers of its next request
+        body_timeout (float): Seconds allowed to receive a request body once its headers are read, None for no limit
+    """
+
+    def __init__(self, handler: Callable, workers: int = 4, max_concurrency: int = 256,
+                 keep_alive_timeout: float = 5.0, processes: bool = False,
+                 body_timeout: Optional[float] = 60.0) -> None:
+        self.handler = handler
+        self.workers = workers
+        self.processes = processes
+        self.max_concurrency = max_concurrency
+        self.keep_alive_timeout = keep_alive_timeout
+        self.body_timeout = body_timeout
+        self._executor: Optional[Executor] = None
+        if workers and processes:
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_import_handler_module,
+                                                 initargs=(handler.__module__,))
+        elif workers:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='converter')
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def serve(self, host: str, port: int, reuse_port: bool = False) -> None:
+        """Serve forever. With `reuse_port` several server processes can listen on the same port."""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        server = await asyncio.start_server(self._handle_connection, host, port, reuse_port=reuse_port or None,
+                                            limit=MAX_HEADER_SIZE)
+        log.info("Serving on %s", ', '.join(str(sock.getsockname()) for sock in server.sockets))
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of a connection, until the client closes it or it is idle for too long."""
+        peer = writer.get_extra_info('peername')
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await self._read_request(reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as ex:
+                    body = json.dumps({'message': str(ex)}).encode('utf-8')
+                    self._write_response(writer, int(ex.status), {}, body, False)
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                keep_alive = self._keep_alive(version, headers)
+                status, response_headers, response_body = await self._dispatch(method, target, headers, body, peer)
+                self._write_response(writer, status, response_headers, response_body, keep_alive)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Read a request, return None if the client closed the connection before sending it.
+        The keep-alive timeout covers the request line and the headers, the body has its own timeout."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keep_alive_timeout)
+        except asyncio.IncompleteReadError as ex:
+            if not ex.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, 'Request headers too large')
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Malformed request line')
+        headers = dict()
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip()] = value.strip()
+        lower_headers = {name.lower(): value for name, value in headers.items()}
+        if 'chunked' in lower_headers.get('transfer-encoding', '').lower():
+            raise HttpError(HTTPStatus.LENGTH_REQUIRED, 'Chunked requests are not supported')
+        try:
+            length = int(lower_headers.get('content-length') or 0)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length')
+        if length < 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length')
+        if length > MAX_BODY_SIZE:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Request body too large')
+        body = await asyncio.wait_for(reader.readexactly(length), self.body_timeout) if length else b''
+        return method, target, version, headers, body
+
+    @staticmethod
+    def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        """HTTP/1.1 connections are persistent by default, HTTP/1.0 only if asked."""
+        connection = next((value.lower() for name, value in headers.items() if name.lower() == 'connection'), '')
+        if version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes, peer):
+        """Return status, headers and body of the response to a request."""
+        path = urlsplit(target).path
+        if path not in RESOURCES:
+            return int(HTTPStatus.NOT_FOUND), {}, b'{"message": "Not Found"}'
+        if method == 'OPTIONS':
+            return int(HTTPStatus.OK), CORS_HEADERS, b'{}'
+        event = build_event(method, target, headers, body, peer)
+        async with self._semaphore:
+            try:
+                if self._executor is None:
+                    response = self.handler(event, None)
+                else:
+                    response = await asyncio.get_running_loop().run_in_executor(
+                        self._executor, self.handler, event, None)
+            except Exception as ex:
+                log.critical(f"Internal Error: {ex}")
+                return int(HTTPStatus.INTERNAL_SERVER_ERROR), {}, b'{"message": "Internal Server Error"}'
+        response_body = response.get('body') or ''
+        if response.get('isBase64Encoded'):
+            response_body = base64.b64decode(response_body)
+        else:
+            response_body = response_body.encode('utf-8')
+        return response['statusCode'], response.get('headers') or {}, response_body
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], body: bytes,
+                        keep_alive: bool) -> None:
+        """Write an HTTP/1.1 response."""
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+        head = [f'HTTP/1.1 {status} {reason}']
+        head.extend(f'{name}: {value}' for name, value in headers.items())
+        # A 304 has no body, so it describes neither its type nor its length
+        if status != HTTPStatus.NOT_MODIFIED:
+            if 'Content-Type' not in headers:
+                head.append('Content-Type: application/json')
+            head.append(f'Content-Length: {len(body)}')
+        head.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('utf-8') + body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='0.0.0.0', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Workers running the conversions, 0 to run them in the event loop')
+    parser.add_argument('--processes', action='store_true', help='Use worker processes instead of threads')
+    parser.add_argument('--max-concurrency', type=int, default=256, help='Maximum in-flight requests')
+    parser.add_argument('--keep-alive-timeout', type=float, default=5.0, help='Idle seconds before closing')
+    parser.add_argument('--body-timeout', type=float, default=60.0, help='Seconds allowed to receive a body')
+    parser.add_argument('--reuse-port', action='store_true', help='Let several processes share the port')
+    parser.add_argument('--log-level', default='INFO', help='Log level of the server and of the service')
+    args = parser.parse_args()
+
+    # The service reads its configuration from the environment at import time
+    os.environ.setdefault('LOG_LEVEL', args.log_level)
+    logging.basicConfig(level=args.log_level.upper())
+    from local_crontab_service import lambda_handler
+
+    server = LocalCrontabServer(lambda_handler, args.workers, args.max_concurrency, args.keep_alive_timeout,
+                                args.processes, args.body_timeout or None)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
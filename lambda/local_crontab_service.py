@@ -1,42 +1,398 @@
+import io
 import logging
 import json
-from typing import Optional, Dict, Union, NamedTuple, Tuple, TypedDict, Any
-from lambda_decorators import dump_json_body, load_json_body
-from local_crontab import Converter
+import os
+import sys
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache, partial
+from typing import Dict, List, Any, Optional, Tuple
 from local_crontab.converter import WrongTimezoneError
+from conversion_cache import LRUCache
+from cron_normalizer import normalize_cron, CronNormalizationError
+from timezone_index import get_timezone_index, IndexedConverter, snapshot as tz_snapshot
+from request_metrics import RequestMetrics, get_sink
+from request_validator import TimezoneValidationError, ValidationError
 # Utilities to handle input/output from/to API Gateway
+from api_gateway_parser.json_body import load_json_body
 from api_gateway_parser.api_gateway_request import APIGatewayRequest
-from api_gateway_parser.api_gateway_response import APIGatewayResponse
+from api_gateway_parser.api_gateway_response import build_response
+from api_gateway_parser.compression import compress_response
+from api_gateway_parser.conditional import if_none_match, make_etag
 from api_gateway_parser.http_status_constants import HttpStatusCode
 
 log = logging.getLogger(__name__)
-log_level = logging.DEBUG
+log_level = os.environ.get('LOG_LEVEL', 'DEBUG').upper()
 logging.getLogger().setLevel(log_level)
 
+# Fraction of requests, from 0 to 1, that write a single-line JSON record with latency and outcome
+structured_log_sample_rate = float(os.environ.get('STRUCTURED_LOG_SAMPLE_RATE', 0))
+if structured_log_sample_rate > 0:
+    from random import random
+
+
+CONVERSION_RESOURCE = '/utc-crontab'
+BATCH_RESOURCE = '/utc-crontab/batch'
+STREAM_RESOURCE = '/utc-crontab/stream'
+FIRE_TIMES_RESOURCE = '/utc-crontab/fire-times'
+VERIFY_RESOURCE = '/utc-crontab/verify'
+BATCH_MAX_ITEMS = 1000
+FIRE_TIMES_DEFAULT_COUNT = 10
+FIRE_TIMES_MAX_ITEMS = 100000
+VERIFY_MAX_MISMATCHES = 100
+
+# Responses smaller than this size, in bytes, are never compressed. 0 disables compression
+compression_min_size = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+
+# Seconds clients and caches may reuse a single conversion, it is never past the end of the year of the conversion
+cache_max_age = int(os.environ.get('CACHE_MAX_AGE', 86400))
+
+# Conversions cache shared by every invocation served by the same container
+conversion_cache = LRUCache(max_size=int(os.environ.get('CONVERSION_CACHE_SIZE', 1024)))
+# Conversions cache shared by every container or worker: memory, sqlite:///path or redis://host:port/db
+shared_cache = None
+if os.environ.get('SHARED_CACHE'):
+    from shared_cache import get_shared_cache
+    shared_cache = get_shared_cache(os.environ['SHARED_CACHE'])
+
+# Concurrent identical conversions of this process wait for a single computation. A Lambda container runs one
+# request at a time, so it is on by default only outside Lambda
+coalescer = None
+if os.environ.get('COALESCE_CONVERSIONS', '0' if 'AWS_LAMBDA_FUNCTION_NAME' in os.environ else '1') == '1':
+    from shared_cache import Coalescer
+    coalescer = Coalescer()
+
+# Destination of the per-request timings and counters: none, memory or emf (CloudWatch Embedded Metric Format)
+metrics_sink = get_sink(os.environ.get('METRICS_SINK'), os.environ.get('METRICS_NAMESPACE', 'LocalCrontab'))
+
 
 class UnsupportedMethodException(Exception):
     pass
 
 
-def is_correct_http_method(request: APIGatewayRequest) -> bool:
+class BadRequestException(Exception):
+    pass
+
+
+class NotModifiedException(Exception):
+    """The client already has the current result. It carries the headers of the 304 response."""
+
+    def __init__(self, headers: Dict[str, str]) -> None:
+        super().__init__('not modified')
+        self.headers = headers
+
+
+def is_correct_http_method(request: APIGatewayRequest, allowed: Tuple[str, ...] = ("POST",)) -> bool:
     """
-    Request filter that enforces the request method is `POST`.
+    Request filter that enforces the request method is one of the allowed ones, `POST` by default.
 
     :param request: Parsed HTTP request from API Gateway
+    :param allowed: Allowed request methods
     :return: Is HTTP method correct
-    :raises UnsupportedMethodException: the request method is not POST
+    :raises UnsupportedMethodException: the request method is not allowed
     """
     correct = False
     method = request.http
-    if method != "POST":
+    if method not in allowed:
         raise UnsupportedMethodException(f'unsupported method "{method}"')
     else:
         return correct
 
 
-@load_json_body()  # auto-deserialize http body from JSON
-@dump_json_body()  # auto-serialization http body to JSON
-def lambda_handler(event, context: Dict) -> Union[Dict[Any, Any]]:
+def log_structured(api_request: APIGatewayRequest, status_code: int, started: float) -> None:
+    """
+    Write a single-line JSON record with latency and outcome of a request, for a sampled fraction of requests.
+    It is written straight to stdout, so CloudWatch stores it as is, whatever the log level.
+
+    :param api_request: Parsed HTTP request from API Gateway
+    :param status_code: Response status code
+    :param started: Request start time, from time.perf_counter()
+    """
+    if structured_log_sample_rate <= 0 or random() >= structured_log_sample_rate:
+        return
+    record = {
+        'resource': api_request.resource,
+        'status_code': status_code,
+        'latency_ms': round((time.perf_counter() - started) * 1000, 3)
+    }
+    sys.stdout.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def finalize_response(api_request: APIGatewayRequest, api_response: Dict[str, Any], started: float,
+                      debug: bool, metrics: RequestMetrics) -> Dict[str, Any]:
+    """
+    Compress a successful response if it is big enough, then log it.
+
+    :param api_request: Parsed HTTP request from API Gateway
+    :param api_response: API Gateway proxy response
+    :param started: Request start time, from time.perf_counter()
+    :param debug: The debug log level is enabled
+    :param metrics: Metrics of the request
+    :return: The final API Gateway proxy response
+    """
+    # Headers are parsed only for bodies big enough to be compressed
+    if api_response['statusCode'] == HttpStatusCode.HTTP_STATUS_OK and compression_min_size and \
+            len(api_response['body']) >= compression_min_size:
+        compress_response(api_response, api_request.headers.get('accept-encoding'))
+        metrics.mark('compression')
+    if debug:
+        log.debug(f"Api Gateway res: {json.dumps(api_response, default=str, indent=2)}")
+        log.debug(f"Conversion cache: {conversion_cache.stats}")
+    log_structured(api_request, api_response['statusCode'], started)
+    return api_response
+
+
+def convert(cron: str, timezone: str, metrics: Optional[RequestMetrics] = None) -> List[str]:
+    """
+    Convert a single localized crontab string into a list of UTC crontab strings.
+    The cron is normalized first, so equivalent schedules share the same work.
+    Results are memoized per container by cron, timezone and year, because DST transitions change every year.
+    On a miss the result comes from `compute_conversion`.
+
+    :param cron: Localized crontab string. eg -> '0 10 * * *'
+    :param timezone: IANA timezone string. eg -> 'Europe/Rome'
+    :param metrics: Metrics of the request, they count where the result came from
+    :return: List of UTC crontab strings
+    :raises WrongTimezoneError: the timezone string is not a valid one
+    """
+    timezone_index = get_timezone_index(timezone)
+    year = timezone_index.current_year()
+    if isinstance(cron, str):
+        cron = normalize_cron(cron)
+    key = (cron, timezone, year)
+    source = 'cache'
+    utc_crons = conversion_cache.get(key)
+    if utc_crons is None:
+        if coalescer is None:
+            utc_crons, source = compute_conversion(cron, timezone, timezone_index, year)
+        else:
+            (utc_crons, source), coalesced = coalescer.run(
+                key, lambda: compute_conversion(cron, timezone, timezone_index, year))
+            if coalesced:
+                source = 'coalesced'
+        conversion_cache.put(key, utc_crons)
+    if metrics is not None:
+        metrics.record_conversion(cron, timezone, source)
+    return list(utc_crons)
+
+
+@lru_cache(maxsize=None)
+def conversion_version() -> str:
+    """
+    Return the version of what a conversion depends on besides its inputs: the tz snapshot, or the tzdata of
+    dateutil without it, and the converter package. It changes with the deployments that change the results.
+    """
+    tzdata = tz_snapshot.digest()
+    if tzdata is None:
+        from dateutil.zoneinfo import get_zonefile_instance
+        tzdata = (get_zonefile_instance().metadata or {}).get('tzversion', 'unknown')
+    try:
+        from importlib.metadata import version
+        converter = version('local-crontab')
+    except Exception:
+        converter = 'unknown'
+    return f'{tzdata}/{converter}'
+
+
+@lru_cache(maxsize=None)
+def get_precomputed_table():
+    """Return the conversions precomputed at build time, opened by the first cache miss."""
+    from precomputed_table import PrecomputedTable, DEFAULT_TABLE_PATH
+    return PrecomputedTable(os.environ.get('PRECOMPUTED_TABLE', DEFAULT_TABLE_PATH))
+
+
+@lru_cache(maxsize=None)
+def get_request_validator():
+    """Return the validator of the request bodies, compiled once from the OpenAPI specification by the first request."""
+    from request_validator import RequestValidator
+    return RequestValidator.from_file()
+
+
+def conversion_headers(cron: str, timezone: str, media_type: Optional[str] = None) -> Dict[str, str]:
+    """
+    Return the ETag, Cache-Control and Vary headers of a single conversion, without converting.
+    The result is determined by the normalized cron, the timezone, the year and `conversion_version`,
+    so the tag is derived from them. It can be reused until the year ends in the timezone.
+
+    :param cron: Localized crontab string, already validated
+    :param timezone: IANA timezone string, already validated
+    :param media_type: Media type of the response, None for JSON
+    :return: Response headers
+    """
+    timezone_index = get_timezone_index(timezone)
+    year = timezone_index.current_year()
+    etag = make_etag(conversion_version(), normalize_cron(cron), timezone, str(year), media_type or '')
+    # The last offset of a year is the one in effect when the year ends
+    year_end = datetime(year + 1, 1, 1) - timezone_index.year_offsets(year).offsets[-1]
+    max_age = max(0, min(cache_max_age, int((year_end - datetime.utcnow()).total_seconds())))
+    return {'ETag': etag, 'Cache-Control': f'public, max-age={max_age}', 'Vary': 'Accept'}
+
+
+def compute_conversion(cron: str, timezone: str, timezone_index, year: int) -> Tuple[Tuple[str, ...], str]:
+    """
+    Compute a conversion missing from the container cache. Popular combinations are read from the precomputed
+    table, then from the shared cache, the others are converted and stored in the shared cache until the year ends.
+
+    :param cron: Normalized crontab string
+    :param timezone: IANA timezone string
+    :param timezone_index: Index of the timezone
+    :param year: Year of the conversion
+    :return: UTC crontab strings and their source: 'precomputed', 'shared' or 'converted'
+    """
+    if not isinstance(cron, str):
+        return tuple(IndexedConverter(cron, timezone_index, year).to_utc_crons()), 'converted'
+    utc_crons = get_precomputed_table().lookup(cron, timezone, year)
+    if utc_crons is not None:
+        return tuple(utc_crons), 'precomputed'
+    # Keys change with the tz data and the converter, so containers of different deployments never share results
+    shared_key = f'{conversion_version()}|{cron}|{timezone}|{year}'
+    if shared_cache is not None:
+        utc_crons = shared_cache.get(shared_key)
+        if utc_crons is not None:
+            return tuple(utc_crons), 'shared'
+    utc_crons = tuple(IndexedConverter(cron, timezone_index, year).to_utc_crons())
+    if shared_cache is not None:
+        from shared_cache import year_end_ttl
+        shared_cache.set(shared_key, utc_crons, year_end_ttl(timezone_index.timezone, year))
+    return utc_crons, 'converted'
+
+
+def convert_batch(items: List[Dict[str, str]], metrics: Optional[RequestMetrics] = None) -> List[Dict[str, Any]]:
+    """
+    Convert many (cron, timezone) pairs in one invocation.
+    Every item is validated on its own: an item that can not be converted gets its own error message,
+    the others are converted anyway.
+    Each distinct timezone string is resolved only once, invalid ones are remembered for the whole batch.
+
+    :param items: List of request bodies. eg -> [{"cron": "0 10 * * *", "timezone": "Europe/Rome"}]
+    :param metrics: Metrics of the request
+    :return: List of results, in the same order of the input items
+    :raises BadRequestException: the batch is not a list or it is too big
+    """
+    if not isinstance(items, list):
+        raise BadRequestException('batch "items" must be a list')
+    if len(items) > BATCH_MAX_ITEMS:
+        raise BadRequestException(f'batch size {len(items)} exceeds the limit of {BATCH_MAX_ITEMS} items')
+
+    invalid_timezones = set()
+    results = []
+    for position, item in enumerate(items):
+        cron = item.get('cron') if isinstance(item, dict) else None
+        timezone = item.get('timezone') if isinstance(item, dict) else None
+        result = {'cron': cron, 'timezone': timezone}
+        if timezone in invalid_timezones:
+            result['message'] = f'items[{position}].timezone: Incorrect Timezone string'
+            results.append(result)
+            continue
+        try:
+            get_request_validator().validate('CronConverterRequest', item, path=f'items[{position}]')
+        except TimezoneValidationError as ex:
+            invalid_timezones.add(timezone)
+            result['message'] = str(ex)
+            results.append(result)
+            continue
+        except ValidationError as ex:
+            result['message'] = str(ex)
+            results.append(result)
+            continue
+        try:
+            result['crons'] = convert(cron, timezone, metrics)
+        except WrongTimezoneError as ex:
+            result['message'] = str(ex)
+        except Exception as ex:
+            log.error(f"Batch item error: {ex}")
+            result['message'] = str(ex)
+        results.append(result)
+    return results
+
+
+def parse_instant(value: Optional[str], name: str) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 instant of a request body, a missing offset means UTC.
+
+    :param value: ISO 8601 string. eg -> '2026-03-27T00:00:00Z'
+    :param name: Name of the body property, for the error message
+    :return: The instant, None if value is None
+    :raises BadRequestException: the value is not a valid ISO 8601 instant
+    """
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except (TypeError, ValueError):
+        raise BadRequestException(f'"{name}" must be an ISO 8601 date-time')
+
+
+def list_fire_times(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    List the next fire times of a localized cron, or the ones in a window, as UTC instants.
+
+    :param body: Request body. eg -> {"cron": "0 10 * * *", "timezone": "Europe/Rome", "count": 3}
+    :return: Response body, with the ISO 8601 UTC fire times
+    :raises BadRequestException: the request is malformed or the cron can not be parsed
+    :raises WrongTimezoneError: the timezone string is not a valid one
+    """
+    # calendar, used by fire_times, imports locale: it is loaded only by this resource
+    from fire_times import iter_fire_times
+
+    cron = body.get('cron') if isinstance(body, dict) else None
+    timezone = body.get('timezone') if isinstance(body, dict) else None
+    if not isinstance(cron, str) or not isinstance(timezone, str):
+        raise BadRequestException('body must contain the strings "cron" and "timezone"')
+    start = parse_instant(body.get('start'), 'start')
+    end = parse_instant(body.get('end'), 'end')
+    count = body.get('count', FIRE_TIMES_DEFAULT_COUNT if end is None else FIRE_TIMES_MAX_ITEMS)
+    if not isinstance(count, int) or isinstance(count, bool) or not 1 <= count <= FIRE_TIMES_MAX_ITEMS:
+        raise BadRequestException(f'"count" must be an integer between 1 and {FIRE_TIMES_MAX_ITEMS}')
+    if end is not None and end.tzinfo is None:
+        end = end.replace(tzinfo=dt_timezone.utc)
+
+    fire_times = []
+    truncated = False
+    try:
+        for fire_time in iter_fire_times(cron, timezone, start):
+            if end is not None and fire_time >= end:
+                break
+            if len(fire_times) == count:
+                truncated = end is not None
+                break
+            fire_times.append(fire_time.isoformat()[:19] + 'Z')
+    except CronNormalizationError as ex:
+        raise BadRequestException(str(ex))
+    return {'cron': cron, 'timezone': timezone, 'fire_times': fire_times, 'truncated': truncated}
+
+
+def verify_crons(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare UTC crons with a localized cron during a year. Without the localized cron, it is inferred.
+
+    :param body: Request body. eg -> {"crons": ["0 9 * 1-2 *", ...], "timezone": "Europe/Rome", "cron": "0 10 * * *"}
+    :return: Response body, with the localized cron and the UTC windows where they differ
+    :raises BadRequestException: a cron can not be parsed
+    :raises WrongTimezoneError: the timezone string is not a valid one
+    """
+    from cron_verifier import reverse, verify
+
+    timezone = body['timezone']
+    year = body.get('year') or get_timezone_index(timezone).current_year()
+    try:
+        if body.get('cron') is None:
+            verification = reverse(body['crons'], timezone, year, VERIFY_MAX_MISMATCHES)
+        else:
+            verification = verify(body['crons'], timezone, body['cron'], year, VERIFY_MAX_MISMATCHES)
+    except CronNormalizationError as ex:
+        raise BadRequestException(str(ex))
+    return {
+        'cron': verification.cron,
+        'timezone': timezone,
+        'year': year,
+        'matches': verification.matches,
+        'mismatches': [mismatch.as_dict() for mismatch in verification.mismatches],
+        'truncated': verification.truncated,
+    }
+
+
+def lambda_handler(event, context: Dict) -> Dict[str, Any]:
     """ The lambda entrypoint.
     This lambda converts a localized crontab string into a list of UTC crontab.
     Parameters
@@ -44,38 +400,177 @@ def lambda_handler(event, context: Dict) -> Union[Dict[Any, Any]]:
     event: dict, required
         Event from AWS API Gateway. Into the body, it contains the string 'cron' and 'timezone'.
         request body example --> {"cron": "0 10 * * *", "timezone": "Europe/Rome" }
+        On the batch resource the body contains a list of them.
+        batch request body example --> {"items": [{"cron": "0 10 * * *", "timezone": "Europe/Rome" }]}
+        On the stream resource the body is a whole crontab file or an NDJSON stream, see `stream_handler`.
+        On the fire-times resource the body is a single request, with optional 'count', 'start' and 'end'.
+        On the verify resource the body contains the UTC 'crons', the 'timezone' and optional 'cron' and 'year'.
+        A single conversion can be a GET too, with 'cron' and 'timezone' as query parameters.
     context: object, required
         Context from AWS API Gateway. This lambda doesn't use it.
 
     Returns
     ------
-    api_response: JSON serialized response
+    api_response: API Gateway proxy response, with the body already serialized
+    """
+    metrics = RequestMetrics(event.get('resource'))
+    if event.get('resource') == STREAM_RESOURCE:
+        api_response = stream_handler(event, context, metrics)
+    else:
+        api_response = conversion_handler(event, context, metrics)
+    metrics.finish(api_response['statusCode'])
+    metrics_sink.emit(metrics)
+    return api_response
+
+
+@load_json_body()  # auto-deserialize http body from JSON
+def conversion_handler(event, context: Dict, metrics: Optional[RequestMetrics] = None) -> Dict[str, Any]:
+    """ Handler of the JSON resources: single and batch conversion, fire times, verification.
+    Single conversions have an ETag, a request with a matching If-None-Match gets a 304 without converting.
+    Single and batch conversions are encoded with the compact binary format if the Accept header prefers it.
+
+    Returns
+    ------
+    api_response: API Gateway proxy response, with the body already serialized to JSON
     """
-    log.debug(f"Received event from API G.: {json.dumps(event, indent=2)}")
+    started = time.perf_counter()
+    metrics = metrics or RequestMetrics(event.get('resource'))
+    debug = log.isEnabledFor(logging.DEBUG)
+    # Nothing is serialized for the logs, unless the debug level is enabled
+    if debug:
+        log.debug(f"Received event from API G.: {json.dumps(event, indent=2)}")
     api_request = APIGatewayRequest(event, context)
-    log.debug(f"Api G. request: {api_request}")
+    log.debug("Api G. request: %s", api_request)
+    metrics.mark('parse')
 
+    response_headers = None
+    compact_media_type = None
     try:
-        is_correct_http_method(api_request)
-        response_body = Converter(api_request.body.get('cron'), api_request.body.get('timezone')).to_utc_crons()
-    except UnsupportedMethodException as ex:
+        allowed_methods = ("GET", "POST") if api_request.resource == CONVERSION_RESOURCE else ("POST",)
+        is_correct_http_method(api_request, allowed_methods)
+        metrics.mark('method_check')
+        body = api_request.body
+        accept = api_request.headers.get('accept', '')
+        # The compact format is loaded only by the clients that ask for it
+        if api_request.resource in (CONVERSION_RESOURCE, BATCH_RESOURCE) and 'x-crontab-bitmask' in accept:
+            from compact_format import MEDIA_TYPE, accepts_compact
+            if accepts_compact(accept):
+                compact_media_type = MEDIA_TYPE
+        if api_request.resource == BATCH_RESOURCE:
+            get_request_validator().validate('CronConverterBatchRequest', body, array_items=False)
+            metrics.mark('validation')
+            response_body = convert_batch(body.get('items'), metrics)
+        elif api_request.resource == FIRE_TIMES_RESOURCE:
+            get_request_validator().validate('FireTimesRequest', body)
+            metrics.mark('validation')
+            response_body = list_fire_times(body)
+        elif api_request.resource == VERIFY_RESOURCE:
+            get_request_validator().validate('VerifyRequest', body)
+            metrics.mark('validation')
+            response_body = verify_crons(body)
+        else:
+            if api_request.http == "GET":
+                query = event.get('queryStringParameters') or {}
+                body = {name: query[name] for name in ('cron', 'timezone') if name in query}
+                get_request_validator().validate('CronConverterRequest', body, path='query')
+            else:
+                get_request_validator().validate('CronConverterRequest', body)
+            metrics.mark('validation')
+            response_headers = conversion_headers(body.get('cron'), body.get('timezone'), compact_media_type)
+            if if_none_match(api_request.headers.get('if-none-match'), response_headers['ETag']):
+                raise NotModifiedException(response_headers)
+            response_body = convert(body.get('cron'), body.get('timezone'), metrics)
+        metrics.mark('conversion')
+    except NotModifiedException as ex:
+        api_response = build_response(
+            status_code=HttpStatusCode.HTTP_STATUS_NOT_MODIFIED,
+            body='', headers=ex.headers, serialized=True)
+    except (UnsupportedMethodException, BadRequestException, ValidationError) as ex:
         log.critical(f"Internal Error: {ex}")
-        api_response = APIGatewayResponse(
+        api_response = build_response(
             status_code=HttpStatusCode.HTTP_STATUS_BAD_REQUEST,
             body={'message': str(ex)})
     except WrongTimezoneError as ex:
         log.critical(f"Internal Error: {ex}")
-        api_response = APIGatewayResponse(
+        api_response = build_response(
+            status_code=HttpStatusCode.HTTP_STATUS_BAD_REQUEST,
+            body={'message': str(ex)})
+    except Exception as ex:
+        log.critical(f"Internal Error: {ex}")
+        api_response = build_response(
+            status_code=HttpStatusCode.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+            body={'message': str(ex)})
+    else:
+        if compact_media_type:
+            import base64
+            from compact_format import encode as encode_compact, encode_batch as encode_compact_batch
+            if api_request.resource == BATCH_RESOURCE:
+                response_body = encode_compact_batch(response_body)
+            else:
+                response_body = encode_compact(response_body)
+            metrics.mark('serialization')
+            api_response = build_response(
+                body=base64.b64encode(response_body).decode('ascii'),
+                headers={**(response_headers or {}), 'Content-Type': compact_media_type, 'Vary': 'Accept'},
+                is_base64_encoded=True, serialized=True)
+        else:
+            response_body = json.dumps(response_body)
+            metrics.mark('serialization')
+            api_response = build_response(body=response_body, headers=response_headers, serialized=True)
+    metrics.mark('response_build')
+
+    return finalize_response(api_request, api_response, started, debug, metrics)
+
+
+def stream_handler(event, context: Dict, metrics: Optional[RequestMetrics] = None) -> Dict[str, Any]:
+    """ Handler of the stream resource, it converts a whole file in a single invocation.
+    The body is a crontab file, with the timezone as query parameter,
+    or an NDJSON stream of {"cron", "timezone"} objects when the Content-Type is application/x-ndjson.
+    The response has the same format of the request: the UTC crontab file, or one batch item for each NDJSON line.
+
+    Returns
+    ------
+    api_response: API Gateway proxy response, with the body already serialized
+    """
+    from crontab_stream import convert_crontab, convert_ndjson
+
+    started = time.perf_counter()
+    metrics = metrics or RequestMetrics(event.get('resource'))
+    debug = log.isEnabledFor(logging.DEBUG)
+    api_request = APIGatewayRequest(event, context)
+    metrics.mark('parse')
+
+    try:
+        is_correct_http_method(api_request)
+        metrics.mark('method_check')
+        body = event.get('body') or ''
+        if event.get('isBase64Encoded', False):
+            import base64
+            body = base64.b64decode(body).decode('utf-8')
+        timezone = api_request.query.get('timezone')
+        metrics.mark('body_decode')
+        convert_line = partial(convert, metrics=metrics)
+        if 'ndjson' in api_request.headers.get('content-type', ''):
+            content_type = 'application/x-ndjson'
+            response_body = ''.join(convert_ndjson(io.StringIO(body), timezone, convert_line))
+        else:
+            if not timezone:
+                raise BadRequestException('query parameter "timezone" is required for crontab files')
+            content_type = 'text/plain; charset=utf-8'
+            response_body = ''.join(convert_crontab(io.StringIO(body), timezone, convert_line))
+        metrics.mark('conversion')
+    except (UnsupportedMethodException, BadRequestException, UnicodeDecodeError) as ex:
+        log.critical(f"Internal Error: {ex}")
+        api_response = build_response(
             status_code=HttpStatusCode.HTTP_STATUS_BAD_REQUEST,
             body={'message': str(ex)})
     except Exception as ex:
         log.critical(f"Internal Error: {ex}")
-        api_response = APIGatewayResponse(
+        api_response = build_response(
             status_code=HttpStatusCode.HTTP_STATUS_INTERNAL_SERVER_ERROR,
             body={'message': str(ex)})
     else:
-        api_response = APIGatewayResponse(body=response_body)
-    finally:
-        log.debug(f"Api Gateway res: {json.dumps(api_response.serialized, default=str, indent=2)}")
+        api_response = build_response(body=response_body, headers={'Content-Type': content_type}, serialized=True)
+    metrics.mark('response_build')
 
-    return api_response.serialized
+    return finalize_response(api_request, api_response, started, debug, metrics)
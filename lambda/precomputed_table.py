@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Precomputed conversions of the most popular (cron, timezone, year) combinations.
+
+The table is built at deploy time by the Lambda bundling command, from a matrix of cron templates, timezones and
+years, into a read-only sqlite file bundled with the Lambda asset. At run time it is opened memory-mapped on
+first use and checked before running a conversion. It is built with the same tzdata of the Lambda, but DST rules
+change over time, so the asset must be rebuilt at least once a year, before the new year starts.
+
+Usage:
+    python lambda/precomputed_table.py [--matrix precompute_matrix.json] [--output precomputed.sqlite3]
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone as dt_timezone
+from itertools import product
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'precomputed.sqlite3')
+DEFAULT_MATRIX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'precompute_matrix.json')
+MMAP_SIZE = 64 * 1024 * 1024
+
+# Values of the placeholders of the cron templates
+TEMPLATE_VALUES = {
+    'minute': range(0, 60, 15),
+    'hour': range(24),
+}
+
+
+class PrecomputedTable:
+    """Read-only lookup of precomputed conversions.
+
+    Attributes:
+        path (str): Path of the sqlite file. A missing file disables the table.
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLE_PATH) -> None:
+        self.path = path
+        self._connection = None
+        self._available = os.path.exists(path)
+
+    def _connect(self):
+        """Open the table on first use, sqlite is imported only if the table exists."""
+        import sqlite3
+
+        connection = sqlite3.connect(f'file:{self.path}?mode=ro&immutable=1', uri=True, check_same_thread=False)
+        connection.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+        return connection
+
+    def lookup(self, cron: str, timezone: str, year: int) -> Optional[List[str]]:
+        """Return the precomputed UTC crons, None if the combination is not in the table.
+
+        :param cron: Normalized cron string
+        :param timezone: IANA timezone string
+        :param year: Year of the conversion
+        """
+        if not self._available:
+            return None
+        if self._connection is None:
+            self._connection = self._connect()
+        row = self._connection.execute(
+            'SELECT crons FROM conversions WHERE cron = ? AND timezone = ? AND year = ?',
+            (cron, timezone, year)).fetchone()
+        return row[0].split('\n') if row else None
+
+
+def expand_templates(templates: List[str]) -> Iterator[str]:
+    """Expand cron templates, eg: '0 {hour} * * *' gives one cron for every hour."""
+    for template in templates:
+        names = [name for name in TEMPLATE_VALUES if '{' + name + '}' in template]
+        for values in product(*(TEMPLATE_VALUES[name] for name in names)):
+            yield template.format(**dict(zip(names, values)))
+
+
+def build_table(matrix: Dict, output: str) -> int:
+    """Build the table of the whole (cron template × timezone × year) matrix.
+
+    :param matrix: Dict with 'crons' templates, 'timezones' and optional 'years'. Default years are the current
+        and the next one.
+    :param output: Path of the sqlite file, overwritten
+    :return: Number of conversions in the table
+    """
+    import sqlite3
+
+    from cron_normalizer import normalize_cron
+    from timezone_index import IndexedConverter, get_timezone_index
+
+    current_year = datetime.now(tz=dt_timezone.utc).year
+    years = matrix.get('years') or [current_year, current_year + 1]
+    crons = list(dict.fromkeys(normalize_cron(cron) for cron in expand_templates(matrix['crons'])))
+
+    if os.path.exists(output):
+        os.remove(output)
+    connection = sqlite3.connect(output)
+    connection.execute('CREATE TABLE conversions (cron TEXT, timezone TEXT, year INTEGER, crons TEXT, '
+                       'PRIMARY KEY (cron, timezone, year)) WITHOUT ROWID')
+    connection.execute('CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)')
+    rows = []
+    for timezone, year, cron in product(matrix['timezones'], years, crons):
+        utc_crons = IndexedConverter(cron, get_timezone_index(timezone), year).to_utc_crons()
+        rows.append((cron, timezone, year, '\n'.join(utc_crons)))
+    connection.executemany('INSERT INTO conversions VALUES (?, ?, ?, ?)', rows)
+    connection.executemany('INSERT INTO metadata VALUES (?, ?)', [
+        ('built_at', datetime.now(tz=dt_timezone.utc).isoformat()),
+        ('years', json.dumps(years)),
+    ])
+    connection.commit()
+    connection.execute('VACUUM')
+    connection.close()
+    return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matrix', default=DEFAULT_MATRIX_PATH, help='JSON file with crons, timezones and years')
+    parser.add_argument('--output', default=DEFAULT_TABLE_PATH, help='sqlite file to write')
+    args = parser.parse_args()
+
+    with open(args.matrix) as file:
+        matrix = json.load(file)
+    started = time.perf_counter()
+    count = build_table(matrix, args.output)
+    print(f'{count} conversions written to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB) '
+          f'in {time.perf_counter() - started:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""Per-request timing and metrics of the service, emitted through a pluggable sink.
+
+Each request gets a `RequestMetrics` that times the phases of the hot path (event parse, method check,
+conversion, JSON serialization, response build, compression) and counts where conversions came from
+(conversion cache, precomputed table, shared cache, a concurrent identical conversion or converter), by timezone
+and by cron shape.
+
+Sinks:
+ - `NullSink`: drops everything, the default
+ - `InMemorySink`: aggregates in process, for tests, benchmarks and the self-hosted server
+ - `EMFSink`: writes a CloudWatch Embedded Metric Format line to stdout, CloudWatch turns it into metrics
+"""
+import json
+import re
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from threading import Lock
+from typing import Dict, IO, Optional
+
+CONVERSION_SOURCES = ('cache', 'precomputed', 'shared', 'coalesced', 'converted')
+_VALUE = re.compile(r'[0-9A-Za-z]+')
+_LIST = re.compile(r'N(,N)+')
+
+
+def cron_shape(cron: str) -> str:
+    """Return the shape of a cron, with every value replaced by N. eg: '*/5 9-17 * * 1,3,5' -> '*/N N-N * * N,N'"""
+    if not isinstance(cron, str):
+        return 'invalid'
+    return _LIST.sub('N,N', _VALUE.sub('N', ' '.join(cron.split())))
+
+
+class RequestMetrics:
+    """Timings and counters of a single request.
+
+    Attributes:
+        resource (str): API Gateway resource of the request
+        status_code (int): Response status code, set by `finish`
+        phases (dict): Milliseconds spent in each phase, in the order they ran
+        conversions (dict): Number of conversions served by each source of CONVERSION_SOURCES
+        timezones (dict): Number of conversions by timezone
+        cron_shapes (dict): Number of conversions by cron shape
+    """
+    __slots__ = ('resource', 'status_code', 'phases', 'conversions', 'timezones', 'cron_shapes', 'total_ms',
+                 '_started', '_last')
+
+    def __init__(self, resource: Optional[str] = None) -> None:
+        self.resource = resource
+        self.status_code: Optional[int] = None
+        self.phases: Dict[str, float] = dict()
+        self.conversions: Dict[str, int] = dict.fromkeys(CONVERSION_SOURCES, 0)
+        self.timezones: Dict[str, int] = dict()
+        self.cron_shapes: Dict[str, int] = dict()
+        self.total_ms: Optional[float] = None
+        self._started = self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """Close a phase: the time since the previous mark is added to it."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def record_conversion(self, cron: str, timezone: str, source: str) -> None:
+        """Count a conversion served by `source`, one of CONVERSION_SOURCES."""
+        self.conversions[source] += 1
+        self.timezones[timezone] = self.timezones.get(timezone, 0) + 1
+        shape = cron_shape(cron)
+        self.cron_shapes[shape] = self.cron_shapes.get(shape, 0) + 1
+
+    def finish(self, status_code: int) -> None:
+        """Set the outcome and the total latency of the request."""
+        self.status_code = status_code
+        self.total_ms = (time.perf_counter() - self._started) * 1000
+
+    @property
+    def cache_hits(self) -> int:
+        """Conversions served without running the converter."""
+        return sum(self.conversions.values()) - self.conversions['converted']
+
+    def as_dict(self) -> Dict:
+        return {
+            'resource': self.resource,
+            'status_code': self.status_code,
+            'total_ms': self.total_ms,
+            'phases': dict(self.phases),
+            'conversions': dict(self.conversions),
+            'timezones': dict(self.timezones),
+            'cron_shapes': dict(self.cron_shapes),
+        }
+
+
+class MetricsSink(ABC):
+    """Destination of the request metrics."""
+
+    @abstractmethod
+    def emit(self, metrics: RequestMetrics) -> None:
+        """Handle the metrics of a finished request."""
+
+
+class NullSink(MetricsSink):
+    """Sink that drops the metrics."""
+
+    def emit(self, metrics: RequestMetrics) -> None:
+        pass
+
+
+class InMemorySink(MetricsSink):
+    """Sink that aggregates the metrics in process. It is thread safe.
+
+    Attributes:
+        records (deque): Last `max_records` request metrics
+    """
+
+    def __init__(self, max_records: int = 1000) -> None:
+        self.records: deque = deque(maxlen=max_records)
+        self._lock = Lock()
+        self.clear()
+
+    def emit(self, metrics: RequestMetrics) -> None:
+        with self._lock:
+            self.records.append(metrics)
+            self.requests += 1
+            self.status_codes[metrics.status_code] += 1
+            self.phases_ms.update(metrics.phases)
+            self.conversions.update(metrics.conversions)
+            self.timezones.update(metrics.timezones)
+            self.cron_shapes.update(metrics.cron_shapes)
+
+    def clear(self) -> None:
+        """Drop every record and reset the aggregates."""
+        with self._lock:
+            self.records.clear()
+            self.requests = 0
+            self.status_codes: Counter = Counter()
+            self.phases_ms: Counter = Counter()
+            self.conversions: Counter = Counter()
+            self.timezones: Counter = Counter()
+            self.cron_shapes: Counter = Counter()
+
+    @property
+    def summary(self) -> Dict:
+        """Return the aggregates: mean milliseconds of each phase, hit rate and distributions."""
+        with self._lock:
+            conversions = sum(self.conversions.values())
+            hits = conversions - self.conversions['converted']
+            return {
+                'requests': self.requests,
+                'status_codes': dict(self.status_codes),
+                'mean_phase_ms': {phase: total / self.requests for phase, total in self.phases_ms.items()},
+                'conversions': dict(self.conversions),
+                'cache_hit_rate': hits / conversions if conversions else None,
+                'timezones': dict(self.timezones.most_common()),
+                'cron_shapes': dict(self.cron_shapes.most_common()),
+            }
+
+
+class EMFSink(MetricsSink):
+    """Sink that writes a CloudWatch Embedded Metric Format record for each request.
+
+    Only the resource is a dimension. Timezones and cron shapes have an unbounded cardinality, so they are
+    written as properties of the record, to be aggregated with CloudWatch Logs Insights.
+    """
+
+    def __init__(self, namespace: str = 'LocalCrontab', stream: IO = None) -> None:
+        self.namespace = namespace
+        self.stream = stream
+
+    def emit(self, metrics: RequestMetrics) -> None:
+        record = {
+            'Resource': metrics.resource or 'unknown',
+            'StatusCode': metrics.status_code,
+            'LatencyMs': round(metrics.total_ms or 0.0, 3),
+            'CacheHits': metrics.cache_hits,
+            'CacheMisses': metrics.conversions['converted'],
+            'PrecomputedHits': metrics.conversions['precomputed'],
+            'SharedCacheHits': metrics.conversions['shared'],
+        }
+        metric_names = [{'Name': 'LatencyMs', 'Unit': 'Milliseconds'}, {'Name': 'CacheHits', 'Unit': 'Count'},
+                        {'Name': 'CacheMisses', 'Unit': 'Count'}, {'Name': 'PrecomputedHits', 'Unit': 'Count'},
+                        {'Name': 'SharedCacheHits', 'Unit': 'Count'}]
+        for phase, elapsed in metrics.phases.items():
+            name = f'{phase.title().replace("_", "")}Ms'
+            record[name] = round(elapsed, 3)
+            metric_names.append({'Name': name, 'Unit': 'Milliseconds'})
+        record['Timezones'] = metrics.timezones
+        record['CronShapes'] = metrics.cron_shapes
+        record['_aws'] = {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{'Namespace': self.namespace, 'Dimensions': [['Resource']],
+                                   'Metrics': metric_names}],
+        }
+        (self.stream or sys.stdout).write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def get_sink(name: Optional[str], namespace: str = 'LocalCrontab') -> MetricsSink:
+    """Return the sink called `name`: 'none', 'memory' or 'emf'."""
+    name = (name or 'none').lower()
+    if name == 'emf':
+        return EMFSink(namespace)
+    if name == 'memory':
+        return InMemorySink()
+    if name == 'none':
+        return NullSink()
+    raise ValueError(f'Unknown metrics sink "{name}"')
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Validation of request bodies with the schemas of the OpenAPI specification, without API Gateway.
+
+`components/schemas` of openapi_specification/local_crontab_api.yaml is exported to openapi_schemas.json, which
+is bundled with the Lambda, and compiled once at import into plain Python checks. Besides types, required
+properties and bounds, the `cron`, `timezone` and `date-time` formats are checked, so malformed crons and
+unknown timezones are rejected before any conversion work.
+
+Usage, after changing the schemas of the specification:
+    python lambda/request_validator.py --export
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+from cron_normalizer import CronNormalizationError, expand_cron
+from timezone_index import is_valid_timezone
+
+SCHEMAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openapi_schemas.json')
+SPECIFICATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                                  'openapi_specification', 'local_crontab_api.yaml')
+
+# Validator of a value, the path locates the value in the body for the error message
+Check = Callable[[Any, str], None]
+
+_JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+}
+
+
+class ValidationError(ValueError):
+    """Raised when a request body does not match its schema"""
+    pass
+
+
+class TimezoneValidationError(ValidationError):
+    """Raised when a timezone string is not a known timezone"""
+    pass
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_cron(cron: str) -> bool:
+    """A cron is valid if the normalizer or the converter can parse it."""
+    try:
+        expand_cron(cron)
+        return True
+    except CronNormalizationError:
+        pass
+    from cron_converter import Cron
+    try:
+        Cron(cron)
+        return True
+    except Exception:
+        return False
+
+
+def _check_cron(value: str, path: str) -> None:
+    if not _is_valid_cron(value):
+        raise ValidationError(f'{path}: invalid cron "{value}"')
+
+
+def _check_timezone(value: str, path: str) -> None:
+    if not is_valid_timezone(value):
+        raise TimezoneValidationError(f'{path}: Incorrect Timezone string')
+
+
+def _check_date_time(value: str, path: str) -> None:
+    try:
+        datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        raise ValidationError(f'{path}: must be an ISO 8601 date-time')
+
+
+FORMAT_CHECKS: Dict[str, Check] = {
+    'cron': _check_cron,
+    'timezone': _check_timezone,
+    'date-time': _check_date_time,
+}
+
+
+def compile_schema(schema: Dict, schemas: Dict[str, Dict], array_items: bool = True) -> Check:
+    """Compile a schema into a single check function.
+
+    Supported keywords: $ref, type, format, enum, properties, required, items, minItems, maxItems,
+    minimum, maximum. Unknown formats are not checked, like JSON Schema does.
+
+    :param schema: The schema
+    :param schemas: All the schemas, by name, to resolve $ref
+    :param array_items: Check the items of arrays, else only the arrays themselves
+    :return: Function raising ValidationError if a value does not match the schema
+    """
+    if '$ref' in schema:
+        return compile_schema(schemas[schema['$ref'].rsplit('/', 1)[-1]], schemas, array_items)
+    checks = []
+    schema_type = schema.get('type')
+    if schema_type in _JSON_TYPES:
+        python_type = _JSON_TYPES[schema_type]
+        # bool is an int for Python, not for JSON
+        is_boolean = schema_type == 'boolean'
+
+        def check_type(value, path):
+            if not isinstance(value, python_type) or (isinstance(value, bool) and not is_boolean):
+                raise ValidationError(f'{path}: must be of type {schema_type}')
+        checks.append(check_type)
+    if schema.get('format') in FORMAT_CHECKS:
+        checks.append(FORMAT_CHECKS[schema['format']])
+    if 'enum' in schema:
+        allowed = schema['enum']
+
+        def check_enum(value, path):
+            if value not in allowed:
+                raise ValidationError(f'{path}: must be one of {allowed}')
+        checks.append(check_enum)
+    if 'minimum' in schema or 'maximum' in schema:
+        minimum, maximum = schema.get('minimum'), schema.get('maximum')
+
+        def check_bounds(value, path):
+            if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+                raise ValidationError(f'{path}: must be between {minimum} and {maximum}')
+        checks.append(check_bounds)
+    if 'minItems' in schema or 'maxItems' in schema:
+        min_items, max_items = schema.get('minItems', 0), schema.get('maxItems')
+
+        def check_length(value, path):
+            if len(value) < min_items or (max_items is not None and len(value) > max_items):
+                raise ValidationError(f'{path}: must contain between {min_items} and {max_items} items')
+        checks.append(check_length)
+    if schema.get('required'):
+        required = schema['required']
+
+        def check_required(value, path):
+            for name in required:
+                if name not in value:
+                    raise ValidationError(f'{path}: "{name}" is required')
+        checks.append(check_required)
+    if schema.get('properties'):
+        properties = [(name, compile_schema(property_schema, schemas, array_items))
+                      for name, property_schema in schema['properties'].items()]
+
+        def check_properties(value, path):
+            for name, check in properties:
+                if name in value:
+                    check(value[name], f'{path}.{name}')
+        checks.append(check_properties)
+    if 'items' in schema and array_items:
+        check_item = compile_schema(schema['items'], schemas, array_items)
+
+        def check_items(value, path):
+            for position, item in enumerate(value):
+                check_item(item, f'{path}[{position}]')
+        checks.append(check_items)
+
+    def check(value, path):
+        for single_check in checks:
+            single_check(value, path)
+    return check
+
+
+class RequestValidator:
+    """Validators of the request bodies, compiled once from the schemas.
+
+    Attributes:
+        schemas (dict): The schemas, by name
+    """
+
+    def __init__(self, schemas: Dict[str, Dict]) -> None:
+        self.schemas = schemas
+        self._checks = {name: compile_schema(schema, schemas) for name, schema in schemas.items()}
+        self._shallow_checks = {name: compile_schema(schema, schemas, array_items=False)
+                                for name, schema in schemas.items()}
+
+    @classmethod
+    def from_file(cls, path: str = SCHEMAS_PATH) -> 'RequestValidator':
+        with open(path) as file:
+            return cls(json.load(file))
+
+    def validate(self, name: str, body: Any, array_items: bool = True, path: str = 'body') -> None:
+        """Validate a request body with the schema `name`.
+
+        :param name: Name of the schema. eg -> 'CronConverterRequest'
+        :param body: The decoded request body
+        :param array_items: Check the items of arrays too. The batch checks its items one by one, so a
+            malformed item gets its own error instead of failing the whole request.
+        :param path: Location of the body, used in error messages
+        :raises ValidationError: the body does not match the schema
+        """
+        checks = self._checks if array_items else self._shallow_checks
+        checks[name](body, path)
+
+
+def export_schemas(specification_path: str = SPECIFICATION_PATH) -> Dict[str, Dict]:
+    """Return `components/schemas` of the OpenAPI specification. PyYAML is required."""
+    import yaml
+
+    with open(specification_path) as file:
+        return yaml.safe_load(file)['components']['schemas']
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--export', action='store_true', help='Export the schemas of the specification')
+    parser.add_argument('--specification', default=SPECIFICATION_PATH, help='OpenAPI specification')
+    parser.add_argument('--output', default=SCHEMAS_PATH, help='JSON file of the exported schemas')
+    args = parser.parse_args()
+
+    if args.export:
+        with open(args.output, 'w') as file:
+            json.dump(export_schemas(args.specification), file, indent=2)
+            file.write('\n')
+        print(f'Schemas exported to {args.output}')
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
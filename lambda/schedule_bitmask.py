@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Bulk evaluation of many UTC crons over a time range, for capacity planning.
+
+Crons are compiled into one bitset per field value: bit i of `minutes[m]` is set if cron i matches minute m,
+the same for hours, days of month, months and weekdays. The crons firing in a minute are then a few ANDs of
+bitsets, whatever their number, instead of a loop over every cron for every minute. Bitsets are NumPy packed
+arrays when NumPy is installed, Python ints otherwise.
+
+Usage:
+    python lambda/schedule_bitmask.py --start 2026-01-05 --days 7 [--top 20] < results.ndjson
+
+Input lines are batch items, like the output of bulk_converter.py: every "crons" list is one schedule.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from cron_normalizer import CRON_FIELDS, expand_cron, expand_field
+
+MINUTES_IN_DAY = 24 * 60
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _np_popcount(words):
+    """Return the number of set bits of a NumPy uint64 array, summed over its last axis."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    bytes_view = words.view(np.uint8)
+    return np.unpackbits(bytes_view, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+if hasattr(int, 'bit_count'):
+    _int_popcount = int.bit_count
+else:
+    def _int_popcount(value: int) -> int:
+        return bin(value).count('1')
+
+
+class ScheduleBitmask:
+    """Crons compiled into per field bitsets.
+
+    Attributes:
+        size (int): Number of compiled crons
+        ids (list): Schedule id of every cron, several crons can belong to the same schedule
+        use_numpy (bool): Bitsets are NumPy arrays
+    """
+
+    def __init__(self, crons: Sequence[str], ids: Optional[Sequence] = None, use_numpy: Optional[bool] = None) -> None:
+        """
+        :param crons: UTC crontab strings, like the output of `to_utc_crons()`
+        :param ids: Schedule id of every cron, default is the cron position
+        :param use_numpy: Use NumPy bitsets, default is True if NumPy is installed
+        :raises CronNormalizationError: a crontab string can not be parsed
+        """
+        if use_numpy and np is None:
+            raise ImportError('NumPy is not installed')
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self.size = len(crons)
+        self.ids = list(range(self.size)) if ids is None else list(ids)
+        # Whole 64 bit words, so NumPy bitsets can be viewed as uint64
+        self._nbytes = (self.size + 63) // 64 * 8
+        # Crons share most of their fields: crons are grouped by field, each distinct field is expanded once
+        groups = [dict() for _ in CRON_FIELDS]
+        or_days = []
+        for index, cron in enumerate(crons):
+            parts = cron.split()
+            if len(parts) != len(CRON_FIELDS):
+                expand_cron(cron)  # raises the parsing error
+            for group, part in zip(groups, parts):
+                indices = group.get(part)
+                if indices is None:
+                    group[part] = [index]
+                else:
+                    indices.append(index)
+            if not parts[2].startswith('*') and not parts[4].startswith('*'):
+                or_days.append(index)
+        tables = []
+        for group, field in zip(groups, CRON_FIELDS):
+            table = [self._bitset([])] * (field.max + 1)
+            for part, indices in group.items():
+                bitset = self._bitset(indices)
+                for value in expand_field(part, field):
+                    table[value] = table[value] | bitset
+            tables.append(table)
+        self.minutes, self.hours, self.days, self.months, self.weekdays = tables
+        # Crons with both day and weekday restricted match if either of them matches, like Vixie cron
+        self._or_days = self._bitset(or_days)
+        if self.use_numpy:
+            self._hours_table = np.stack(self.hours)
+            self._minutes_table = np.stack(self.minutes)
+
+    def _bitset(self, indices: List[int]):
+        """Return the bitset with the given bits set."""
+        if self.use_numpy:
+            bits = np.zeros(self._nbytes * 8, dtype=bool)
+            bits[indices] = True
+            return np.packbits(bits, bitorder='little').view(np.uint64)
+        packed = bytearray(self._nbytes)
+        for index in indices:
+            packed[index >> 3] |= 1 << (index & 7)
+        return int.from_bytes(packed, 'little')
+
+    def _is_empty(self, bitset) -> bool:
+        return not bitset.any() if self.use_numpy else not bitset
+
+    def _members(self, bitset) -> List[int]:
+        """Return the indexes of the set bits."""
+        if self.use_numpy:
+            return np.flatnonzero(np.unpackbits(bitset.view(np.uint8), bitorder='little')).tolist()
+        members = []
+        for position, byte in enumerate(bitset.to_bytes(self._nbytes, 'little')):
+            while byte:
+                low = byte & -byte
+                members.append(position * 8 + low.bit_length() - 1)
+                byte ^= low
+        return members
+
+    def _day_bitset(self, day: datetime):
+        """Return the bitset of the crons matching a day."""
+        weekday = (day.weekday() + 1) % 7  # cron weekdays start from Sunday = 0
+        days, weekdays = self.days[day.day], self.weekdays[weekday]
+        return self.months[day.month] & ((days & weekdays) | (self._or_days & (days | weekdays)))
+
+    def _days(self, start: datetime, end: datetime) -> Iterator[Tuple[datetime, int, int]]:
+        """Yield (day, first minute, last minute) of every UTC day of [start, end), minutes are day offsets."""
+        start, end = _utc_minute(start), _utc_minute(end)
+        day = start.replace(hour=0, minute=0)
+        while day < end:
+            next_day = day + timedelta(days=1)
+            first = max(int((start - day).total_seconds()) // 60, 0)
+            last = min(int((end - day).total_seconds()) // 60, MINUTES_IN_DAY)
+            yield day, first, last
+            day = next_day
+
+    def histogram(self, start: datetime, end: datetime) -> List[int]:
+        """Return the number of crons firing in every minute of [start, end).
+
+        :param start: First minute, naive datetimes are UTC
+        :param end: End of the range, excluded
+        :return: Fire counts, one for every minute starting from `start`
+        """
+        counts: List[int] = []
+        for day, first, last in self._days(start, end):
+            day_bitset = self._day_bitset(day)
+            if self.use_numpy:
+                hour_bitsets = self._hours_table & day_bitset
+                hours = np.flatnonzero(hour_bitsets.any(axis=1))
+                day_counts = np.zeros((len(self.hours), len(self.minutes)), dtype=np.int64)
+                # (hours, 60, words) ANDs, then the set bits of each minute are counted at once
+                minute_bitsets = hour_bitsets[hours, None, :] & self._minutes_table[None, :, :]
+                day_counts[hours] = _np_popcount(minute_bitsets)
+                day_counts = day_counts.reshape(-1).tolist()
+            else:
+                day_counts = []
+                for hour_bitset in self.hours:
+                    hour_bitset &= day_bitset
+                    if hour_bitset:
+                        day_counts.extend(_int_popcount(hour_bitset & minute) for minute in self.minutes)
+                    else:
+                        day_counts.extend([0] * len(self.minutes))
+            counts.extend(day_counts[first:last])
+        return counts
+
+    def firing(self, start: datetime, end: datetime) -> Iterator[Tuple[datetime, List]]:
+        """Yield the minutes of [start, end) with at least a firing cron, with the ids of their schedules.
+
+        :param start: First minute, naive datetimes are UTC
+        :param end: End of the range, excluded
+        :return: Iterator of (UTC minute, sorted distinct schedule ids)
+        """
+        for day, first, last in self._days(start, end):
+            day_bitset = self._day_bitset(day)
+            for hour in range(first // 60, (last + 59) // 60):
+                hour_bitset = self.hours[hour] & day_bitset
+                if self._is_empty(hour_bitset):
+                    continue
+                for minute in range(max(first - hour * 60, 0), min(last - hour * 60, 60)):
+                    members = self._members(hour_bitset & self.minutes[minute])
+                    if members:
+                        ids = sorted(set(self.ids[index] for index in members))
+                        yield day + timedelta(hours=hour, minutes=minute), ids
+
+
+def _utc_minute(value: datetime) -> datetime:
+    """Return a naive UTC datetime truncated to the minute."""
+    if value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return value.replace(second=0, microsecond=0)
+
+
+def from_schedules(schedules: Iterable[Sequence[str]], use_numpy: Optional[bool] = None) -> ScheduleBitmask:
+    """Compile schedules made of several UTC crons, schedule ids are their positions."""
+    crons, ids = [], []
+    for schedule_id, schedule_crons in enumerate(schedules):
+        crons.extend(schedule_crons)
+        ids.extend([schedule_id] * len(schedule_crons))
+    return ScheduleBitmask(crons, ids, use_numpy)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--start', required=True, type=datetime.fromisoformat, help='First UTC minute')
+    parser.add_argument('--days', type=float, default=1, help='Length of the range in days')
+    parser.add_argument('--top', type=int, default=20, help='Number of busiest minutes to print')
+    parser.add_argument('--no-numpy', action='store_true', help='Use the pure Python bitsets')
+    args = parser.parse_args()
+
+    schedules = [item['crons'] for item in map(json.loads, sys.stdin) if item.get('crons')]
+    bitmask = from_schedules(schedules, use_numpy=False if args.no_numpy else None)
+    end = args.start + timedelta(days=args.days)
+    counts = bitmask.histogram(args.start, end)
+    start = _utc_minute(args.start)
+    print(f'{len(schedules)} schedules, {bitmask.size} crons, {sum(counts)} fires in {len(counts)} minutes')
+    for minute in sorted(range(len(counts)), key=counts.__getitem__, reverse=True)[:args.top]:
+        print(f'{start + timedelta(minutes=minute):%Y-%m-%d %H:%M}  {counts[minute]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Precompiled scheduling plan of many converted schedules, for cron runners.
+
+A runner fed with the output of the converter parses every UTC cron at startup and evaluates all of them every
+minute. The plan does that work once:
+ - groups: the UTC crons of all the schedules, deduplicated by field sets, each with the schedules it belongs to
+ - schedules: id, timezone and local cron of every schedule, sorted by timezone, so the schedules of a timezone
+   are contiguous and listed by the timezones table
+ - minute index: for every minute of the plan period, the sorted groups firing in it, computed with
+   `ScheduleBitmask`
+
+The plan is a single file meant to be memory-mapped: "what fires now" is two offsets read at a fixed position,
+then a contiguous slice of group indexes, whatever the number of schedules.
+
+Layout, little endian:
+ - header: magic, format version, first minute (minutes since the epoch, UTC), number of minutes, numbers of
+   groups, members, schedules, timezones and fires, size of the strings
+ - minute offsets: number of minutes + 1 entries, the fires of minute i are fires[offsets[i]:offsets[i + 1]]
+ - fires: group index of every fire
+ - groups: (cron string offset, cron string length, first member, number of members) entries
+ - members: schedule indexes of every group, contiguous for each group
+ - schedules: (id, timezone, local cron) as string offset and length pairs
+ - timezones: (name offset, name length, first schedule, number of schedules) entries
+ - strings: UTF-8 strings
+
+Usage:
+    python lambda/schedule_plan.py --start 2026-01-05 --days 7 --output plan.bin < results.ndjson
+    python lambda/schedule_plan.py --plan plan.bin --at 2026-01-05T09:00
+
+Input lines are batch items, like the output of bulk_converter.py, with an optional "id". Items without "crons"
+are skipped, the line number is the id of items without one.
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from compact_format import encode_cron
+from schedule_bitmask import ScheduleBitmask, _utc_minute
+
+MAGIC = b'CPLN'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHHIIIIIIII')
+_OFFSET = struct.Struct('<I')
+_GROUP = struct.Struct('<IHII')
+_SCHEDULE = struct.Struct('<IHIHIH')
+_TIMEZONE = struct.Struct('<IHII')
+_EPOCH = datetime(1970, 1, 1)
+
+
+class Schedule(NamedTuple):
+    """A converted schedule of the plan."""
+    id: str
+    timezone: str
+    cron: str
+
+
+class Group(NamedTuple):
+    """A UTC cron shared by one or more schedules."""
+    cron: str
+    schedules: List[int]
+
+
+def _epoch_minute(value: datetime) -> int:
+    return int((_utc_minute(value) - _EPOCH).total_seconds()) // 60
+
+
+def build_plan(items: Iterable[Dict], start: datetime, minutes: int) -> Tuple[List[Schedule], List[Group],
+                                                                              List[List[int]]]:
+    """Group the UTC crons of the items and index the groups firing in every minute of the period.
+
+    :param items: Batch items with 'cron', 'timezone', 'crons' and optionally 'id'
+    :param start: First minute of the period, naive datetimes are UTC
+    :param minutes: Length of the period in minutes
+    :return: Schedules sorted by timezone and id, groups, and the sorted group indexes of every minute
+    """
+    converted = []
+    for line_number, item in enumerate(items):
+        if not item.get('crons'):
+            continue
+        converted.append((Schedule(str(item.get('id', line_number)), item['timezone'], item['cron']), item['crons']))
+    converted.sort(key=lambda entry: (entry[0].timezone, entry[0].id))
+
+    schedules = []
+    groups: List[Group] = []
+    group_keys: Dict[bytes, int] = dict()
+    for schedule_index, (schedule, utc_crons) in enumerate(converted):
+        schedules.append(schedule)
+        for utc_cron in utc_crons:
+            # The bitmask encoding is canonical: crons with the same field sets, and the same day fields starting
+            # with '*', have the same key
+            key = encode_cron(utc_cron)
+            group_index = group_keys.get(key)
+            if group_index is None:
+                group_index = group_keys[key] = len(groups)
+                groups.append(Group(' '.join(utc_cron.split()), []))
+            members = groups[group_index].schedules
+            if not members or members[-1] != schedule_index:
+                members.append(schedule_index)
+
+    fires: List[List[int]] = [[] for _ in range(minutes)]
+    if groups:
+        start = _utc_minute(start)
+        bitmask = ScheduleBitmask([group.cron for group in groups])
+        for minute, group_indexes in bitmask.firing(start, start + timedelta(minutes=minutes)):
+            fires[int((minute - start).total_seconds()) // 60] = group_indexes
+    return schedules, groups, fires
+
+
+def write_plan(output: str, start: datetime, schedules: List[Schedule], groups: List[Group],
+               fires: List[List[int]]) -> None:
+    """Write the plan file, overwritten. See the module docstring for the layout."""
+    strings = bytearray()
+    string_offsets: Dict[str, Tuple[int, int]] = dict()
+
+    def add_string(value: str) -> Tuple[int, int]:
+        location = string_offsets.get(value)
+        if location is None:
+            encoded = value.encode('utf-8')
+            location = string_offsets[value] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return location
+
+    offsets, fire_entries = bytearray(), bytearray()
+    fire_count = 0
+    for group_indexes in fires:
+        offsets += _OFFSET.pack(fire_count)
+        fire_entries += struct.pack(f'<{len(group_indexes)}I', *group_indexes)
+        fire_count += len(group_indexes)
+    offsets += _OFFSET.pack(fire_count)
+
+    group_entries, members = bytearray(), bytearray()
+    member_count = 0
+    for group in groups:
+        group_entries += _GROUP.pack(*add_string(group.cron), member_count, len(group.schedules))
+        members += struct.pack(f'<{len(group.schedules)}I', *group.schedules)
+        member_count += len(group.schedules)
+
+    schedule_entries, timezone_entries = bytearray(), bytearray()
+    timezones: List[Tuple[str, int, int]] = []
+    for schedule_index, schedule in enumerate(schedules):
+        schedule_entries += _SCHEDULE.pack(*add_string(schedule.id), *add_string(schedule.timezone),
+                                           *add_string(schedule.cron))
+        if timezones and timezones[-1][0] == schedule.timezone:
+            name, first, count = timezones[-1]
+            timezones[-1] = (name, first, count + 1)
+        else:
+            timezones.append((schedule.timezone, schedule_index, 1))
+    for name, first, count in timezones:
+        timezone_entries += _TIMEZONE.pack(*add_string(name), first, count)
+
+    with open(output, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, _epoch_minute(start), len(fires), len(groups),
+                                member_count, len(schedules), len(timezones), fire_count, len(strings)))
+        for section in (offsets, fire_entries, group_entries, members, schedule_entries, timezone_entries, strings):
+            file.write(section)
+
+
+class SchedulePlan:
+    """Read-only, memory-mapped plan.
+
+    Attributes:
+        path (str): Path of the plan file
+        start (datetime): First UTC minute of the plan
+        minutes (int): Length of the plan period in minutes
+        groups (int): Number of distinct UTC crons
+        schedules (int): Number of schedules
+    """
+
+    def __init__(self, path: str) -> None:
+        import mmap
+
+        self.path = path
+        with open(path, 'rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, start, self.minutes, self.groups, members, self.schedules, self._timezones, fires, _ = \
+            _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._buffer.close()
+            raise ValueError(f'{path} is not a schedule plan of version {FORMAT_VERSION}')
+        self.start = _EPOCH + timedelta(minutes=start)
+        self._offsets_start = _HEADER.size
+        self._fires_start = self._offsets_start + (self.minutes + 1) * _OFFSET.size
+        self._groups_start = self._fires_start + fires * _OFFSET.size
+        self._members_start = self._groups_start + self.groups * _GROUP.size
+        self._schedules_start = self._members_start + members * _OFFSET.size
+        self._timezones_start = self._schedules_start + self.schedules * _SCHEDULE.size
+        self._strings_start = self._timezones_start + self._timezones * _TIMEZONE.size
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_start + offset
+        return self._buffer[start:start + length].decode('utf-8')
+
+    def _indexes(self, start: int, count: int) -> List[int]:
+        return list(struct.unpack_from(f'<{count}I', self._buffer, start))
+
+    def firing(self, at: datetime) -> List[int]:
+        """Return the sorted indexes of the groups firing in the minute of `at`, empty outside the plan period.
+
+        :param at: Any moment of the minute, naive datetimes are UTC
+        """
+        minute = _epoch_minute(at) - _epoch_minute(self.start)
+        if not 0 <= minute < self.minutes:
+            return []
+        first, end = struct.unpack_from('<II', self._buffer, self._offsets_start + minute * _OFFSET.size)
+        return self._indexes(self._fires_start + first * _OFFSET.size, end - first)
+
+    def group(self, index: int) -> Group:
+        """Return the UTC cron of a group and the indexes of its schedules."""
+        cron_offset, cron_length, first, count = _GROUP.unpack_from(self._buffer, self._groups_start +
+                                                                    index * _GROUP.size)
+        return Group(self._string(cron_offset, cron_length),
+                     self._indexes(self._members_start + first * _OFFSET.size, count))
+
+    def schedule(self, index: int) -> Schedule:
+        """Return a schedule of the plan."""
+        id_offset, id_length, timezone_offset, timezone_length, cron_offset, cron_length = \
+            _SCHEDULE.unpack_from(self._buffer, self._schedules_start + index * _SCHEDULE.size)
+        return Schedule(self._string(id_offset, id_length), self._string(timezone_offset, timezone_length),
+                        self._string(cron_offset, cron_length))
+
+    def schedules_at(self, at: datetime) -> List[int]:
+        """Return the sorted indexes of the schedules firing in the minute of `at`."""
+        indexes = set()
+        for group_index in self.firing(at):
+            indexes.update(self.group(group_index).schedules)
+        return sorted(indexes)
+
+    def timezones(self) -> Dict[str, range]:
+        """Return the schedule indexes of every timezone."""
+        timezones = dict()
+        for index in range(self._timezones):
+            name_offset, name_length, first, count = _TIMEZONE.unpack_from(
+                self._buffer, self._timezones_start + index * _TIMEZONE.size)
+            timezones[self._string(name_offset, name_length)] = range(first, first + count)
+        return timezones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--start', type=datetime.fromisoformat, help='First UTC minute, default is the next one')
+    parser.add_argument('--days', type=float, default=1, help='Length of the plan period in days')
+    parser.add_argument('--output', default='plan.bin', help='Plan file to write')
+    parser.add_argument('--plan', help='Plan file to read, instead of building one')
+    parser.add_argument('--at', type=datetime.fromisoformat, help='UTC minute to look up in --plan, default is now')
+    args = parser.parse_args()
+
+    if args.plan:
+        plan = SchedulePlan(args.plan)
+        at = args.at or datetime.now(tz=dt_timezone.utc)
+        for schedule_index in plan.schedules_at(at):
+            sys.stdout.write(json.dumps(plan.schedule(schedule_index)._asdict()) + '\n')
+        plan.close()
+        return
+
+    started = time.perf_counter()
+    start = args.start or datetime.now(tz=dt_timezone.utc) + timedelta(minutes=1)
+    items = (json.loads(line) for line in sys.stdin if line.strip())
+    schedules, groups, fires = build_plan(items, start, int(args.days * 24 * 60))
+    write_plan(args.output, start, schedules, groups, fires)
+    print(f'{len(schedules)} schedules, {len(groups)} distinct UTC crons, {sum(map(len, fires))} fires in '
+          f'{len(fires)} minutes, written to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB) '
+          f'in {time.perf_counter() - started:.1f} s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Conversion caches shared by many containers or worker processes, behind the per container LRU cache.
+
+Backends:
+ - `MemoryCache`: in process, with expiration. Useful for tests and as a stand-in of the other ones
+ - `SqliteCache`: a sqlite file, shared by the worker processes of a host or over a shared file system
+ - `RedisCache`: any Redis compatible server, the `redis` package is required only by this backend
+
+Entries expire at the end of the year they were computed for, in the timezone of the conversion.
+A backend failure never fails a request: it is logged and the conversion is computed as usual.
+`Coalescer` makes concurrent identical conversions of the same process wait for a single computation. It helps
+the threads of the self-hosted server only: a Lambda container handles one request at a time, so it never has
+concurrent conversions and the service leaves the coalescer off there.
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = 'local-crontab:v1:'
+# Entries outlive the end of their year by this many seconds, clients near the boundary may still ask for them
+TTL_MARGIN = 3600
+
+
+def year_end_ttl(timezone, year: int) -> int:
+    """Return the seconds left until the end of `year` in `timezone`, plus TTL_MARGIN."""
+    year_end = datetime(year + 1, 1, 1, tzinfo=timezone)
+    return max(int(year_end.timestamp() - time.time()), 0) + TTL_MARGIN
+
+
+class SharedCache(ABC):
+    """Base class of the shared caches, values are lists of UTC crons.
+
+    Subclasses implement `_get` and `_set`, errors of the backend are logged and turned into misses.
+    """
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Return the cached crons, None on a miss or on a backend error."""
+        try:
+            value = self._get(KEY_PREFIX + key)
+        except Exception as ex:
+            log.warning(f"Shared cache get error: {ex}")
+            return None
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value.split('\n')
+
+    def set(self, key: str, crons: List[str], ttl: int) -> None:
+        """Store the crons for `ttl` seconds, backend errors are only logged."""
+        try:
+            self._set(KEY_PREFIX + key, '\n'.join(crons), ttl)
+        except Exception as ex:
+            log.warning(f"Shared cache set error: {ex}")
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Return the stored value of a prefixed key, None if it is missing or expired."""
+
+    @abstractmethod
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        """Store the value of a prefixed key for `ttl` seconds."""
+
+
+class MemoryCache(SharedCache):
+    """In process cache with expiration. When it is full, the oldest entry is dropped.
+
+    Attributes:
+        max_size (int): Maximum number of entries kept
+    """
+
+    def __init__(self, max_size: int = 100000) -> None:
+        self.max_size = max_size
+        self._store: Dict[str, Tuple[float, str]] = dict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._store[key]
+                return None
+            return entry[1]
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._store.pop(key, None)
+            self._store[key] = (time.time() + ttl, value)
+            if len(self._store) > self.max_size:
+                del self._store[next(iter(self._store))]
+
+
+class SqliteCache(SharedCache):
+    """Cache stored in a sqlite file, safe for many threads and processes.
+
+    Attributes:
+        path (str): Path of the sqlite file, created if it does not exist
+    """
+    # Expired entries are deleted once every this many writes
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str) -> None:
+        import sqlite3
+
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)')
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute('SELECT value FROM cache WHERE key = ? AND expires > ?',
+                                           (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)', (key, value, now + ttl))
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._connection.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+
+
+class RedisCache(SharedCache):
+    """Cache stored in a Redis compatible server.
+
+    Attributes:
+        client: Redis client, anything with `get(key)` and `set(key, value, ex=seconds)`
+    """
+
+    def __init__(self, client) -> None:
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> 'RedisCache':
+        """Connect to a server, eg: redis://localhost:6379/0"""
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2))
+
+    def _get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+
+def get_shared_cache(url: Optional[str]) -> Optional[SharedCache]:
+    """Return the shared cache of an URL, None if it is empty.
+
+    :param url: 'memory', 'sqlite:///path/to/file' or 'redis://host:port/db'
+    :return: The shared cache
+    """
+    if not url:
+        return None
+    if url == 'memory':
+        return MemoryCache()
+    if url.startswith('sqlite://'):
+        return SqliteCache(url[len('sqlite://'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCache.from_url(url)
+    raise ValueError(f'Unknown shared cache "{url}"')
+
+
+class Coalescer:
+    """Run a single computation for concurrent calls with the same key, the other callers share its outcome."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = dict()
+
+    def run(self, key: Hashable, compute: Callable) -> Tuple[Any, bool]:
+        """Return `compute()` and False, or the result of the computation of `key` already in flight and True."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result(), True
+        try:
+            result = compute()
+        except BaseException as ex:
+            call.set_exception(ex)
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The Lambda code is deployed as top level modules, so tests import it the same way
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if LAMBDA_DIR not in sys.path:
+    sys.path.insert(0, LAMBDA_DIR)
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from local_crontab import Converter
+
+import local_crontab_service
+from api_gateway_parser.api_gateway_request import APIGatewayRequest
+
+
+def test_headers_are_case_insensitive_and_read_only():
+    request = APIGatewayRequest({'headers': {'Accept-Encoding': 'gzip', 'If-None-Match': '*'}}, None)
+
+    assert request.headers.get('accept-encoding') == 'gzip'
+    assert request.headers['if-none-match'] == '*'
+    with pytest.raises(TypeError):
+        request.headers['accept'] = 'application/json'
+
+
+@pytest.mark.parametrize('name', ['From', 'class', 'Content-Type', '1st-header'])
+def test_headers_with_any_name(name):
+    request = APIGatewayRequest({'headers': {name: 'value'}}, None)
+
+    assert request.headers[name.lower()] == 'value'
+
+
+def test_missing_parameters_are_empty():
+    # API Gateway sends None for absent parameters
+    request = APIGatewayRequest({'headers': None, 'pathParameters': None, 'queryStringParameters': None}, None)
+
+    assert dict(request.headers) == dict(request.path) == dict(request.query) == dict()
+
+
+def test_handler_with_from_header():
+    event = {
+        'resource': local_crontab_service.CONVERSION_RESOURCE,
+        'httpMethod': 'POST',
+        'headers': {'From': 'user@example.com', 'Accept': 'application/json'},
+        'body': json.dumps({'cron': '0 10 * * *', 'timezone': 'Europe/Rome'}),
+    }
+
+    response = local_crontab_service.lambda_handler(event, None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body']) == Converter('0 10 * * *', 'Europe/Rome').to_utc_crons()
@@ -0,0 +1,27 @@
+import json
+
+from api_gateway_parser.api_gateway_response import BASE_HEADERS, APIGatewayResponse, build_response
+from api_gateway_parser.http_status_constants import HttpStatusCode
+
+CRONS = ['10 9 * 1-2 *', '10 8 * 4-9 *']
+
+
+def test_same_response_of_the_class():
+    expected = APIGatewayResponse(body=CRONS, headers={'ETag': '"abc"'}).serialized
+    expected['body'] = json.dumps(expected['body'])
+
+    assert build_response(body=CRONS, headers={'ETag': '"abc"'}) == expected
+
+
+def test_serialized_body_is_used_as_is():
+    response = build_response(status_code=HttpStatusCode.HTTP_STATUS_NOT_MODIFIED, body='', serialized=True)
+
+    assert response == {'body': '', 'headers': BASE_HEADERS, 'statusCode': 304, 'isBase64Encoded': False}
+
+
+def test_headers_are_not_shared():
+    build_response(body=CRONS)['headers']['ETag'] = '"abc"'
+    build_response(body=CRONS, headers={'Vary': 'Accept'})['headers']['ETag'] = '"abc"'
+
+    assert 'ETag' not in build_response(body=CRONS)['headers']
+    assert 'ETag' not in BASE_HEADERS
@@ -0,0 +1,52 @@
+import pytest
+from local_crontab import Converter
+
+import local_crontab_service
+from bulk_converter import convert_many
+
+ITEMS = [
+    {'cron': '0 10 * * *', 'timezone': 'Europe/Rome', 'id': 1},
+    {'cron': '30 8 * * 1-5', 'timezone': 'America/New_York'},
+    {'cron': '0 10 * * *', 'timezone': 'Mars/Olympus_Mons'},
+    {'cron': '0 10 * * *'},
+    {'cron': '0 10 * * 0-6', 'timezone': 'Europe/Rome'},
+    {'cron': '30 8 * * 1-5', 'timezone': 'America/New_York', 'id': 'b'},
+    'not an object',
+]
+
+
+def check_results(results):
+    assert [(result['cron'], result['timezone']) for result in results[:-1]] == \
+        [(item['cron'], item.get('timezone')) for item in ITEMS[:-1]]
+    assert results[0]['id'] == 1 and results[5]['id'] == 'b' and 'id' not in results[1]
+    for position in (0, 1, 4, 5):
+        item = ITEMS[position]
+        assert results[position]['crons'] == Converter(item['cron'], item['timezone']).to_utc_crons()
+    assert 'Incorrect Timezone string' in results[2]['message']
+    assert results[3]['message'] == results[6]['message'] == 'item must contain the strings "cron" and "timezone"'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_results_in_input_order(chunk_size):
+    check_results(list(convert_many(ITEMS, workers=0, chunk_size=chunk_size)))
+
+
+def test_identical_pairs_are_converted_once(monkeypatch):
+    calls = []
+
+    def convert(cron, timezone):
+        calls.append((cron, timezone))
+        return local_crontab_service.IndexedConverter(
+            cron, local_crontab_service.get_timezone_index(timezone), 2026).to_utc_crons()
+
+    monkeypatch.setattr(local_crontab_service, 'convert', convert)
+
+    list(convert_many(ITEMS * 3, workers=0, chunk_size=2))
+
+    # '0 10 * * 0-6' is normalized to '0 10 * * *'
+    assert sorted(calls) == [('0 10 * * *', 'Europe/Rome'), ('0 10 * * *', 'Mars/Olympus_Mons'),
+                             ('30 8 * * 1-5', 'America/New_York')]
+
+
+def test_process_pool():
+    check_results(list(convert_many(iter(ITEMS), workers=2, chunk_size=2)))
@@ -0,0 +1,66 @@
+import pytest
+
+from compact_format import (MEDIA_TYPE, accepts_compact, decode, decode_batch, encode, encode_batch, encode_cron)
+from cron_normalizer import expand_cron
+
+
+def day_fields_starred(cron):
+    parts = cron.split()
+    return parts[2].startswith('*'), parts[4].startswith('*')
+
+
+@pytest.mark.parametrize('cron', [
+    '0 9 * * *',
+    '0 9 1-28 3 *',
+    '*/15 0-23 * * *',
+    '30 */4 * 1-6 1-5',
+    '0 0 */2 * 1',
+    '0 0 1-31/2 * 1',
+    '0 0 1 * */7',
+    '0 0 1-31 1-12 0-6',
+    '0 0 */2,6 * 1',
+    '5 4 29 2 0',
+])
+def test_round_trip(cron):
+    decoded = decode(encode([cron]))[0].to_cron()
+
+    assert expand_cron(decoded) == expand_cron(cron)
+    # Cron ORs the day fields only when neither starts with '*'
+    assert day_fields_starred(decoded) == day_fields_starred(cron)
+
+
+def test_starred_day_fields_have_their_own_encoding():
+    assert encode_cron('0 0 */2 * 1') != encode_cron('0 0 1-31/2 * 1')
+    assert encode_cron('0 0 1 * */1') == encode_cron('0 0 1 * *')
+    assert encode_cron('0 0 1 * 0-6') != encode_cron('0 0 1 * *')
+
+
+def test_masks():
+    cron, = decode(encode(['0 9 1-28 3 *']))
+
+    assert cron.masks[:4] == (1, 1 << 9, (1 << 28) - 1, 1 << 2)
+    assert cron.wildcards == 1 << 4
+
+
+def test_batch():
+    results = [{'cron': '0 10 * * *', 'timezone': 'UTC', 'crons': ['0 10 * * *']},
+               {'cron': '0 10 * * *', 'timezone': 'Bad/Zone', 'message': 'Incorrect Timezone string'},
+               {'cron': '0 10 * * *', 'timezone': 'UTC', 'crons': []}]
+
+    crons, message, empty = decode_batch(encode_batch(results))
+
+    assert [cron.to_cron() for cron in crons] == ['0 10 * * *']
+    assert message == 'Incorrect Timezone string'
+    assert empty == []
+
+
+@pytest.mark.parametrize('accept, expected', [
+    (None, False),
+    ('application/json', False),
+    (MEDIA_TYPE, True),
+    (f'{MEDIA_TYPE}, application/json;q=0.5', True),
+    (f'application/json, {MEDIA_TYPE};q=0.5', False),
+    (f'{MEDIA_TYPE};q=0', False),
+])
+def test_accepts_compact(accept, expected):
+    assert accepts_compact(accept) == expected
@@ -0,0 +1,63 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+from api_gateway_parser import compression
+from api_gateway_parser.compression import compress_response, negotiate_encoding
+
+
+class StubBrotli:
+    @staticmethod
+    def compress(body, quality):
+        return b'br' + gzip.compress(body)
+
+
+@pytest.fixture
+def brotli(monkeypatch):
+    monkeypatch.setattr(compression, '_brotli', lambda: StubBrotli)
+
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(compression, '_brotli', lambda: None)
+
+
+@pytest.mark.parametrize('accept_encoding, encoding', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip, deflate, br', 'br'),
+    ('gzip, br;q=0.9', 'gzip'),
+    ('*', 'br'),
+    ('br;q=0, *', 'gzip'),
+    ('*, br;q=0', 'gzip'),
+    ('gzip;q=0, *', 'br'),
+    ('br;q=0, gzip;q=0, *', None),
+    ('*;q=0.5, gzip', 'gzip'),
+    ('*;q=0', None),
+    ('gzip;q=x, br', 'br'),
+])
+def test_negotiate_encoding(brotli, accept_encoding, encoding):
+    assert negotiate_encoding(accept_encoding) == encoding
+
+
+@pytest.mark.parametrize('accept_encoding, encoding', [('br', None), ('br, gzip;q=0.1', 'gzip'), ('*', 'gzip')])
+def test_negotiate_encoding_without_brotli(no_brotli, accept_encoding, encoding):
+    assert negotiate_encoding(accept_encoding) == encoding
+
+
+def test_compress_response(no_brotli):
+    body = json.dumps(['0 9 * 1-2 *'] * 100)
+    response = compress_response({'body': body, 'headers': {'Vary': 'Accept'}, 'isBase64Encoded': False}, 'gzip')
+
+    assert response['isBase64Encoded']
+    assert gzip.decompress(base64.b64decode(response['body'])).decode('utf-8') == body
+    assert response['headers'] == {'Content-Encoding': 'gzip', 'Vary': 'Accept, Accept-Encoding'}
+
+
+def test_incompressible_body_is_left_as_is(no_brotli):
+    response = {'body': '[]', 'headers': {}, 'isBase64Encoded': False}
+
+    assert compress_response(dict(response), 'gzip') == response
@@ -0,0 +1,60 @@
+import pytest
+
+from conversion_cache import LRUCache
+
+
+def test_get_put():
+    cache = LRUCache(max_size=2)
+
+    assert cache.get(('0 10 * * *', 'Europe/Rome', 2026)) is None
+    cache.put(('0 10 * * *', 'Europe/Rome', 2026), ('0 9 * 1-3 *', '0 8 * 4-10 *'))
+
+    assert cache.get(('0 10 * * *', 'Europe/Rome', 2026)) == ('0 9 * 1-3 *', '0 8 * 4-10 *')
+    assert ('0 10 * * *', 'Europe/Rome', 2026) in cache
+    assert cache.stats == {'size': 1, 'max_size': 2, 'hits': 1, 'misses': 1}
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    # A hit makes 'a' the most recently used, so 'b' is evicted
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert len(cache) == 2
+
+
+def test_put_refreshes_existing_key():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 10)
+    cache.put('c', 3)
+
+    assert cache.get('a') == 10
+    assert 'b' not in cache
+
+
+def test_zero_size_disables_cache():
+    cache = LRUCache(max_size=0)
+    cache.put('a', 1)
+
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_negative_size():
+    with pytest.raises(ValueError):
+        LRUCache(max_size=-1)
+
+
+def test_clear():
+    cache = LRUCache()
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('b')
+    cache.clear()
+
+    assert cache.stats == {'size': 0, 'max_size': 1024, 'hits': 0, 'misses': 0}
@@ -0,0 +1,40 @@
+import pytest
+from local_crontab import Converter
+
+from cron_normalizer import CronNormalizationError, expand_cron, normalize_cron
+
+
+@pytest.mark.parametrize('cron, normalized', [
+    ('00 10 * * MON-SUN', '0 10 * * *'),
+    ('0  10   *  *  *', '0 10 * * *'),
+    ('0,15,30,45 * * * *', '*/15 * * * *'),
+    ('0-59/15 * * * *', '*/15 * * * *'),
+    ('0 9-17 * * mon-fri', '0 9-17 * * 1-5'),
+    ('0 9 1-31 JAN-DEC *', '0 9 * * *'),
+    ('0 9 * * 7', '0 9 * * 0'),
+    ('5,1,3,2 0 * * *', '1-3,5 0 * * *'),
+    ('0 0 1,1,15 * *', '0 0 1,15 * *'),
+    ('10-20/5 * * * *', '10-20/5 * * * *'),
+])
+def test_normalize(cron, normalized):
+    assert normalize_cron(cron) == normalized
+    assert normalize_cron(normalized) == normalized
+
+
+@pytest.mark.parametrize('cron', ['0 10 * * MON-SAT', '0,15,30,45 2 * * *', '0 9 1-31 JAN-DEC *', '0 9 * * 7',
+                                  '30 1-3 15 * SAT,SUN', '*/20 9-17 * 3-10 mon-fri'])
+@pytest.mark.parametrize('timezone', ['Europe/Rome', 'America/Sao_Paulo', 'Asia/Tokyo'])
+def test_normalized_crons_convert_the_same(cron, timezone):
+    assert Converter(normalize_cron(cron), timezone, 2026).to_utc_crons() == \
+        Converter(cron, timezone, 2026).to_utc_crons()
+
+
+@pytest.mark.parametrize('cron', ['0 10 * *', '61 10 * * *', 'not a cron at all', '0 10 * * FOO'])
+def test_unparsable_crons_are_only_collapsed(cron):
+    assert normalize_cron(f'  {cron} ') == ' '.join(cron.split())
+
+
+def test_expand_cron():
+    assert expand_cron('*/20 9-11 1,15 FEB sun') == [[0, 20, 40], [9, 10, 11], [1, 15], [2], [0]]
+    with pytest.raises(CronNormalizationError):
+        expand_cron('0 24 * * *')
@@ -0,0 +1,48 @@
+import pytest
+
+from cron_verifier import reverse, verify
+from timezone_index import IndexedConverter, get_timezone_index
+
+YEAR = 2026
+CRONS = ['5 * * * *', '*/15 * * * *', '0 10 * * *', '30 6 1,15 * *', '0 12 * 6-8 *']
+TIMEZONES = ['UTC', 'Asia/Tokyo', 'America/Sao_Paulo', 'Europe/Rome', 'America/New_York']
+
+
+def convert(cron, timezone):
+    return IndexedConverter(cron, get_timezone_index(timezone), YEAR).to_utc_crons()
+
+
+@pytest.mark.parametrize('timezone', TIMEZONES)
+@pytest.mark.parametrize('cron', CRONS)
+def test_fresh_conversions_verify_and_reverse(cron, timezone):
+    utc_crons = convert(cron, timezone)
+
+    assert verify(utc_crons, timezone, cron, YEAR).matches
+    reversed_cron = reverse(utc_crons, timezone, YEAR)
+    assert reversed_cron.matches
+    assert reversed_cron.cron == cron
+
+
+@pytest.mark.parametrize('cron', ['0 12 15 * 1', '0 12 1,15 * 1-5', '0 12 * * 1', '0 12 1 * *'])
+def test_reverse_day_fields(cron):
+    # Both day fields restricted are ORed, like cron does
+    assert reverse([cron], 'UTC', YEAR)[:2] == (cron, True)
+
+
+def test_reverse_or_in_a_timezone():
+    assert reverse(convert('0 12 15 * 1', 'Asia/Tokyo'), 'Asia/Tokyo', YEAR)[:2] == ('0 12 15 * 1', True)
+
+
+def test_mismatches_are_utc_windows():
+    verification = verify(['0 9 * * *'], 'Europe/Rome', '0 10 * * *', YEAR)
+
+    assert not verification.matches
+    # Summer time starts on March 29th: 10:00 local is 08:00 UTC, not 09:00, until October 25th
+    first = verification.mismatches[0]
+    assert (first.start.isoformat(), first.end.isoformat()) == ('2026-03-29T08:00:00', '2026-03-29T10:00:00')
+    assert (first.missing, first.extra) == (1, 1)
+    assert len(verification.mismatches) == 210
+
+
+def test_never_firing_crons():
+    assert reverse(['0 0 30 2 *'], 'Europe/Rome', YEAR)[:2] == (None, True)
@@ -0,0 +1,37 @@
+import io
+
+from crontab_stream import convert_crontab, convert_ndjson
+
+
+def fake_convert(cron, timezone):
+    if timezone == 'Bad/Zone':
+        raise ValueError('Incorrect Timezone string')
+    return [f'{cron} {timezone}']
+
+
+def test_only_cron_tz_switches_the_timezone():
+    crontab = io.StringIO('TZ=Asia/Tokyo\n0 10 * * * first\nCRON_TZ=America/New_York\n@daily second\n')
+
+    assert list(convert_crontab(crontab, 'Europe/Rome', fake_convert)) == [
+        'TZ=Asia/Tokyo\n',
+        '0 10 * * * Europe/Rome first\n',
+        '# CRON_TZ=America/New_York\n',
+        '0 0 * * * America/New_York second\n',
+    ]
+
+
+def test_crontab_errors_keep_the_line():
+    output = list(convert_crontab(io.StringIO('0 10 * * * job\n'), 'Bad/Zone', fake_convert))
+
+    assert output == ['# ERROR Incorrect Timezone string\n# 0 10 * * * job\n']
+
+
+def test_ndjson_errors_are_reported_per_line():
+    lines = io.StringIO('{"cron": "0 10 * * *"}\nnot json\n\n[1]\n')
+
+    output = list(convert_ndjson(lines, 'Europe/Rome', fake_convert))
+
+    assert len(output) == 3
+    assert '"crons": ["0 10 * * * Europe/Rome"]' in output[0]
+    assert 'invalid JSON' in output[1]
+    assert 'must contain' in output[2]
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from dateutil import tz
+
+from fire_times import fire_times_between, next_fire_times
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def test_regular_days():
+    assert next_fire_times('0 10 * * *', 'Europe/Rome', 3, datetime(2026, 1, 10, 9)) == \
+        [utc(2026, 1, 10, 9), utc(2026, 1, 11, 9), utc(2026, 1, 12, 9)]
+    assert next_fire_times('0 10 * * *', 'Europe/Rome', 1, datetime(2026, 7, 10, 8, 1)) == [utc(2026, 7, 11, 8)]
+
+
+def test_skipped_times_are_shifted_by_the_gap():
+    # Europe/Rome skips from 02:00 to 03:00: 02:00 and 02:30 fire at 03:00 and 03:30, together with them
+    assert next_fire_times('*/30 1-3 * * *', 'Europe/Rome', 5, datetime(2026, 3, 28, 22)) == \
+        [utc(2026, 3, 29, 0), utc(2026, 3, 29, 0, 30), utc(2026, 3, 29, 1), utc(2026, 3, 29, 1, 30),
+         utc(2026, 3, 29, 23)]
+
+
+def test_half_hour_gap():
+    # Australia/Lord_Howe skips from 02:00 to 02:30: 02:00 -> 02:30 and 02:20 -> 02:50, 02:40 is not skipped
+    assert next_fire_times('*/20 2 * * *', 'Australia/Lord_Howe', 5, datetime(2026, 10, 3, 12)) == \
+        [utc(2026, 10, 3, 15, 30), utc(2026, 10, 3, 15, 40), utc(2026, 10, 3, 15, 50),
+         utc(2026, 10, 4, 15), utc(2026, 10, 4, 15, 20)]
+
+
+def test_repeated_times_fire_once():
+    # Europe/Rome repeats 02:00-03:00: 02:00 and 02:30 fire at their first occurrence only
+    assert next_fire_times('*/30 1-3 * * *', 'Europe/Rome', 7, datetime(2026, 10, 24, 22)) == \
+        [utc(2026, 10, 24, 23), utc(2026, 10, 24, 23, 30), utc(2026, 10, 25, 0), utc(2026, 10, 25, 0, 30),
+         utc(2026, 10, 25, 2), utc(2026, 10, 25, 2, 30), utc(2026, 10, 26, 0)]
+
+
+def test_half_hour_overlap():
+    # Australia/Lord_Howe repeats 01:30-02:00: 01:40 fires once, at +11
+    assert next_fire_times('*/20 1 * * *', 'Australia/Lord_Howe', 4, datetime(2026, 4, 4, 12)) == \
+        [utc(2026, 4, 4, 14), utc(2026, 4, 4, 14, 20), utc(2026, 4, 4, 14, 40), utc(2026, 4, 5, 14, 30)]
+
+
+@pytest.mark.parametrize('timezone', ['Europe/Rome', 'Australia/Lord_Howe', 'America/Santiago', 'Asia/Tokyo'])
+def test_fire_times_match_the_local_schedule(timezone):
+    # Outside the transitions every fire time is a matching local time, in increasing order without duplicates
+    zone = tz.gettz(timezone)
+    fire_times = fire_times_between('*/15 0-3 * * 0,3', timezone, utc(2026, 1, 1), utc(2027, 1, 1))
+
+    assert fire_times == sorted(set(fire_times))
+    for fire_time in fire_times:
+        local = fire_time.astimezone(zone)
+        if zone.utcoffset(local.replace(tzinfo=None) - timedelta(days=1)) == local.utcoffset():
+            assert local.minute % 15 == 0 and local.hour <= 3 and local.isoweekday() % 7 in (0, 3), local
+
+
+def test_never_fires():
+    assert next_fire_times('0 0 30 2 *', 'Europe/Rome', 1, datetime(2026, 1, 1)) == []
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+# The tuning model is a benchmark script, not part of the Lambda code
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              'benchmarks')
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+from lambda_tuning import FULL_VCPU_MEMORY, evaluate, recommend, simulated_duration  # noqa: E402
+
+
+@pytest.mark.parametrize('memory, duration', [(FULL_VCPU_MEMORY, 10), (3008, 10), (FULL_VCPU_MEMORY // 2, 20)])
+def test_duration_scales_with_memory(memory, duration):
+    assert simulated_duration(10, memory) == pytest.approx(duration, rel=1e-3)
+
+
+def test_cfs_quota():
+    # Half a vCPU: 5 ms of CPU in each 10 ms period
+    memory = FULL_VCPU_MEMORY / 2
+    assert simulated_duration(3, memory, 10) == pytest.approx(3)
+    assert simulated_duration(12, memory, 10) == pytest.approx(22)
+
+
+def test_faster_arm64_shortens_durations():
+    latencies = [4.0] * 100
+    x86 = evaluate(latencies, FULL_VCPU_MEMORY, 'x86_64')
+    arm64 = evaluate(latencies, FULL_VCPU_MEMORY, 'arm64', arm64_speed=2.0)
+
+    assert x86['latency_ms']['p99'] == pytest.approx(4.0)
+    assert arm64['latency_ms']['p99'] == pytest.approx(2.0)
+    assert (x86['billed_ms'], arm64['billed_ms']) == (4, 2)
+    assert arm64['cost_per_million'] < x86['cost_per_million']
+
+
+def test_faster_host_lengthens_durations():
+    assert evaluate([4.0], FULL_VCPU_MEMORY, 'x86_64', host_speed=2.0)['latency_ms']['p99'] == pytest.approx(8.0)
+
+
+def test_recommend_the_cheapest_configuration_meeting_the_target():
+    latencies = [3.0] * 100
+    configurations = [evaluate(latencies, memory, architecture)
+                      for architecture in ('x86_64', 'arm64') for memory in (128, 512, 1024, FULL_VCPU_MEMORY)]
+
+    best = recommend(configurations, target_p99=10, min_memory=256)
+    assert best['memory'] >= 256 and best['latency_ms']['p99'] <= 10
+    assert best['cost_per_million'] == min(configuration['cost_per_million'] for configuration in configurations
+                                           if configuration['memory'] >= 256 and
+                                           configuration['latency_ms']['p99'] <= 10)
+    assert recommend(configurations, target_p99=1, min_memory=0) is None
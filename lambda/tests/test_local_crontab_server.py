@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+from local_crontab import Converter
+
+import local_crontab_service
+from local_crontab_server import CORS_HEADERS, LocalCrontabServer, build_event
+
+
+def request(method, target, body=b'', headers=None):
+    head = [f'{method} {target} HTTP/1.1', 'Host: localhost', f'Content-Length: {len(body)}']
+    head.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+async def read_response(reader):
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    status = int(head[0].split(' ')[1])
+    headers = dict(line.split(': ', 1) for line in head[1:] if line)
+    body = await reader.readexactly(int(headers.get('Content-Length', 0)))
+    return status, headers, body
+
+
+def exchange(server, *requests):
+    """Send the requests on a single connection, return the responses and whether the server closed it."""
+    async def run():
+        server._semaphore = asyncio.Semaphore(server.max_concurrency)
+        listener = await asyncio.start_server(server._handle_connection, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for raw_request in requests:
+            writer.write(raw_request)
+            await writer.drain()
+            responses.append(await read_response(reader))
+        closed = await asyncio.wait_for(reader.read(), server.keep_alive_timeout + 1) == b''
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return responses, closed
+
+    return asyncio.run(run())
+
+
+def test_build_event():
+    event = build_event('GET', '/utc-crontab?cron=0+10+*+*+*&timezone=Europe%2FRome', {'Accept': 'application/json'},
+                        b'', ('127.0.0.1', 50000))
+
+    assert event['resource'] == '/utc-crontab' and event['httpMethod'] == 'GET'
+    assert event['queryStringParameters'] == {'cron': '0 10 * * *', 'timezone': 'Europe/Rome'}
+    assert event['body'] is None and not event['isBase64Encoded']
+    assert event['requestContext']['identity']['sourceIp'] == '127.0.0.1'
+
+
+def test_binary_body_is_base64_encoded():
+    event = build_event('POST', '/utc-crontab', {}, b'\xff\xfe', None)
+
+    assert event['body'] == '//4=' and event['isBase64Encoded']
+
+
+def test_requests_on_a_keep_alive_connection():
+    server = LocalCrontabServer(local_crontab_service.lambda_handler, workers=2, keep_alive_timeout=0.5)
+    body = json.dumps({'cron': '0 10 * * *', 'timezone': 'Europe/Rome'}).encode('utf-8')
+
+    responses, closed = exchange(
+        server,
+        request('POST', '/utc-crontab', body, {'Content-Type': 'application/json'}),
+        request('OPTIONS', '/utc-crontab'),
+        request('GET', '/unknown'))
+
+    (status, headers, response_body), options, not_found = responses
+    assert status == 200 and headers['Connection'] == 'keep-alive'
+    assert json.loads(response_body) == Converter('0 10 * * *', 'Europe/Rome').to_utc_crons()
+    assert options[0] == 200 and options[1]['Access-Control-Allow-Methods'] == CORS_HEADERS[
+        'Access-Control-Allow-Methods']
+    assert not_found[0] == 404
+    # The idle connection is closed after the keep-alive timeout
+    assert closed
+
+
+def test_connection_close():
+    server = LocalCrontabServer(lambda event, context: {'statusCode': 200, 'body': '[]'}, workers=0)
+
+    responses, closed = exchange(server, request('POST', '/utc-crontab/batch', b'{}', {'Connection': 'close'}))
+
+    assert responses == [(200, {'Content-Type': 'application/json', 'Content-Length': '2', 'Connection': 'close'},
+                          b'[]')]
+    assert closed
+
+
+def test_handler_errors():
+    def handler(event, context):
+        raise RuntimeError('boom')
+
+    server = LocalCrontabServer(handler, workers=1)
+
+    (status, _, body), = exchange(server, request('POST', '/utc-crontab', b'{}', {'Connection': 'close'}))[0]
+
+    assert status == 500 and json.loads(body) == {'message': 'Internal Server Error'}
+
+
+def test_malformed_requests():
+    server = LocalCrontabServer(lambda event, context: {'statusCode': 200, 'body': '[]'}, workers=0)
+
+    responses, closed = exchange(server, b'POST /utc-crontab HTTP/1.1\r\nContent-Length: x\r\n\r\n')
+
+    assert responses[0][0] == 400 and closed
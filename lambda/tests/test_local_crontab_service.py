@@ -0,0 +1,188 @@
+import json
+
+import pytest
+from local_crontab import Converter
+
+import local_crontab_service
+
+
+def batch_event(items):
+    return {
+        'resource': local_crontab_service.BATCH_RESOURCE,
+        'httpMethod': 'POST',
+        'headers': {'Accept': 'application/json'},
+        'body': json.dumps({'items': items}),
+    }
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    local_crontab_service.conversion_cache.clear()
+    yield
+    local_crontab_service.conversion_cache.clear()
+
+
+def test_batch_results_in_input_order():
+    items = [
+        {'cron': '0 10 * * *', 'timezone': 'Europe/Rome'},
+        {'cron': '30 8 * * 1-5', 'timezone': 'America/New_York'},
+        {'cron': '0 10 * * *', 'timezone': 'Europe/Rome'},
+    ]
+
+    response = local_crontab_service.lambda_handler(batch_event(items), None)
+
+    assert response['statusCode'] == 200
+    results = json.loads(response['body'])
+    assert [(result['cron'], result['timezone']) for result in results] == \
+        [(item['cron'], item['timezone']) for item in items]
+    for item, result in zip(items, results):
+        assert result['crons'] == Converter(item['cron'], item['timezone']).to_utc_crons()
+
+
+def test_batch_item_errors_do_not_fail_the_batch():
+    items = [
+        {'cron': '0 10 * * *', 'timezone': 'Mars/Olympus_Mons'},
+        {'cron': '0 10 * * *', 'timezone': 'Europe/Rome'},
+        {'cron': 'not a cron', 'timezone': 'Europe/Rome'},
+        {'cron': '0 10 * * *'},
+        {'cron': '0 12 * * *', 'timezone': 'Mars/Olympus_Mons'},
+    ]
+
+    response = local_crontab_service.lambda_handler(batch_event(items), None)
+
+    assert response['statusCode'] == 200
+    results = json.loads(response['body'])
+    assert len(results) == len(items)
+    assert 'crons' not in results[0] and 'items[0].timezone' in results[0]['message']
+    assert results[1]['crons'] == Converter('0 10 * * *', 'Europe/Rome').to_utc_crons()
+    assert 'crons' not in results[2] and results[2]['message']
+    assert 'crons' not in results[3] and results[3]['message']
+    # An invalid timezone is resolved once, the next items with it get the error straight away
+    assert results[4]['message'] == 'items[4].timezone: Incorrect Timezone string'
+
+
+def test_batch_reuses_conversions():
+    items = [{'cron': '0 10 * * *', 'timezone': 'Europe/Rome'}] * 3
+
+    local_crontab_service.lambda_handler(batch_event(items), None)
+
+    assert local_crontab_service.conversion_cache.stats['misses'] == 1
+    assert local_crontab_service.conversion_cache.stats['hits'] == 2
+
+
+@pytest.mark.parametrize('body', [{'items': 'not a list'}, {}])
+def test_batch_malformed_body(body):
+    event = batch_event([])
+    event['body'] = json.dumps(body)
+
+    response = local_crontab_service.lambda_handler(event, None)
+
+    assert response['statusCode'] == 400
+
+
+def test_batch_too_big():
+    items = [{'cron': '0 10 * * *', 'timezone': 'Europe/Rome'}] * (local_crontab_service.BATCH_MAX_ITEMS + 1)
+
+    response = local_crontab_service.lambda_handler(batch_event(items), None)
+
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['message'] == 'body.items: must contain between 1 and 1000 items'
+
+
+def conversion_event():
+    return {
+        'resource': local_crontab_service.CONVERSION_RESOURCE,
+        'httpMethod': 'POST',
+        'headers': {'Accept': 'application/json'},
+        'body': json.dumps({'cron': '0 10 * * *', 'timezone': 'Europe/Rome'}),
+    }
+
+
+def test_nothing_is_serialized_for_disabled_debug_logs(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('serialized for a disabled log')
+
+    monkeypatch.setattr(local_crontab_service.log, 'isEnabledFor', lambda level: False)
+    monkeypatch.setattr(local_crontab_service.APIGatewayRequest, '__repr__', fail)
+    dumps = json.dumps
+    monkeypatch.setattr(local_crontab_service.json, 'dumps',
+                        lambda obj, **kwargs: fail() if 'indent' in kwargs else dumps(obj, **kwargs))
+
+    response = local_crontab_service.lambda_handler(conversion_event(), None)
+
+    assert response['statusCode'] == 200
+
+
+def test_sampled_structured_log(monkeypatch, capsys):
+    monkeypatch.setattr(local_crontab_service, 'structured_log_sample_rate', 0.5)
+    monkeypatch.setattr(local_crontab_service, 'random', lambda: 0.25, raising=False)
+
+    local_crontab_service.lambda_handler(conversion_event(), None)
+
+    record = json.loads(capsys.readouterr().out)
+    assert set(record) == {'resource', 'status_code', 'latency_ms'}
+    assert record['resource'] == local_crontab_service.CONVERSION_RESOURCE and record['status_code'] == 200
+
+
+def test_structured_log_not_sampled(monkeypatch, capsys):
+    monkeypatch.setattr(local_crontab_service, 'structured_log_sample_rate', 0.5)
+    monkeypatch.setattr(local_crontab_service, 'random', lambda: 0.75, raising=False)
+
+    local_crontab_service.lambda_handler(conversion_event(), None)
+
+    assert capsys.readouterr().out == ''
+
+
+def get_event(headers=None, cron='0 10 * * *', timezone='Europe/Rome'):
+    return {
+        'resource': local_crontab_service.CONVERSION_RESOURCE,
+        'httpMethod': 'GET',
+        'headers': headers or {},
+        'queryStringParameters': {'cron': cron, 'timezone': timezone},
+        'body': None,
+    }
+
+
+def test_get_conversion_headers():
+    response = local_crontab_service.lambda_handler(get_event(), None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body']) == Converter('0 10 * * *', 'Europe/Rome').to_utc_crons()
+    headers = response['headers']
+    assert headers['ETag'].startswith('W/"') and headers['Vary'] == 'Accept'
+    assert 0 <= int(headers['Cache-Control'].split('max-age=')[1]) <= local_crontab_service.cache_max_age
+
+
+def test_matching_if_none_match_is_not_modified():
+    etag = local_crontab_service.lambda_handler(get_event(), None)['headers']['ETag']
+    misses = local_crontab_service.conversion_cache.stats['misses']
+    hits = local_crontab_service.conversion_cache.stats['hits']
+
+    for header in (etag, etag[2:], f'"other", {etag}', '*'):
+        response = local_crontab_service.lambda_handler(get_event({'If-None-Match': header}), None)
+
+        assert response['statusCode'] == 304 and response['body'] == ''
+        assert response['headers']['ETag'] == etag
+    # Nothing is converted, not even from the cache
+    assert local_crontab_service.conversion_cache.stats['misses'] == misses
+    assert local_crontab_service.conversion_cache.stats['hits'] == hits
+
+
+def test_post_with_if_none_match():
+    etag = local_crontab_service.lambda_handler(get_event(), None)['headers']['ETag']
+    event = conversion_event()
+    event['headers'] = {'If-None-Match': etag}
+
+    assert local_crontab_service.lambda_handler(event, None)['statusCode'] == 304
+
+
+def test_etag_changes_with_the_result():
+    etag = local_crontab_service.lambda_handler(get_event(), None)['headers']['ETag']
+
+    # Equivalent crons have the same tag, other timezones and response formats have their own
+    assert local_crontab_service.lambda_handler(get_event(cron='0 10 * * 0-6'), None)['headers']['ETag'] == etag
+    assert local_crontab_service.lambda_handler(get_event(timezone='Asia/Tokyo'), None)['headers']['ETag'] != etag
+    compact = local_crontab_service.lambda_handler(get_event({'Accept': 'application/x-crontab-bitmask'}), None)
+    assert compact['headers']['Content-Type'] == 'application/x-crontab-bitmask' and compact['headers']['ETag'] != etag
+    stale = local_crontab_service.lambda_handler(get_event({'If-None-Match': 'W/"stale"'}), None)
+    assert stale['statusCode'] == 200 and stale['headers']['ETag'] == etag
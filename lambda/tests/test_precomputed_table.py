@@ -0,0 +1,45 @@
+from local_crontab import Converter
+
+import local_crontab_service
+from precomputed_table import PrecomputedTable, build_table, expand_templates
+
+MATRIX = {'crons': ['0 {hour} * * *', '{minute} 9 * * 1-5'], 'timezones': ['Europe/Rome', 'Asia/Kolkata'],
+          'years': [2026, 2027]}
+
+
+def test_expand_templates():
+    crons = list(expand_templates(MATRIX['crons']))
+
+    assert crons[:3] == ['0 0 * * *', '0 1 * * *', '0 2 * * *']
+    assert crons[24:] == ['0 9 * * 1-5', '15 9 * * 1-5', '30 9 * * 1-5', '45 9 * * 1-5']
+
+
+def test_build_and_lookup(tmp_path):
+    path = str(tmp_path / 'precomputed.sqlite3')
+
+    assert build_table(MATRIX, path) == 28 * 2 * 2
+
+    table = PrecomputedTable(path)
+    for timezone in MATRIX['timezones']:
+        for year in MATRIX['years']:
+            for cron in ('0 10 * * *', '45 9 * * 1-5'):
+                assert table.lookup(cron, timezone, year) == Converter(cron, timezone, year).to_utc_crons()
+    assert table.lookup('0 10 * * *', 'Europe/Rome', 2028) is None
+    assert table.lookup('0 10 * * *', 'America/New_York', 2026) is None
+    assert table.lookup('5 10 * * *', 'Europe/Rome', 2026) is None
+
+
+def test_missing_table(tmp_path):
+    assert PrecomputedTable(str(tmp_path / 'missing.sqlite3')).lookup('0 10 * * *', 'Europe/Rome', 2026) is None
+
+
+def test_conversions_read_from_the_table(tmp_path, monkeypatch):
+    path = str(tmp_path / 'precomputed.sqlite3')
+    build_table(MATRIX, path)
+    monkeypatch.setattr(local_crontab_service, 'get_precomputed_table', lambda: PrecomputedTable(path))
+    timezone_index = local_crontab_service.get_timezone_index('Europe/Rome')
+
+    utc_crons, source = local_crontab_service.compute_conversion('0 10 * * *', 'Europe/Rome', timezone_index, 2026)
+
+    assert source == 'precomputed'
+    assert list(utc_crons) == Converter('0 10 * * *', 'Europe/Rome', 2026).to_utc_crons()
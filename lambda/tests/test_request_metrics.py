@@ -0,0 +1,102 @@
+import io
+import json
+
+import pytest
+
+import local_crontab_service
+from request_metrics import (EMFSink, InMemorySink, MetricsSink, NullSink, RequestMetrics, cron_shape,
+                             get_sink)
+
+
+@pytest.mark.parametrize('cron, shape', [
+    ('*/5 9-17 * * 1,3,5', '*/N N-N * * N,N'),
+    ('0  10 * *   MON-FRI', 'N N * * N-N'),
+    (None, 'invalid'),
+])
+def test_cron_shape(cron, shape):
+    assert cron_shape(cron) == shape
+
+
+def finished_metrics(sources):
+    metrics = RequestMetrics('/utc-crontab/batch')
+    metrics.mark('parse')
+    for source in sources:
+        metrics.record_conversion('0 10 * * *', 'Europe/Rome', source)
+    metrics.mark('conversion')
+    metrics.finish(200)
+    return metrics
+
+
+def test_request_metrics():
+    metrics = finished_metrics(['cache', 'converted', 'precomputed'])
+
+    assert list(metrics.phases) == ['parse', 'conversion']
+    assert metrics.cache_hits == 2
+    assert metrics.as_dict()['conversions'] == {'cache': 1, 'precomputed': 1, 'shared': 0, 'coalesced': 0,
+                                                'converted': 1}
+    assert metrics.timezones == {'Europe/Rome': 3} and metrics.cron_shapes == {'N N * * *': 3}
+    assert metrics.total_ms >= sum(metrics.phases.values())
+
+
+def test_in_memory_sink():
+    sink = InMemorySink(max_records=1)
+    sink.emit(finished_metrics(['cache', 'converted']))
+    sink.emit(finished_metrics(['cache', 'cache']))
+
+    summary = sink.summary
+    assert len(sink.records) == 1
+    assert summary['requests'] == 2 and summary['status_codes'] == {200: 2}
+    assert summary['cache_hit_rate'] == 0.75
+    assert set(summary['mean_phase_ms']) == {'parse', 'conversion'}
+    sink.clear()
+    assert sink.summary['requests'] == 0 and sink.summary['cache_hit_rate'] is None
+
+
+def test_emf_sink():
+    stream = io.StringIO()
+    EMFSink('Test', stream).emit(finished_metrics(['shared', 'converted']))
+
+    record = json.loads(stream.getvalue())
+    assert record['Resource'] == '/utc-crontab/batch' and record['StatusCode'] == 200
+    assert (record['CacheHits'], record['CacheMisses'], record['SharedCacheHits']) == (1, 1, 1)
+    metric, = record['_aws']['CloudWatchMetrics']
+    assert metric['Namespace'] == 'Test' and metric['Dimensions'] == [['Resource']]
+    # Every metric has its value in the record
+    assert all(entry['Name'] in record for entry in metric['Metrics'])
+    assert {'ParseMs', 'ConversionMs'} <= {entry['Name'] for entry in metric['Metrics']}
+
+
+def test_get_sink():
+    assert isinstance(get_sink(None), NullSink)
+    assert isinstance(get_sink('memory'), InMemorySink)
+    assert isinstance(get_sink('EMF'), EMFSink)
+    with pytest.raises(ValueError):
+        get_sink('statsd')
+
+
+def test_sinks_must_implement_emit():
+    class IncompleteSink(MetricsSink):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSink()
+
+
+def test_handler_emits_metrics(monkeypatch):
+    sink = InMemorySink()
+    monkeypatch.setattr(local_crontab_service, 'metrics_sink', sink)
+    event = {
+        'resource': local_crontab_service.CONVERSION_RESOURCE,
+        'httpMethod': 'POST',
+        'headers': {},
+        'body': json.dumps({'cron': '0 10 * * *', 'timezone': 'Europe/Rome'}),
+    }
+
+    local_crontab_service.lambda_handler(dict(event), None)
+    local_crontab_service.lambda_handler(dict(event), None)
+
+    record = sink.records[-1]
+    assert record.resource == local_crontab_service.CONVERSION_RESOURCE and record.status_code == 200
+    assert record.conversions['cache'] == 1
+    assert list(record.phases)[:3] == ['parse', 'method_check', 'validation']
+    assert sink.summary['requests'] == 2
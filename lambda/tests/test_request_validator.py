@@ -0,0 +1,39 @@
+import pytest
+
+import local_crontab_service
+from request_validator import RequestValidator, TimezoneValidationError, ValidationError
+
+validator = RequestValidator.from_file()
+
+
+@pytest.mark.parametrize('timezone', ['Europe/Rome', 'America/Sao_Paulo', 'UTC'])
+def test_valid_timezones(timezone):
+    validator.validate('CronConverterRequest', {'cron': '0 10 * * *', 'timezone': timezone})
+
+
+def test_unknown_timezone_has_its_own_error():
+    with pytest.raises(TimezoneValidationError, match='timezone: Incorrect Timezone string'):
+        validator.validate('CronConverterRequest', {'cron': '0 10 * * *', 'timezone': 'Mars/Olympus_Mons'})
+
+
+def test_invalid_cron_is_not_a_timezone_error():
+    with pytest.raises(ValidationError) as error:
+        validator.validate('CronConverterRequest', {'cron': '0 25 * * *', 'timezone': 'Europe/Rome'})
+    assert not isinstance(error.value, TimezoneValidationError)
+
+
+def test_batch_remembers_invalid_timezones():
+    results = local_crontab_service.convert_batch([
+        {'cron': '0 10 * * *', 'timezone': 'Mars/Olympus_Mons'},
+        {'cron': '0 11 * * *', 'timezone': 'Mars/Olympus_Mons'},
+        {'cron': '0 25 * * *', 'timezone': 'Asia/Tokyo'},
+        {'cron': '0 10 * * *', 'timezone': 'Asia/Tokyo'},
+    ])
+
+    assert [result.get('message') for result in results] == [
+        'items[0].timezone: Incorrect Timezone string',
+        'items[1].timezone: Incorrect Timezone string',
+        'items[2].cron: invalid cron "0 25 * * *"',
+        None,
+    ]
+    assert results[3]['crons'] == ['0 1 * * *']
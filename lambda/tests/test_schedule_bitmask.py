@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import schedule_bitmask
+from cron_normalizer import expand_cron
+from schedule_bitmask import ScheduleBitmask, from_schedules
+
+CRONS = ['0 9 * * *', '*/15 8-10 * * *', '30 9 1,15 * *', '0 9 * * 1-5', '0 9 1 * 1', '0 9 */2 * 1',
+         '0 */6 * 2-3 *', '45 23 28-31 2 *', '0 0 29 2 *']
+START = datetime(2026, 2, 27, 6)
+MINUTES = 4 * 24 * 60
+
+
+def fires(cron, minute):
+    """Brute force: does the cron fire in the minute, with the day rule of Vixie cron."""
+    minutes, hours, days, months, weekdays = expand_cron(cron)
+    parts = cron.split()
+    day_match, weekday_match = minute.day in days, (minute.weekday() + 1) % 7 in weekdays
+    if parts[2].startswith('*') or parts[4].startswith('*'):
+        day_matches = day_match and weekday_match
+    else:
+        day_matches = day_match or weekday_match
+    return minute.minute in minutes and minute.hour in hours and minute.month in months and day_matches
+
+
+def brute_force_firing(crons, start, minutes):
+    for offset in range(minutes):
+        minute = start + timedelta(minutes=offset)
+        indexes = [index for index, cron in enumerate(crons) if fires(cron, minute)]
+        if indexes:
+            yield minute, indexes
+
+
+@pytest.fixture(params=[False, True], ids=['int', 'numpy'])
+def use_numpy(request):
+    if request.param and schedule_bitmask.np is None:
+        pytest.skip('NumPy is not installed')
+    return request.param
+
+
+def test_firing_matches_brute_force(use_numpy):
+    bitmask = ScheduleBitmask(CRONS, use_numpy=use_numpy)
+
+    assert list(bitmask.firing(START, START + timedelta(minutes=MINUTES))) == \
+        list(brute_force_firing(CRONS, START, MINUTES))
+
+
+def test_histogram_matches_brute_force(use_numpy):
+    bitmask = ScheduleBitmask(CRONS, use_numpy=use_numpy)
+    expected = [0] * MINUTES
+    for minute, indexes in brute_force_firing(CRONS, START, MINUTES):
+        expected[int((minute - START).total_seconds()) // 60] = len(indexes)
+
+    assert bitmask.histogram(START, START + timedelta(minutes=MINUTES)) == expected
+
+
+def test_many_crons_span_several_words(use_numpy):
+    crons = [f'{minute} {hour} * * *' for hour in range(3) for minute in range(60)]
+    bitmask = ScheduleBitmask(crons, use_numpy=use_numpy)
+
+    assert bitmask.histogram(datetime(2026, 1, 1), datetime(2026, 1, 1, 4)) == [1] * 180 + [0] * 60
+
+
+def test_schedule_ids_and_aware_datetimes(use_numpy):
+    bitmask = from_schedules([['0 9 * * *', '0 10 * * *'], ['0 9 * * *']], use_numpy=use_numpy)
+    start = datetime(2026, 1, 1, 11, tzinfo=timezone(timedelta(hours=2)))
+
+    assert list(bitmask.firing(start, start + timedelta(hours=2))) == [
+        (datetime(2026, 1, 1, 9), [0, 1]), (datetime(2026, 1, 1, 10), [0])]
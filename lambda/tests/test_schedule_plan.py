@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from schedule_bitmask import ScheduleBitmask
+from schedule_plan import SchedulePlan, build_plan, write_plan
+
+START = datetime(2026, 3, 1)
+MINUTES = 10 * 24 * 60
+
+ITEMS = [
+    {'id': 'every-other-day', 'timezone': 'Europe/Rome', 'cron': '0 1 */2 * *', 'crons': ['0 0 */2 * 1']},
+    {'id': 'odd-days-or-mondays', 'timezone': 'Europe/Rome', 'cron': '0 1 1-31/2 * 1', 'crons': ['0 0 1-31/2 * 1']},
+    {'id': 'hourly', 'timezone': 'Asia/Tokyo', 'cron': '5 * * * *', 'crons': ['5 * * * *']},
+    {'id': 'same-as-hourly', 'timezone': 'Asia/Kolkata', 'cron': '35 * * * *', 'crons': ['5 * * * *']},
+    {'id': 'failed', 'timezone': 'Bad/Zone', 'cron': '0 10 * * *', 'message': 'Incorrect Timezone string'},
+]
+
+
+@pytest.fixture
+def plan(tmp_path):
+    schedules, groups, fires = build_plan(ITEMS, START, MINUTES)
+    path = str(tmp_path / 'plan.bin')
+    write_plan(path, START, schedules, groups, fires)
+    plan = SchedulePlan(path)
+    yield plan
+    plan.close()
+
+
+def test_groups():
+    schedules, groups, _ = build_plan(ITEMS, START, MINUTES)
+
+    assert [schedule.id for schedule in schedules] == ['same-as-hourly', 'hourly', 'every-other-day',
+                                                       'odd-days-or-mondays']
+    # '*/2' does not restrict the weekday field, '1-31/2' does: they are different schedules
+    assert [(group.cron, group.schedules) for group in groups] == [
+        ('5 * * * *', [0, 1]), ('0 0 */2 * 1', [2]), ('0 0 1-31/2 * 1', [3])]
+
+
+def test_lookup_matches_schedule_bitmask(plan):
+    crons = [plan.group(index).cron for index in range(plan.groups)]
+    expected = dict(ScheduleBitmask(crons).firing(START, START + timedelta(minutes=MINUTES)))
+
+    for minute in range(MINUTES):
+        at = START + timedelta(minutes=minute)
+        assert plan.firing(at) == expected.get(at, [])
+
+
+def test_schedules_at(plan):
+    def ids(at):
+        return [plan.schedule(index).id for index in plan.schedules_at(at)]
+
+    # '*/2' and Monday are ANDed, '1-31/2' or Monday are ORed
+    assert ids(datetime(2026, 3, 2)) == ['odd-days-or-mondays']  # even Monday
+    assert ids(datetime(2026, 3, 3)) == ['odd-days-or-mondays']  # odd Tuesday
+    assert ids(datetime(2026, 3, 4)) == []
+    assert ids(datetime(2026, 3, 9)) == ['every-other-day', 'odd-days-or-mondays']  # odd Monday
+    assert plan.schedules_at(datetime(2026, 3, 3, 0, 5, 30)) == [0, 1]
+    assert plan.schedules_at(START - timedelta(minutes=1)) == []
+    assert plan.timezones() == {'Asia/Kolkata': range(0, 1), 'Asia/Tokyo': range(1, 2), 'Europe/Rome': range(2, 4)}
@@ -0,0 +1,189 @@
+import threading
+import time
+
+import pytest
+from dateutil import tz
+
+import local_crontab_service
+import shared_cache
+from shared_cache import KEY_PREFIX, Coalescer, MemoryCache, RedisCache, SqliteCache, year_end_ttl
+
+
+class StubRedis:
+    """Client with the redis-py calls used by RedisCache, values stored as bytes like a real server."""
+
+    def __init__(self):
+        self.store = dict()
+
+    def get(self, key):
+        entry = self.store.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def set(self, key, value, ex=None):
+        self.store[key] = (time.time() + ex, value.encode('utf-8'))
+
+
+class FailingRedis:
+    def get(self, key):
+        raise ConnectionError('server down')
+
+    def set(self, key, value, ex=None):
+        raise ConnectionError('server down')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def cache(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCache()
+    if request.param == 'sqlite':
+        return SqliteCache(str(tmp_path / 'cache.sqlite3'))
+    return RedisCache(StubRedis())
+
+
+def test_get_set(cache):
+    assert cache.get('0 10 * * *|Europe/Rome|2026') is None
+
+    cache.set('0 10 * * *|Europe/Rome|2026', ['0 9 * 1-2 *', '0 8 * 4-9 *'], 60)
+
+    assert cache.get('0 10 * * *|Europe/Rome|2026') == ['0 9 * 1-2 *', '0 8 * 4-9 *']
+    assert cache.get('0 10 * * *|Europe/Rome|2027') is None
+
+
+def test_entries_expire(cache, clock):
+    cache.set('key', ['0 9 * * *'], 60)
+    clock[0] += 59
+    assert cache.get('key') == ['0 9 * * *']
+    clock[0] += 1
+    assert cache.get('key') is None
+
+
+def test_redis_keys_and_ttl():
+    client = StubRedis()
+    RedisCache(client).set('key', ['0 9 * * *'], 60)
+
+    (key, (expires, value)), = client.store.items()
+    assert key == KEY_PREFIX + 'key'
+    assert value == b'0 9 * * *'
+    assert expires == pytest.approx(time.time() + 60, abs=1)
+
+
+def test_backend_errors_are_misses():
+    cache = RedisCache(FailingRedis())
+
+    cache.set('key', ['0 9 * * *'], 60)
+    assert cache.get('key') is None
+
+
+def test_memory_cache_drops_the_oldest_entry():
+    cache = MemoryCache(max_size=2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, [key], 60)
+
+    assert [cache.get(key) for key in ('a', 'b', 'c')] == [None, ['b'], ['c']]
+
+
+def test_year_end_ttl(clock):
+    ttl = year_end_ttl(tz.gettz('UTC'), 1970)
+
+    assert ttl == int(365 * 86400 - clock[0]) + shared_cache.TTL_MARGIN
+    assert year_end_ttl(tz.gettz('UTC'), 1960) == shared_cache.TTL_MARGIN
+
+
+def test_coalescer_runs_concurrent_calls_once():
+    coalescer = Coalescer()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ('0 9 * * *',)
+
+    leader = threading.Thread(target=lambda: results.append(coalescer.run('key', compute)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(coalescer.run('key', compute))) for _ in range(4)]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [(('0 9 * * *',), False)] + [(('0 9 * * *',), True)] * 4
+    # Once the computation is over, the next call computes again
+    assert coalescer.run('key', lambda: ('0 8 * * *',)) == (('0 8 * * *',), False)
+
+
+def test_coalescer_shares_errors():
+    coalescer = Coalescer()
+
+    def compute():
+        raise ValueError('Incorrect Timezone string')
+
+    with pytest.raises(ValueError):
+        coalescer.run('key', compute)
+    assert coalescer.run('key', lambda: 1) == (1, False)
+
+
+def test_shared_keys_include_the_conversion_version(monkeypatch):
+    client = StubRedis()
+    monkeypatch.setattr(local_crontab_service, 'shared_cache', RedisCache(client))
+    monkeypatch.setattr(local_crontab_service.get_precomputed_table(), 'lookup', lambda *args: None)
+    timezone_index = local_crontab_service.get_timezone_index('Asia/Kolkata')
+
+    utc_crons, source = local_crontab_service.compute_conversion('0 10 * * *', 'Asia/Kolkata', timezone_index, 2026)
+
+    assert source == 'converted'
+    key, = client.store
+    assert key == f'{KEY_PREFIX}{local_crontab_service.conversion_version()}|0 10 * * *|Asia/Kolkata|2026'
+    assert local_crontab_service.compute_conversion('0 10 * * *', 'Asia/Kolkata', timezone_index, 2026) == \
+        (utc_crons, 'shared')
+
+
+def test_incomplete_backend():
+    class WriteOnlyCache(shared_cache.SharedCache):
+        def _set(self, key, value, ttl):
+            pass
+
+    with pytest.raises(TypeError):
+        WriteOnlyCache()
+
+
+def test_coalesced_conversions_are_counted(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    compute_conversion = local_crontab_service.compute_conversion
+
+    def slow_conversion(*args):
+        started.set()
+        release.wait(5)
+        return compute_conversion(*args)
+
+    monkeypatch.setattr(local_crontab_service, 'coalescer', Coalescer())
+    monkeypatch.setattr(local_crontab_service, 'compute_conversion', slow_conversion)
+    local_crontab_service.conversion_cache.clear()
+    metrics = [local_crontab_service.RequestMetrics() for _ in range(2)]
+    threads = [threading.Thread(target=local_crontab_service.convert, args=('0 10 * * *', 'Asia/Kolkata', m))
+               for m in metrics]
+    threads[0].start()
+    started.wait(5)
+    threads[1].start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    local_crontab_service.conversion_cache.clear()
+
+    assert metrics[0].conversions['converted'] + metrics[0].conversions['precomputed'] == 1
+    assert metrics[1].conversions['coalesced'] == 1 and metrics[1].cache_hits == 1
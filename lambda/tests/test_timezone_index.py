@@ -0,0 +1,36 @@
+import pytest
+from local_crontab import Converter
+
+from timezone_index import IndexedConverter, get_timezone_index, is_valid_timezone
+
+# Northern and southern DST, half hour DST, offsets not made of whole hours, no DST, DST removed or moved
+TIMEZONES = ['Europe/Rome', 'America/New_York', 'America/Sao_Paulo', 'Australia/Sydney', 'Australia/Lord_Howe',
+             'Asia/Kathmandu', 'Asia/Tokyo', 'UTC', 'Pacific/Chatham', 'Africa/Casablanca', 'America/Santiago']
+YEARS = [2024, 2025, 2026, 2027]
+CRONS = ['0 10 * * *', '5 * * * *', '30 2 * * 0', '0 9 1,15 * *', '*/15 1-3 * 3,10 *', '0 0 29 2 *',
+         '0 23 31 12 *']
+
+
+@pytest.mark.parametrize('timezone', TIMEZONES)
+@pytest.mark.parametrize('year', YEARS)
+def test_indexed_converter_matches_converter(timezone, year):
+    timezone_index = get_timezone_index(timezone)
+
+    for cron in CRONS:
+        assert IndexedConverter(cron, timezone_index, year).to_utc_crons() == \
+            Converter(cron, timezone, year).to_utc_crons(), cron
+
+
+def test_offsets_of_a_dst_year():
+    year_offsets = get_timezone_index('Europe/Rome').year_offsets(2026)
+
+    # Summer time from March 29th 02:00 to October 25th 03:00, as local hours since January 1st
+    march_29, october_25 = 31 + 28 + 28, 31 + 28 + 31 + 30 + 31 + 30 + 31 + 31 + 30 + 24
+    assert year_offsets.transitions == [0, march_29 * 24 + 2, october_25 * 24 + 3]
+    assert [offset.total_seconds() / 3600 for offset in year_offsets.offsets] == [1, 2, 1]
+
+
+def test_invalid_timezones():
+    assert not is_valid_timezone('Mars/Olympus_Mons')
+    with pytest.raises(Exception, match='Incorrect Timezone string'):
+        get_timezone_index('Mars/Olympus_Mons')
@@ -0,0 +1,57 @@
+from local_crontab import Converter
+
+from timezone_index import IndexedConverter, TimezoneIndex, YearOffsets, get_timezone_index
+from tz_snapshot import TimezoneSnapshot, build_snapshot
+
+# Northern and southern DST, half hour DST, offsets not made of whole hours, no DST, DST removed or moved
+TIMEZONES = ['Europe/Rome', 'America/New_York', 'America/Sao_Paulo', 'Australia/Sydney', 'Australia/Lord_Howe',
+             'Asia/Kathmandu', 'Asia/Tokyo', 'UTC', 'Pacific/Chatham', 'Africa/Casablanca', 'America/Santiago']
+YEARS = [2024, 2025, 2026, 2027]
+CRONS = ['0 10 * * *', '5 * * * *', '30 2 * * 0', '0 9 1,15 * *', '*/15 1-3 * 3,10 *', '0 0 29 2 *',
+         '0 23 31 12 *']
+
+
+def test_snapshot_offsets_match_tzdata(tmp_path):
+    path = str(tmp_path / 'tz_snapshot.bin')
+    build_snapshot(path, YEARS[0], len(YEARS), TIMEZONES)
+    snapshot = TimezoneSnapshot(path)
+
+    assert 'Europe/Rome' in snapshot and 'Mars/Olympus_Mons' not in snapshot
+    for timezone in TIMEZONES:
+        years = {year: YearOffsets.from_transitions(year, *zone_year)
+                 for year, zone_year in snapshot.lookup(timezone).items()}
+        snapshot_index = TimezoneIndex(timezone, None, years)
+        for year in YEARS:
+            assert years[year].transitions == YearOffsets(get_timezone_index(timezone).timezone, year).transitions
+            for cron in CRONS:
+                assert IndexedConverter(cron, snapshot_index, year).to_utc_crons() == \
+                    Converter(cron, timezone, year).to_utc_crons(), (timezone, year, cron)
+
+
+def test_zones_with_the_same_offsets_share_a_record(tmp_path):
+    path = str(tmp_path / 'tz_snapshot.bin')
+    build_snapshot(path, 2026, 2, ['Europe/Rome', 'Europe/Vatican', 'Mars/Olympus_Mons'])
+    snapshot = TimezoneSnapshot(path)
+
+    assert 'Europe/Vatican' in snapshot and 'Mars/Olympus_Mons' not in snapshot
+    assert snapshot.lookup('Europe/Vatican') == snapshot.lookup('Europe/Rome')
+    assert sorted(snapshot.lookup('Europe/Rome')) == [2026, 2027]
+
+
+def test_missing_or_invalid_snapshot(tmp_path):
+    missing = TimezoneSnapshot(str(tmp_path / 'missing.bin'))
+    invalid_path = tmp_path / 'invalid.bin'
+    invalid_path.write_bytes(b'\0' * 64)
+    invalid = TimezoneSnapshot(str(invalid_path))
+
+    assert missing.lookup('Europe/Rome') is None and missing.digest() is None
+    assert invalid.lookup('Europe/Rome') is None and 'Europe/Rome' not in invalid
+
+
+def test_digest_changes_with_the_content(tmp_path):
+    first, second = str(tmp_path / 'first.bin'), str(tmp_path / 'second.bin')
+    build_snapshot(first, 2026, 1, ['Europe/Rome'])
+    build_snapshot(second, 2026, 2, ['Europe/Rome'])
+
+    assert TimezoneSnapshot(first).digest() == TimezoneSnapshot(first).digest()
+    assert TimezoneSnapshot(first).digest() != TimezoneSnapshot(second).digest()
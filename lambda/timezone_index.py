@@ -0,0 +1,242 @@
+"""Per timezone index of UTC offsets and DST transitions.
+
+Resolving a timezone and probing tzdata for every hour/day combination of a cron is the most expensive part
+of a conversion. The index probes tzdata once per (timezone, year), then offsets are read with a bisect.
+Indexes are built lazily and kept for the whole life of the Lambda container. The offsets of the years in the
+bundled tz snapshot (see tz_snapshot.py) are read from it, without resolving the timezone nor probing tzdata.
+"""
+import os
+from bisect import bisect_right
+from functools import lru_cache
+from datetime import datetime, timedelta, tzinfo
+from typing import Dict, List, Optional
+
+from cron_converter import Cron
+from dateutil import tz
+from local_crontab import Converter
+from local_crontab.converter import WrongTimezoneError
+
+from tz_snapshot import DEFAULT_SNAPSHOT_PATH, TimezoneSnapshot
+
+HOURS_IN_DAY = 24
+
+
+class YearOffsets:
+    """UTC offsets of a timezone during a single year.
+
+    Offsets are addressed by the local hour index, that is the number of hours since January 1st 00:00 local time.
+
+    Attributes:
+        year (int): The indexed year
+        transitions (list of int): Local hour indexes where a new offset starts, the first one is always 0
+        offsets (list of timedelta): The offset starting at the same position in `transitions`
+    """
+
+    def __init__(self, timezone: tzinfo, year: int) -> None:
+        self.year = year
+        self.transitions: List[int] = []
+        self.offsets: List[timedelta] = []
+        self._build(timezone)
+
+    @classmethod
+    def from_transitions(cls, year: int, transitions: List[int], offsets: List[timedelta]) -> 'YearOffsets':
+        """Return the offsets of a year already probed, eg: read from the tz snapshot."""
+        year_offsets = cls.__new__(cls)
+        year_offsets.year = year
+        year_offsets.transitions = transitions
+        year_offsets.offsets = offsets
+        return year_offsets
+
+    @staticmethod
+    def _probe(timezone: tzinfo, local_date: datetime) -> timedelta:
+        """Return the offset of a local time, the same way `Converter` computes it."""
+        return local_date.replace(tzinfo=timezone).utcoffset()
+
+    def _build(self, timezone: tzinfo) -> None:
+        """Probe the offset at the start of every day and hour by hour only on days with a transition."""
+        first_day = datetime(self.year, 1, 1)
+        days = (datetime(self.year + 1, 1, 1) - first_day).days
+        day_offsets = [self._probe(timezone, first_day + timedelta(days=day)) for day in range(days + 1)]
+        self.transitions.append(0)
+        self.offsets.append(day_offsets[0])
+        for day in range(days):
+            if day_offsets[day] == day_offsets[day + 1]:
+                continue
+            for hour in range(1, HOURS_IN_DAY + 1):
+                offset = self._probe(timezone, first_day + timedelta(days=day, hours=hour))
+                if offset != self.offsets[-1]:
+                    self.transitions.append(day * HOURS_IN_DAY + hour)
+                    self.offsets.append(offset)
+
+    @property
+    def is_fixed(self) -> bool:
+        """The timezone has no transitions during the year."""
+        return len(self.offsets) == 1
+
+    def offset_at(self, hour_index: int) -> timedelta:
+        """Return the offset of a local hour index."""
+        return self.offsets[bisect_right(self.transitions, hour_index) - 1]
+
+
+class TimezoneIndex:
+    """Lazily built UTC offsets of a timezone, one `YearOffsets` for each requested year.
+
+    Attributes:
+        name (str): The timezone string. eg -> 'Europe/Rome'
+    """
+
+    def __init__(self, name: Optional[str], timezone: Optional[tzinfo],
+                 years: Optional[Dict[int, YearOffsets]] = None) -> None:
+        """
+        :param name: The timezone string
+        :param timezone: The resolved timezone, None to resolve it from the name on first use
+        :param years: Offsets already probed, by year
+        """
+        self.name = name
+        self._timezone = timezone
+        self._years: Dict[int, YearOffsets] = dict(years or ())
+        # Current and next year are the ones requested most of the times
+        current_year = self.current_year()
+        self.year_offsets(current_year)
+        self.year_offsets(current_year + 1)
+
+    @property
+    def timezone(self) -> tzinfo:
+        """The resolved timezone. Indexes read from the tz snapshot resolve it only if something needs it."""
+        if self._timezone is None:
+            self._timezone = tz.gettz(self.name)
+        return self._timezone
+
+    def current_year(self) -> int:
+        """Return the current year in this timezone."""
+        now = datetime.utcnow()
+        offsets = self._years.get(now.year)
+        if offsets is None:
+            return datetime.now(tz=self.timezone).year
+        # Offsets are addressed by local hours, the UTC hour can pick the offset of a transition a few hours
+        # away: that changes the year only if the transition is right at the new year
+        hour_index = (now - datetime(now.year, 1, 1)) // timedelta(hours=1)
+        return (now + offsets.offset_at(hour_index)).year
+
+    def year_offsets(self, year: int) -> YearOffsets:
+        """Return the offsets of a year, building them on first use."""
+        offsets = self._years.get(year)
+        if offsets is None:
+            offsets = self._years[year] = YearOffsets(self.timezone, year)
+        return offsets
+
+
+_timezone_indexes: Dict[Optional[str], TimezoneIndex] = dict()
+# Offsets of every zone probed at build time, a missing file disables it
+snapshot = TimezoneSnapshot(os.environ.get('TZ_SNAPSHOT', DEFAULT_SNAPSHOT_PATH))
+
+
+def get_timezone_index(name: Optional[str]) -> TimezoneIndex:
+    """Return the index of a timezone, resolving it only the first time it is requested in this container.
+
+    :param name: IANA timezone string. If empty, the local timezone is used.
+    :return: The timezone index
+    :raises WrongTimezoneError: the timezone string is not a valid one
+    """
+    index = _timezone_indexes.get(name)
+    if index is None:
+        zone_years = snapshot.lookup(name) if name else None
+        if zone_years is not None:
+            years = {year: YearOffsets.from_transitions(year, *zone_year) for year, zone_year in zone_years.items()}
+            index = TimezoneIndex(name, None, years)
+        else:
+            timezone = tz.gettz(name) if name else tz.tzlocal()
+            if not timezone:
+                raise WrongTimezoneError("Incorrect Timezone string")
+            index = TimezoneIndex(name, timezone)
+        _timezone_indexes[name] = index
+    return index
+
+
+@lru_cache(maxsize=1024)
+def _resolves(name: str) -> bool:
+    """tz.gettz looks for the zone files of unknown names every time, so outcomes are cached."""
+    return tz.gettz(name) is not None
+
+
+def is_valid_timezone(name: str) -> bool:
+    """Return True if `get_timezone_index` accepts the timezone, without building its index.
+
+    :param name: IANA timezone string. eg -> 'Europe/Rome'
+    """
+    return name in _timezone_indexes or name in snapshot or _resolves(name)
+
+
+class IndexedConverter(Converter):
+    """Converter that reads UTC offsets from a `TimezoneIndex` and does not probe tzdata.
+
+    Timezones without transitions in the year take a fast path that only shifts the hour field,
+    when the result is the same the full conversion would produce.
+    """
+
+    def __init__(self, cron_string: str, timezone_index: TimezoneIndex, year: Optional[int] = None):
+        # The timezone is already resolved by the index, so Converter.__init__ is not called
+        self.localized_cron = Cron(cron_string)
+        self.localized_cron_list = self.localized_cron.to_list()
+        self.timezone_index = timezone_index
+        self.cron_year = year if bool(year) else timezone_index.current_year()
+        self.year_offsets = timezone_index.year_offsets(self.cron_year)
+
+    @property
+    def timezone(self) -> tzinfo:
+        """The resolved timezone, needed only by the methods of `Converter` that probe tzdata."""
+        return self.timezone_index.timezone
+
+    def to_utc_crons(self) -> List[str]:
+        """Convert the cron string to a list of UTC cron strings.
+
+        :return: cron_strings (list of str): the resulting cron list readable by all systems.
+        """
+        if self.year_offsets.is_fixed and not self.localized_cron.parts[1].is_full():
+            shifted_cron = self._shift_hours()
+            if shifted_cron is not None:
+                return [shifted_cron]
+        return super().to_utc_crons()
+
+    def _shift_hours(self) -> Optional[str]:
+        """Return the cron with only the hour field shifted to UTC, or None when a full conversion is needed.
+
+        That happens when the offset is not made of whole hours, when an hour crosses the day or when the cron
+        contains days that do not exist in every month.
+        """
+        offset_seconds = int(self.year_offsets.offsets[0].total_seconds())
+        if offset_seconds % 3600:
+            return None
+        offset_hours = offset_seconds // 3600
+        minutes, hours, days, months, weekdays = self.localized_cron_list
+        utc_hours = [hour - offset_hours for hour in hours]
+        if utc_hours[0] < 0 or utc_hours[-1] >= HOURS_IN_DAY:
+            return None
+        if not self.localized_cron.parts[2].is_full() and days[-1] > 28:
+            return None
+        utc_cron = Cron()
+        utc_cron.from_list([minutes, utc_hours, days, months, weekdays])
+        return utc_cron.to_string()
+
+    def _day_cron_list(self):
+        """Same as `Converter._day_cron_list`, with the offsets read from the index.
+
+        :return: acc (list of ints): nested list made up of cron lists readable by Cron-Converter Object.
+        """
+        utc_list_crontabs = list()
+        first_day = datetime(self.cron_year, 1, 1).toordinal()
+        for month in self.localized_cron_list[3]:
+            for day in self.localized_cron_list[2]:
+                try:
+                    local_day = datetime(self.cron_year, month, day)
+                except ValueError:
+                    continue  # skip days that not exist (eg: 30 February)
+                day_index = (local_day.toordinal() - first_day) * HOURS_IN_DAY
+                for hour in self.localized_cron_list[1]:
+                    utc_date = local_day + timedelta(hours=hour) - self.year_offsets.offset_at(day_index + hour)
+                    # Create one Cron list for each hour
+                    utc_list_crontabs.append([
+                        [minute for minute in self.localized_cron_list[0]],
+                        [utc_date.hour],
+                        [utc_date.day], [utc_date.month], self.localized_cron_list[4]])
+        return utc_list_crontabs
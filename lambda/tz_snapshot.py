@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Snapshot of the UTC offsets of every timezone, in a single compact file bundled with the Lambda asset.
+
+Building a `TimezoneIndex` probes tzdata for every day of the current and of the next year, which is most of the
+latency of the first request for a timezone in a new container. The snapshot is built by the Lambda bundling
+command with the same `YearOffsets` probes, for every zone and for a range of years around the build date.
+At run time the file is memory-mapped on first use and a zone is read only when it is requested, with a binary
+search on its name, so neither the import nor the first request depend on the number of zones.
+
+Layout, little endian:
+ - header: magic, format version, first year, number of years, number of zones, size of the names
+ - index: one (name offset, name length, record offset) entry for every zone, sorted by name
+ - names: UTF-8 zone names
+ - records: for every year, the number of transitions then (local hour index, offset seconds) pairs.
+   Zones with the same offsets, like links, share a record.
+
+Years outside the snapshot are probed as usual. DST rules change over time, so the asset must be rebuilt at
+least once a year, like the precomputed table.
+
+Usage:
+    python lambda/tz_snapshot.py [--output tz_snapshot.bin] [--years-before 1] [--years-after 10]
+"""
+import argparse
+import os
+import struct
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tz_snapshot.bin')
+
+MAGIC = b'TZSN'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHHHHI')
+_ENTRY = struct.Struct('<IBI')
+_COUNT = struct.Struct('<B')
+_TRANSITION = struct.Struct('<Hi')
+
+# Transitions and offsets of a year, like `YearOffsets`
+ZoneYear = Tuple[List[int], List[timedelta]]
+
+
+class TimezoneSnapshot:
+    """Read-only lookup of the offsets of the snapshot.
+
+    Attributes:
+        path (str): Path of the snapshot file. A missing file disables the snapshot.
+        first_year (int): First year of the snapshot
+        years (int): Number of years of the snapshot
+    """
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH) -> None:
+        self.path = path
+        self.first_year = self.years = 0
+        self._buffer = None
+        self._available = os.path.exists(path)
+
+    def _open(self) -> None:
+        """Map the file on first use, nothing is read besides the header."""
+        import mmap
+
+        with open(self.path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.first_year, self.years, self._zones, names_size = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            buffer.close()
+            self._available = False
+            return
+        self._names_start = _HEADER.size + self._zones * _ENTRY.size
+        self._records_start = self._names_start + names_size
+        self._buffer = buffer
+
+    def _find(self, name: bytes) -> Optional[int]:
+        """Return the record offset of a zone name, with a binary search on the sorted index."""
+        low, high = 0, self._zones
+        while low < high:
+            middle = (low + high) // 2
+            name_offset, name_length, record_offset = _ENTRY.unpack_from(
+                self._buffer, _HEADER.size + middle * _ENTRY.size)
+            start = self._names_start + name_offset
+            entry_name = self._buffer[start:start + name_length]
+            if entry_name == name:
+                return record_offset
+            if entry_name < name:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def digest(self) -> Optional[str]:
+        """Return a digest of the snapshot file, None if there is no snapshot. It identifies the tzdata it holds."""
+        if not self._available:
+            return None
+        import hashlib
+
+        with open(self.path, 'rb') as file:
+            return hashlib.blake2b(file.read(), digest_size=10).hexdigest()
+
+    def _ready(self) -> bool:
+        """Map the file if needed, return False if there is no usable snapshot."""
+        if self._available and self._buffer is None:
+            self._open()
+        return self._buffer is not None
+
+    def __contains__(self, name: str) -> bool:
+        """Return True if the zone is in the snapshot, without reading its offsets."""
+        return self._ready() and self._find(name.encode('utf-8')) is not None
+
+    def lookup(self, name: str) -> Optional[Dict[int, ZoneYear]]:
+        """Return the transitions and offsets of every year of a zone, None if the zone is not in the snapshot.
+
+        :param name: IANA timezone string. eg -> 'Europe/Rome'
+        """
+        if not self._ready():
+            return None
+        record_offset = self._find(name.encode('utf-8'))
+        if record_offset is None:
+            return None
+        position = self._records_start + record_offset
+        zone_years = dict()
+        for year in range(self.first_year, self.first_year + self.years):
+            count, = _COUNT.unpack_from(self._buffer, position)
+            position += _COUNT.size
+            transitions, offsets = [], []
+            for hour_index, offset in _TRANSITION.iter_unpack(
+                    self._buffer[position:position + count * _TRANSITION.size]):
+                transitions.append(hour_index)
+                offsets.append(timedelta(seconds=offset))
+            position += count * _TRANSITION.size
+            zone_years[year] = (transitions, offsets)
+        return zone_years
+
+
+def zone_names() -> List[str]:
+    """Return the names of every zone of the tz database bundled with dateutil."""
+    from dateutil.zoneinfo import get_zonefile_instance
+
+    return sorted(get_zonefile_instance().zones)
+
+
+def build_snapshot(output: str, first_year: int, years: int, names: Optional[List[str]] = None) -> int:
+    """Probe the offsets of every zone and write the snapshot.
+
+    Zones are resolved with `tz.gettz`, the same way the Lambda does, so the snapshot reflects the tzdata
+    installed where it is built.
+
+    :param output: Path of the snapshot file, overwritten
+    :param first_year: First year of the snapshot
+    :param years: Number of years
+    :param names: Zone names, default is every zone of `zone_names`
+    :return: Number of zones in the snapshot
+    """
+    from dateutil import tz
+    from timezone_index import YearOffsets
+
+    names = sorted(set(names or zone_names()))
+    entries, name_table, records = [], bytearray(), bytearray()
+    record_offsets: Dict[bytes, int] = dict()
+    for name in names:
+        timezone = tz.gettz(name)
+        if not timezone:
+            continue
+        record = bytearray()
+        for year in range(first_year, first_year + years):
+            year_offsets = YearOffsets(timezone, year)
+            record += _COUNT.pack(len(year_offsets.transitions))
+            for hour_index, offset in zip(year_offsets.transitions, year_offsets.offsets):
+                record += _TRANSITION.pack(hour_index, int(offset.total_seconds()))
+        record = bytes(record)
+        if record not in record_offsets:
+            record_offsets[record] = len(records)
+            records += record
+        encoded_name = name.encode('utf-8')
+        entries.append(_ENTRY.pack(len(name_table), len(encoded_name), record_offsets[record]))
+        name_table += encoded_name
+
+    with open(output, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, first_year, years, len(entries), len(name_table)))
+        file.write(b''.join(entries))
+        file.write(name_table)
+        file.write(records)
+    return len(entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=DEFAULT_SNAPSHOT_PATH, help='Snapshot file to write')
+    parser.add_argument('--years-before', type=int, default=1, help='Years before the current one')
+    parser.add_argument('--years-after', type=int, default=10, help='Years after the current one')
+    args = parser.parse_args()
+
+    current_year = datetime.now(tz=dt_timezone.utc).year
+    started = time.perf_counter()
+    count = build_snapshot(args.output, current_year - args.years_before, args.years_before + args.years_after + 1)
+    print(f'{count} zones written to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB) '
+          f'in {time.perf_counter() - started:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
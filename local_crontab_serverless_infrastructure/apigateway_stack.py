@@ -7,6 +7,8 @@ from aws_cdk import (
 from aws_cdk.core import Tags
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from local_crontab_serverless_infrastructure.lambda_stack import LIVE_ALIAS
+
 
 # Create a Jinja2 env to load OpenApi3 based on provided ENV
 templateLoader = FileSystemLoader(searchpath="./")
@@ -27,6 +29,19 @@ class ApiGatewayStack(core.Stack):
         api_version = self.node.try_get_context("ApiVersion")
         aws_default_region = self.node.try_get_context("awsDefaultRegion")
         aws_lambda_name = self.node.try_get_context("awsLambdaName")
+        # With provisioned concurrency the Lambda alias that has it is invoked, see LambdaStack
+        provisioned_concurrency = self.node.try_get_context("lambdaProvisionedConcurrency") or 0
+        # Requests per second and burst of the stage, for all the clients
+        stage_rate_limit = self.node.try_get_context("apiStageRateLimit") or 2
+        stage_burst_limit = self.node.try_get_context("apiStageBurstLimit") or 1
+        # Requests per second, burst and quota of each API key
+        usage_plan_rate_limit = self.node.try_get_context("apiUsagePlanRateLimit") or 5
+        usage_plan_burst_limit = self.node.try_get_context("apiUsagePlanBurstLimit") or 1
+        quota_limit = self.node.try_get_context("apiQuotaLimit") or 100
+        quota_period = self.node.try_get_context("apiQuotaPeriod") or "DAY"
+        # Size in GB of the stage cache of GET /utc-crontab, eg: "0.5". None disables it, it is billed by the hour
+        cache_cluster_size = self.node.try_get_context("apiCacheClusterSize")
+        cache_max_age = self.node.try_get_context("cacheMaxAge")
 
         # Create role with Invoke permission
         aws_api_role = iam.Role(
@@ -48,6 +63,7 @@ class ApiGatewayStack(core.Stack):
         rendered_text = template.render(
             logo_link=self.node.try_get_context("ApiDocLogo"),
             aws_lambda_name=aws_lambda_name,
+            aws_lambda_alias=f':{LIVE_ALIAS}' if provisioned_concurrency else '',
             aws_api_role=self.node.try_get_context("awsApiGatewayInvokeRole"))
         # save the rendered results
         with open(rendered_openapi3_spec, "w") as file:
@@ -71,8 +87,18 @@ class ApiGatewayStack(core.Stack):
             data_trace_enabled=True,
             logging_level=apigw.MethodLoggingLevel.INFO,
             access_log_destination=apigw.LogGroupLogDestination(aws_cloudwatch_api_loggroup),
-            throttling_rate_limit=2,
-            throttling_burst_limit=1,
+            throttling_rate_limit=stage_rate_limit,
+            throttling_burst_limit=stage_burst_limit,
+            cache_cluster_enabled=bool(cache_cluster_size),
+            cache_cluster_size=cache_cluster_size or None,
+            # Conversions with query parameters are cached by cron, timezone, Accept and Accept-Encoding, up to the 1 hour
+            # limit of the cache
+            method_options={
+                "/utc-crontab/GET": apigw.MethodDeploymentOptions(
+                    caching_enabled=True,
+                    cache_ttl=core.Duration.seconds(min(86400 if cache_max_age is None else cache_max_age, 3600))
+                )
+            } if cache_cluster_size else None,
             description="Default Stage"
         )
 
@@ -96,10 +122,7 @@ class ApiGatewayStack(core.Stack):
         )
 
         # https://docs.aws.amazon.com/cdk/api/latest/python/aws_cdk.aws_apigateway/UsagePlan.html
-        #Rate:
-        # 2 requests per second Burst
-        # 1 requests Quota
-        # 100 requests per day
+        # Default rate: 5 requests per second, burst: 1 request, quota: 100 requests per day
         aws_rest_api_usage_plan = apigw.UsagePlan(
             self, "LocalCrontabUsagePlan",
             api_key=aws_rest_api_key,
@@ -111,13 +134,13 @@ class ApiGatewayStack(core.Stack):
             name="local-crontab-usage-plan",
             description="local-crontab usage plan",
             quota=apigw.QuotaSettings(
-                limit=100,
+                limit=quota_limit,
                 offset=0,
-                period=apigw.Period.DAY
+                period=getattr(apigw.Period, quota_period.upper())
             ),
             throttle=apigw.ThrottleSettings(
-                rate_limit=5,
-                burst_limit=1
+                rate_limit=usage_plan_rate_limit,
+                burst_limit=usage_plan_burst_limit
             )
         )
 
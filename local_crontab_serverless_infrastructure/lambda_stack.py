@@ -4,13 +4,52 @@ from aws_cdk import (
     aws_iam as iam
 )
 from aws_cdk.core import Tags
+import json
+import yaml
+
+openapi3_template_spec_file = './openapi_specification/local_crontab_api.yaml'
+# Schemas of the specification used by the Lambda to validate requests, see lambda/request_validator.py
+exported_schemas_file = './lambda/openapi_schemas.json'
+# Alias with the provisioned concurrency, invoked by API Gateway when it is enabled
+LIVE_ALIAS = 'live'
+
+
+def check_exported_schemas():
+    """Stop the synth if the schemas bundled with the Lambda differ from the ones of the specification"""
+    with open(openapi3_template_spec_file) as spec_file, open(exported_schemas_file) as schemas_file:
+        if yaml.safe_load(spec_file)['components']['schemas'] != json.load(schemas_file):
+            raise ValueError(f"{exported_schemas_file} is out of date, "
+                             f"run: python lambda/request_validator.py --export")
+
 
 class LambdaStack(core.Stack):
     def __init__(self, app: core.App, id: str, **kwargs):
         super().__init__(app, id, **kwargs)
+        check_exported_schemas()
 
         aws_lambda_name = self.node.try_get_context("awsLambdaName")
         aws_lambda_exec_role = self.node.try_get_context("awsLambdaExecRole")
+        conversion_cache_size = self.node.try_get_context("conversionCacheSize") or 1024
+        log_level = self.node.try_get_context("lambdaLogLevel") or "INFO"
+        structured_log_sample_rate = self.node.try_get_context("structuredLogSampleRate") or 0
+        compression_min_size = self.node.try_get_context("compressionMinSize")
+        # Seconds single conversions can be cached by clients, CDNs and the API stage cache, 0 to revalidate always
+        cache_max_age = self.node.try_get_context("cacheMaxAge")
+        precompute_conversions = self.node.try_get_context("precomputeConversions")
+        metrics_sink = self.node.try_get_context("metricsSink") or "none"
+        # eg: redis://cache.example.internal:6379/0, the Lambda must reach it and `redis` must be in requirements
+        shared_cache = self.node.try_get_context("sharedCache") or ""
+        # Sizing, see benchmarks/lambda_tuning.py to choose them. CPU grows with memory, 1769 MB is one vCPU
+        memory_size = self.node.try_get_context("lambdaMemorySize") or 128
+        architecture = self.node.try_get_context("lambdaArchitecture") or "x86_64"
+        runtime_name = self.node.try_get_context("lambdaRuntime") or "python3.8"
+        reserved_concurrency = self.node.try_get_context("lambdaReservedConcurrency")
+        provisioned_concurrency = self.node.try_get_context("lambdaProvisionedConcurrency") or 0
+        if architecture not in ("x86_64", "arm64"):
+            raise ValueError(f'lambdaArchitecture must be "x86_64" or "arm64", not "{architecture}"')
+        if not runtime_name.startswith("python3."):
+            raise ValueError(f'lambdaRuntime must be a Python 3 runtime, eg: "python3.9", not "{runtime_name}"')
+        runtime = lambda_.Runtime(runtime_name, lambda_.RuntimeFamily.PYTHON)
 
         # Create role for the lambda function
         aws_lambda_role = iam.Role(
@@ -32,16 +71,30 @@ class LambdaStack(core.Stack):
             )
         )
 
-        # install lambda requirements inside a container
+        # Conversions of precompute_matrix.json, built with the same tzdata installed in the Lambda.
+        # DST rules change, so the stack must be deployed again at least once a year
+        precompute_command = 'cd /asset-output && python3 precomputed_table.py --output precomputed.sqlite3'
+        if precompute_conversions is False:
+            precompute_command = 'rm -f /asset-output/precomputed.sqlite3'
+
+        # Wheels of the Lambda architecture. Build steps import only pure Python packages, so they run anyway
+        pip_platform = '--platform manylinux2014_aarch64 --only-binary=:all: ' if architecture == "arm64" else ''
+
+        # install lambda requirements inside a container, with the Python version of the runtime
         aws_lambda_code = lambda_.Code.from_asset(
             path=f'lambda/',
             bundling=core.BundlingOptions(
-                image=core.BundlingDockerImage.from_registry('python:3.8-slim'),
+                image=core.BundlingDockerImage.from_registry(f'python:{runtime_name[len("python"):]}-slim'),
                 command=[
                     'bash', '-c', ' && '.join([
                         'cp -r /asset-input/* /asset-output/',
                         'rm -rf /asset-output/__pycache__ /asset-output/tests',
-                        'pip3 install --upgrade -r requirements.txt -t /asset-output',
+                        'rm -f /asset-output/local_crontab_server.py /asset-output/bulk_converter.py',
+                        'rm -f /asset-output/schedule_bitmask.py /asset-output/schedule_plan.py',
+                        f'pip3 install --upgrade {pip_platform}-r requirements.txt -t /asset-output',
+                        # Offsets of every timezone, so the first request for a timezone does not probe tzdata
+                        'cd /asset-output && python3 tz_snapshot.py --output tz_snapshot.bin',
+                        precompute_command,
                         'ls -lart /asset-output'
                     ])
                   ],
@@ -56,8 +109,20 @@ class LambdaStack(core.Stack):
             function_name=aws_lambda_name,
             code=aws_lambda_code,
             handler=f"{aws_lambda_name}.lambda_handler",
-            runtime=lambda_.Runtime.PYTHON_3_8,
+            runtime=runtime,
+            architecture=lambda_.Architecture.ARM_64 if architecture == "arm64" else lambda_.Architecture.X86_64,
+            memory_size=memory_size,
+            reserved_concurrent_executions=reserved_concurrency,
             role=aws_lambda_role,
+            environment={
+                "CONVERSION_CACHE_SIZE": str(conversion_cache_size),
+                "LOG_LEVEL": log_level,
+                "STRUCTURED_LOG_SAMPLE_RATE": str(structured_log_sample_rate),
+                "COMPRESSION_MIN_SIZE": str(1024 if compression_min_size is None else compression_min_size),
+                "METRICS_SINK": metrics_sink,
+                "CACHE_MAX_AGE": str(86400 if cache_max_age is None else cache_max_age),
+                "SHARED_CACHE": shared_cache
+            },
             description="Lambda Edge to authorize access to api documentations"
             )
 
@@ -68,6 +133,15 @@ class LambdaStack(core.Stack):
             retry_attempts=1
         )
 
+        if provisioned_concurrency:
+            # Containers kept initialized, so requests do not pay cold starts. API Gateway invokes the alias
+            lambda_.Alias(
+                self, "AwsLambdaLiveAlias",
+                alias_name=LIVE_ALIAS,
+                version=aws_lambda.current_version,
+                provisioned_concurrent_executions=provisioned_concurrency
+            )
+
         Tags.of(aws_lambda).add("Scope", "local-crontab")
 
         # Output of resources
@@ -25,7 +25,8 @@ setuptools.setup(
         "aws-cdk.aws_lambda",
         "aws-cdk.aws_apigateway",
         "aws-cdk.aws_logs",
-        "jinja2"
+        "jinja2",
+        "pyyaml"
     ],
 
     python_requires=">=3.8",